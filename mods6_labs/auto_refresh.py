@@ -0,0 +1,246 @@
+import asyncio
+import heapq
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from weather_cache import normalize_city
+
+
+def change_score(old: dict, new: dict) -> float:
+    """How much conditions moved between two weather responses.
+
+    A score of 1 is a noticeable change: about 1 °C of temperature, 2 m/s
+    of wind, 10 points of humidity, or a different weather condition.
+    """
+
+    def value(data: dict, section: str, field: str) -> float | None:
+        raw = data.get(section, {}).get(field)
+        return float(raw) if isinstance(raw, (int, float)) else None
+
+    score = 0.0
+    for section, field, scale in (
+        ("main", "temp", 1.0),
+        ("wind", "speed", 2.0),
+        ("main", "humidity", 10.0),
+    ):
+        before, after = value(old, section, field), value(new, section, field)
+        if before is not None and after is not None:
+            score += abs(after - before) / scale
+
+    def condition(data: dict) -> str | None:
+        weather = data.get("weather") or [{}]
+        return weather[0].get("id") or weather[0].get("description")
+
+    if condition(old) != condition(new):
+        score += 1.0
+    return score
+
+
+class RefreshScheduler:
+    """Refresh pinned cities in the background from one asyncio task.
+
+    Every pinned city has its own interval, starting at ``interval`` and
+    kept between ``min_interval`` and ``max_interval``: it halves after a
+    refresh that found conditions changing and grows by half after one that
+    found them steady. A city whose cached data is already younger than
+    its interval (e.g. someone just searched for it) is not fetched again.
+
+    Refreshes are at least ``3600 / budget_per_hour`` seconds apart and
+    never more than ``budget_per_hour`` in any hour, which both spreads
+    them out and keeps the scheduler within its share of the API budget.
+    Newly pinned cities start one spacing step apart rather than all at
+    once. ``pause()`` stops refreshing (e.g. while the window is hidden);
+    on ``resume()`` overdue cities are caught up one spacing step apart.
+
+    ``pin``, ``unpin``, ``pause`` and ``resume`` may be called from any
+    thread, since Flet runs sync handlers off the event loop.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[str], Awaitable[dict | None]],
+        age: Callable[[str], float | None] = lambda city: None,
+        budget_per_hour: int = 60,
+        interval: float = 900.0,
+        min_interval: float = 300.0,
+        max_interval: float = 3600.0,
+    ) -> None:
+        self.refresh = refresh
+        self.age = age
+        self.budget_per_hour = max(1, budget_per_hour)
+        self.spacing = 3600.0 / self.budget_per_hour
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+
+        self._lock = threading.Lock()
+        # city key -> display name, current interval, next due time
+        self.pinned: dict[str, str] = {}
+        self.intervals: dict[str, float] = {}
+        self.due: dict[str, float] = {}
+        self._queue: list[tuple[float, str]] = []
+        self._last_data: dict[str, dict] = {}
+        self._sent: deque[float] = deque(maxlen=self.budget_per_hour)
+        self._paused = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+
+        self.refreshes = 0
+        self.reused = 0
+        self.failures = 0
+
+    # ---------------- Pins and pausing ----------------
+    def pin(self, cities: list[str]) -> None:
+        """Start refreshing cities; already pinned ones keep their schedule."""
+        now = time.monotonic()
+        with self._lock:
+            start = now + self.spacing
+            for city in cities:
+                key = normalize_city(city)
+                if not key or key in self.pinned:
+                    continue
+                self.pinned[key] = city
+                self.intervals[key] = self.interval
+                self._schedule(key, start)
+                start += self.spacing
+        self._wake()
+
+    def unpin(self, cities: list[str] | None = None) -> None:
+        """Stop refreshing the given cities, or all of them."""
+        with self._lock:
+            keys = list(self.pinned) if cities is None else [normalize_city(c) for c in cities]
+            for key in keys:
+                self.pinned.pop(key, None)
+                self.intervals.pop(key, None)
+                self.due.pop(key, None)
+                self._last_data.pop(key, None)
+        self._wake()
+
+    def pause(self) -> None:
+        self._paused = True
+        self._wake()
+
+    def resume(self) -> None:
+        self._paused = False
+        self._wake()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def _schedule(self, key: str, when: float) -> None:
+        # the queue may hold outdated entries; ``due`` has the real time
+        self.due[key] = when
+        heapq.heappush(self._queue, (when, key))
+
+    def _wake(self) -> None:
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # ---------------- Budget ----------------
+    def next_allowed(self) -> float:
+        """Earliest time the next refresh fits the spacing and hourly budget."""
+        if not self._sent:
+            return 0.0
+        allowed = self._sent[-1] + self.spacing
+        if len(self._sent) == self.budget_per_hour:
+            allowed = max(allowed, self._sent[0] + 3600.0)
+        return allowed
+
+    def sent_last_hour(self) -> int:
+        cutoff = time.monotonic() - 3600.0
+        return sum(1 for sent in self._sent if sent > cutoff)
+
+    # ---------------- Main loop ----------------
+    async def run(self) -> None:
+        """Refresh pinned cities until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            wait = self._seconds_until_next()
+            if wait is None:
+                await self._wakeup.wait()
+                continue
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._refresh_next()
+
+    def _seconds_until_next(self) -> float | None:
+        """Seconds until the next refresh may run; None when idle or paused."""
+        if self._paused:
+            return None
+        with self._lock:
+            top = self._peek()
+            if top is None:
+                return None
+            when = max(top[0], self.next_allowed())
+        return when - time.monotonic()
+
+    def _peek(self) -> tuple[float, str] | None:
+        while self._queue and self.due.get(self._queue[0][1]) != self._queue[0][0]:
+            heapq.heappop(self._queue)
+        return self._queue[0] if self._queue else None
+
+    async def _refresh_next(self) -> None:
+        with self._lock:
+            # pins may have changed on another thread since the last check
+            top = self._peek()
+            if top is None or top[0] > time.monotonic():
+                return
+            _, key = heapq.heappop(self._queue)
+            city = self.pinned[key]
+            interval = self.intervals[key]
+            self.due.pop(key, None)
+
+        age = self.age(city)
+        if age is not None and age < interval:
+            # fresh enough already: come back when it is due
+            self.reused += 1
+            with self._lock:
+                if key in self.pinned:
+                    self._schedule(key, time.monotonic() + interval - age)
+            return
+
+        self._sent.append(time.monotonic())
+        self.refreshes += 1
+        try:
+            data = await self.refresh(city)
+        except Exception:
+            data = None
+            self.failures += 1
+
+        with self._lock:
+            if key not in self.pinned:
+                return
+            previous = self._last_data.get(key)
+            if data:
+                if previous is not None:
+                    score = change_score(previous, data)
+                    if score >= 1.0:
+                        interval /= 2
+                    elif score < 0.25:
+                        interval *= 1.5
+                self._last_data[key] = data
+            interval = min(self.max_interval, max(self.min_interval, interval))
+            self.intervals[key] = interval
+            self._schedule(key, time.monotonic() + interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            intervals = {self.pinned[k]: round(v) for k, v in self.intervals.items()}
+        return {
+            "pinned": len(intervals),
+            "paused": self._paused,
+            "refreshes": self.refreshes,
+            "reused": self.reused,
+            "failures": self.failures,
+            "last_hour": self.sent_last_hour(),
+            "intervals": intervals,
+        }
@@ -0,0 +1,473 @@
+"""Offline micro-benchmarks for the weather app's networking code.
+
+Each benchmark runs against mock_server.py on a free local port, so no API
+key or internet connection is needed:
+
+    python bench.py client --requests 200
+    python bench.py dashboard --cities 60 --latency 0.2 --rate-429 0.1
+    python bench.py faults --requests 300 --tail-rate 0.03 --rate-5xx 0.05
+    python bench.py render --searches 20
+    python bench.py refresh --cities 6 --seconds 20
+    python bench.py forecast --cities 200
+    python bench.py telemetry --searches 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import types
+import zlib
+from pathlib import Path
+
+import httpx
+
+from http_client import create_async_client
+from latency import nearest_rank
+from mock_server import start_in_thread
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of samples (pct in 0-100)."""
+    if not samples:
+        return 0.0
+    return nearest_rank(sorted(samples), pct)
+
+
+def summarize(label: str, samples: list[float]) -> str:
+    ms = [s * 1000 for s in samples]
+    return (
+        f"{label:<24} n={len(ms):<5} mean={statistics.fmean(ms):7.2f}ms "
+        f"p50={percentile(ms, 50):7.2f}ms p95={percentile(ms, 95):7.2f}ms"
+    )
+
+
+# ---------------- client: per-request vs shared pooled client ----------------
+async def _per_request_client(url: str, count: int) -> list[float]:
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.get(url, params={"q": f"city{i % 10}"})
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _shared_client(url: str, count: int) -> list[float]:
+    samples = []
+    async with create_async_client() as client:
+        for i in range(count):
+            start = time.perf_counter()
+            response = await client.get(url, params={"q": f"city{i % 10}"})
+            response.raise_for_status()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_client(args: argparse.Namespace) -> None:
+    server = start_in_thread()
+    try:
+        per_request = asyncio.run(_per_request_client(server.base_url, args.requests))
+        shared = asyncio.run(_shared_client(server.base_url, args.requests))
+    finally:
+        server.shutdown()
+    print(summarize("client per request", per_request))
+    print(summarize("shared pooled client", shared))
+    speedup = statistics.fmean(per_request) / statistics.fmean(shared)
+    print(f"shared client is {speedup:.1f}x faster on average")
+
+
+# ---------------- dashboard: end-to-end multi-city fetch ----------------
+class HeadlessPage:
+    """Minimal stand-in for ft.Page so WeatherApp can run without a window."""
+
+    def __init__(self) -> None:
+        self.controls: list = []
+        self.updates = 0
+        self.targeted_updates = 0
+        self.window = types.SimpleNamespace(destroy=lambda: None)
+
+    def add(self, *controls) -> None:
+        self.controls.extend(controls)
+
+    def update(self, *controls) -> None:
+        self.updates += 1
+        self.targeted_updates += bool(controls)
+
+    def run_task(self, handler, *args):
+        return asyncio.ensure_future(handler(*args))
+
+
+async def create_headless_app(base_url: str):
+    """Build a WeatherApp on a HeadlessPage talking to base_url, once ready."""
+    os.environ.setdefault("OPENWEATHER_API_KEY", "offline-benchmark")
+    os.environ["OPENWEATHER_BASE_URL"] = base_url
+    # start every run cold unless a cache file is asked for explicitly
+    os.environ.setdefault("WEATHER_CACHE_FILE", "off")
+    # never reach out to the real icon server from a benchmark
+    os.environ.setdefault("WEATHER_ICONS_BUNDLED", "1")
+    from main import WeatherApp
+
+    page = HeadlessPage()
+    app = WeatherApp(page)
+    # searches must not overwrite the user's search_history.json; the
+    # history is only read once startup runs, at the first await below
+    app.bench_workdir = tempfile.TemporaryDirectory(prefix="weather-bench-")
+    app.history_file = Path(app.bench_workdir.name) / "search_history.json"
+    app.history.path = app.history_file
+    await app.ready.wait()
+    if app.config_error:
+        raise RuntimeError(app.config_error)
+    return app, page
+
+
+async def _run_dashboard(base_url: str, cities: list[str], args: argparse.Namespace) -> None:
+    app, page = await create_headless_app(base_url)
+    app.dashboard_concurrency = args.concurrency
+    if args.rate_per_min:
+        from rate_limiter import TokenBucket
+
+        app.rate_limiter = TokenBucket.per_minute(args.rate_per_min, args.burst)
+
+    first_row = None
+    original_update_row = app.update_dashboard_row
+
+    def timed_update_row(*row_args, **row_kwargs) -> None:
+        nonlocal first_row
+        if first_row is None:
+            first_row = time.perf_counter() - start
+        original_update_row(*row_args, **row_kwargs)
+
+    app.update_dashboard_row = timed_update_row
+    app.dashboard_input.value = ", ".join(cities)
+    start = time.perf_counter()
+    app.on_dashboard_click(None)
+    await app.dashboard_task
+    total = time.perf_counter() - start
+    await app.close()
+
+    failed = sum(1 for row in app.dashboard_rows.values() if row.value.endswith("unavailable"))
+    print(f"cities={len(cities)} concurrency={args.concurrency}")
+    print(f"first row after {first_row or 0:.2f}s, all rows after {total:.2f}s")
+    print(f"failed rows={failed}, page updates={page.updates}")
+
+
+def bench_dashboard(args: argparse.Namespace) -> None:
+    server = start_in_thread(latency=args.latency, jitter=args.latency / 2, rate_429=args.rate_429)
+    cities = [f"City {i}" for i in range(args.cities)]
+    try:
+        asyncio.run(_run_dashboard(server.base_url, cities, args))
+        stats = server.state.snapshot()
+    finally:
+        server.shutdown()
+    print(f"server saw {stats['requests']} requests, {stats['rate_limited']} answered 429")
+
+
+# ---------------- faults: tail latency, retries and circuit breaker ----------------
+async def _run_faults(base_url: str, server, args: argparse.Namespace, hedge: bool) -> None:
+    from latency import CircuitOpenError
+    from rate_limiter import TokenBucket
+
+    app, _ = await create_headless_app(base_url)
+    app.hedge_requests = hedge
+    app.rate_limiter = TokenBucket(rate=10_000, capacity=10_000)
+    label = "hedged" if hedge else "plain"
+
+    samples, errors = [], 0
+    for i in range(args.requests):
+        start = time.perf_counter()
+        try:
+            await app.fetch_weather(f"{label} city {i}")
+        except Exception:
+            errors += 1
+        samples.append(time.perf_counter() - start)
+    print(summarize(f"{label} requests", samples) + f" p99={percentile(samples, 99) * 1000:7.2f}ms"
+          f" max={max(samples) * 1000:7.2f}ms errors={errors}")
+
+    if not hedge:
+        # full outage: the breaker should start failing fast after a few calls
+        server.down = True
+        outage = []
+        for i in range(20):
+            start = time.perf_counter()
+            try:
+                await app.fetch_weather(f"outage city {i}")
+            except CircuitOpenError:
+                outage.append(("open", time.perf_counter() - start))
+            except Exception:
+                outage.append(("error", time.perf_counter() - start))
+        server.down = False
+        fast = [t for state, t in outage if state == "open"]
+        print(
+            f"outage: {len(outage) - len(fast)} calls reached upstream, {len(fast)} failed fast "
+            f"(mean {statistics.fmean(fast) * 1000 if fast else 0:.3f}ms), breaker={app.circuit_breaker.state}"
+        )
+    await app.close()
+
+
+def bench_faults(args: argparse.Namespace) -> None:
+    server = start_in_thread(
+        latency=args.latency,
+        jitter=args.latency,
+        rate_5xx=args.rate_5xx,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+    )
+    try:
+        asyncio.run(_run_faults(server.base_url, server, args, hedge=False))
+        asyncio.run(_run_faults(server.base_url, server, args, hedge=True))
+    finally:
+        server.shutdown()
+
+
+# ---------------- render: coalesced UI updates ----------------
+async def _run_render(base_url: str, args: argparse.Namespace) -> None:
+    app, page = await create_headless_app(base_url)
+    app.search_debounce = 0
+    for i in range(args.searches):
+        # every other search repeats a city, so half are cache hits
+        app.city_input.value = f"City {i // 2}"
+        app.on_search_click(None)
+        await app.search_task
+        await asyncio.sleep(app.render.frame_window * 2)
+    app.render.begin_interaction("done")
+    stats = app.render.stats()
+    await app.close()
+    print(f"searches={args.searches}")
+    print(f"refreshes requested={stats['requested']} (one page.update each before batching)")
+    print(f"page updates sent={page.updates} ({page.targeted_updates} targeted)")
+    print(f"last interaction: {stats['last']}")
+
+
+def bench_render(args: argparse.Namespace) -> None:
+    server = start_in_thread()
+    try:
+        asyncio.run(_run_render(server.base_url, args))
+    finally:
+        server.shutdown()
+
+
+# ---------------- refresh: background auto-refresh, time compressed ----------------
+async def _run_refresh(base_url: str, server, args: argparse.Namespace) -> None:
+    from rate_limiter import TokenBucket
+
+    app, _ = await create_headless_app(base_url)
+    # the per-minute API limit would stretch compressed time; the hourly
+    # refresh budget under test is the scheduler's own
+    app.rate_limiter = TokenBucket(rate=10_000, capacity=10_000)
+    scheduler = app.auto_refresh
+    # compress an hour into args.hour seconds: same budget, scaled intervals
+    scale = args.hour / 3600.0
+    scheduler.spacing = 3600.0 / scheduler.budget_per_hour * scale
+    scheduler.interval = 900.0 * scale
+    scheduler.min_interval = 300.0 * scale
+    scheduler.max_interval = 3600.0 * scale
+
+    sent: list[float] = []
+    refresh = scheduler.refresh
+
+    async def timed_refresh(city: str) -> dict | None:
+        sent.append(time.monotonic())
+        return await refresh(city)
+
+    scheduler.refresh = timed_refresh
+    cities = [f"City {i}" for i in range(args.cities)]
+    app.dashboard_input.value = ", ".join(cities)
+    app.auto_refresh_switch.value = True
+    app.on_dashboard_click(None)
+
+    await asyncio.sleep(args.seconds / 2)
+    scheduler.pause()
+    paused_at = len(sent)
+    await asyncio.sleep(args.hour / 20)
+    paused_refreshes = len(sent) - paused_at
+    scheduler.resume()
+    await asyncio.sleep(args.seconds / 2)
+
+    stats = scheduler.stats()
+    intervals = {scheduler.pinned[key]: value for key, value in scheduler.intervals.items()}
+    await app.close()
+    gaps = [b - a for a, b in zip(sent, sent[1:])]
+    in_window = max(
+        (sum(1 for t in sent if start <= t < start + args.hour) for start in sent),
+        default=0,
+    )
+    print(f"cities={args.cities} budget={scheduler.budget_per_hour}/hour (1 hour = {args.hour:g}s)")
+    print(f"refreshes={stats['refreshes']} reused cache={stats['reused']} failures={stats['failures']}")
+    print(f"max refreshes in any hour={in_window}")
+    if gaps:
+        print(f"min gap between refreshes={min(gaps) / scale:.0f}s (spacing {3600 / scheduler.budget_per_hour:.0f}s)")
+    print(f"refreshes while paused={paused_refreshes}")
+    print("intervals after adapting (scaled back to real seconds):")
+    for city, interval in intervals.items():
+        volatile = zlib.crc32(city.casefold().encode("utf-8")) % 2 == 1
+        print(f"  {city:<10} {interval / scale:6.0f}s {'changing' if volatile else 'steady'}")
+    print(f"server requests={server.state.snapshot()['requests']}")
+
+
+def bench_refresh(args: argparse.Namespace) -> None:
+    # drift is per minute of wall time; convert so each compressed hour
+    # sees args.drift degrees of change on the volatile cities
+    server = start_in_thread(drift=args.drift * 60 / args.hour)
+    os.environ.setdefault("WEATHER_REFRESH_BUDGET_PER_HOUR", str(args.budget))
+    try:
+        asyncio.run(_run_refresh(server.base_url, server, args))
+    finally:
+        server.shutdown()
+
+
+# ---------------- forecast: raw JSON vs typed arrays ----------------
+def bench_forecast(args: argparse.Namespace) -> None:
+    import json
+    import tracemalloc
+
+    from forecast import ForecastCache, ForecastSeries
+    from mock_server import fake_forecast
+
+    bodies = [json.dumps(fake_forecast(f"City {i}")) for i in range(args.cities)]
+
+    tracemalloc.start()
+    raw = [json.loads(body) for body in bodies]
+    raw_bytes = tracemalloc.get_traced_memory()[0]
+    del raw
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    series = [ForecastSeries.parse(json.loads(body)) for body in bodies]
+    series_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for body in bodies:
+        ForecastSeries.parse(json.loads(body))
+    parse_time = (time.perf_counter() - start) / len(bodies)
+
+    def per_slot(convert) -> float:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for item in series:
+                convert(item)
+        return (time.perf_counter() - start) / (args.repeat * len(series))
+
+    def per_value(item: ForecastSeries) -> list[float]:
+        # what converting on every render would cost
+        return [t * 9 / 5 + 32 for t in item.temp_c]
+
+    def fresh_series_conversion(item: ForecastSeries) -> None:
+        item._converted.clear()
+        item.temperatures("imperial")
+
+    per_value_time = per_slot(per_value)
+    whole_series_time = per_slot(fresh_series_conversion)
+    memoized_time = per_slot(lambda item: item.temperatures("imperial"))
+
+    cache = ForecastCache(max_bytes=args.cache_kb * 1024)
+    for i, item in enumerate(series):
+        cache.set(f"City {i}", item)
+
+    print(f"cities={args.cities} slots per city={len(series[0])}")
+    print(f"raw JSON dicts   {raw_bytes / len(bodies) / 1024:7.1f} KiB per city")
+    print(f"typed arrays     {series_bytes / len(bodies) / 1024:7.1f} KiB per city (arrays alone {series[0].nbytes} B)")
+    print(f"parse + json     {parse_time * 1e6:7.1f} us per forecast")
+    print(f"toggle to °F     per value {per_value_time * 1e6:.1f} us, whole series {whole_series_time * 1e6:.1f} us, memoized {memoized_time * 1e6:.2f} us")
+    print(f"cache {args.cache_kb} KiB bound: kept {len(cache)} of {len(series)} series, {cache.nbytes} B")
+
+
+# ---------------- telemetry: overhead off vs on ----------------
+async def _run_telemetry(base_url: str, args: argparse.Namespace) -> None:
+    from rate_limiter import TokenBucket
+
+    app, _ = await create_headless_app(base_url)
+    app.search_debounce = 0
+    app.rate_limiter = TokenBucket(rate=10_000, capacity=10_000)
+    # fill the cache so the timed loops measure the instrumented code, not I/O
+    for i in range(10):
+        await app.fetch_weather(f"City {i}")
+
+    async def searches() -> float:
+        start = time.perf_counter()
+        for i in range(args.searches):
+            await app.load_and_display_weather(f"City {i % 10}")
+        return (time.perf_counter() - start) / args.searches
+
+    app.telemetry.enabled = False
+    off = min([await searches() for _ in range(5)])
+    app.telemetry.enabled = True
+    on = min([await searches() for _ in range(5)])
+
+    # a few uncached searches so the HTTP phases show up
+    for i in range(args.network):
+        await app.load_and_display_weather(f"Fresh {i}")
+    await asyncio.sleep(app.render.frame_window * 2)
+    await app.close()
+
+    print(f"cached search, telemetry off: {off * 1e6:7.1f} us")
+    print(f"cached search, telemetry on:  {on * 1e6:7.1f} us")
+    print()
+    print(app.format_telemetry())
+
+
+def bench_telemetry(args: argparse.Namespace) -> None:
+    server = start_in_thread(latency=0.02)
+    try:
+        asyncio.run(_run_telemetry(server.base_url, args))
+    finally:
+        server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    client = sub.add_parser("client", help="per-request client vs shared pooled client")
+    client.add_argument("--requests", type=int, default=200)
+    client.set_defaults(func=bench_client)
+
+    dashboard = sub.add_parser("dashboard", help="multi-city dashboard end to end")
+    dashboard.add_argument("--cities", type=int, default=60)
+    dashboard.add_argument("--concurrency", type=int, default=8)
+    dashboard.add_argument("--latency", type=float, default=0.2)
+    dashboard.add_argument("--rate-429", type=float, default=0.1)
+    dashboard.add_argument("--rate-per-min", type=int, default=600, help="0 keeps the app default")
+    dashboard.add_argument("--burst", type=int, default=20)
+    dashboard.set_defaults(func=bench_dashboard)
+
+    faults = sub.add_parser("faults", help="tail latency, retries and circuit breaker")
+    faults.add_argument("--requests", type=int, default=300)
+    faults.add_argument("--latency", type=float, default=0.01)
+    faults.add_argument("--rate-5xx", type=float, default=0.05)
+    faults.add_argument("--tail-rate", type=float, default=0.03)
+    faults.add_argument("--tail-latency", type=float, default=1.0)
+    faults.set_defaults(func=bench_faults)
+
+    render = sub.add_parser("render", help="coalesced UI updates per search")
+    render.add_argument("--searches", type=int, default=20)
+    render.set_defaults(func=bench_render)
+
+    refresh = sub.add_parser("refresh", help="background auto-refresh, with time compressed")
+    refresh.add_argument("--cities", type=int, default=6)
+    refresh.add_argument("--budget", type=int, default=60, help="refreshes per hour")
+    refresh.add_argument("--seconds", type=float, default=20, help="how long to run")
+    refresh.add_argument("--hour", type=float, default=4, help="seconds standing in for one hour")
+    refresh.add_argument("--drift", type=float, default=8, help="degrees per hour on changing cities")
+    refresh.set_defaults(func=bench_refresh)
+
+    forecast = sub.add_parser("forecast", help="forecast storage: raw JSON vs typed arrays")
+    forecast.add_argument("--cities", type=int, default=200)
+    forecast.add_argument("--repeat", type=int, default=50)
+    forecast.add_argument("--cache-kb", type=int, default=32)
+    forecast.set_defaults(func=bench_forecast)
+
+    telemetry = sub.add_parser("telemetry", help="telemetry overhead and a sample debug panel")
+    telemetry.add_argument("--searches", type=int, default=200)
+    telemetry.add_argument("--network", type=int, default=20, help="uncached searches to trace")
+    telemetry.set_defaults(func=bench_telemetry)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
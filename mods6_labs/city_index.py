@@ -0,0 +1,124 @@
+"""Offline city-name index for type-ahead suggestions and validation.
+
+Names are kept in one sorted list of folded keys and looked up with
+``bisect``, so a prefix query is a binary search plus a short scan. The
+index loads from ``data/cities.txt.gz`` when it exists and falls back to
+the small ``data/cities_seed.txt`` list. The full list can be built from
+GeoNames (CC BY 4.0) with:
+
+    python city_index.py --download
+"""
+
+import argparse
+import gzip
+import io
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+FULL_LIST = DATA_DIR / "cities.txt.gz"
+SEED_LIST = DATA_DIR / "cities_seed.txt"
+GEONAMES_URL = "https://download.geonames.org/export/dump/cities1000.zip"
+
+# below this many names the list is treated as incomplete, so unknown
+# cities are not rejected in "auto" validation mode
+FULL_LIST_MIN_NAMES = 10_000
+
+
+def fold(name: str) -> str:
+    """Comparison key: case- and accent-insensitive, single-spaced."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.split()).casefold()
+
+
+def default_path() -> Path:
+    return FULL_LIST if FULL_LIST.exists() else SEED_LIST
+
+
+def read_names(path: Path) -> list[str]:
+    """Read one city name per line from a plain or gzip-compressed file."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class CityIndex:
+    """Sorted prefix index over city names."""
+
+    def __init__(self, names: list[str]) -> None:
+        pairs: dict[str, str] = {}
+        for name in names:
+            key = fold(name)
+            # keep the first spelling seen for each folded key
+            pairs.setdefault(key, name)
+        self.keys = sorted(pairs)
+        self.names = [pairs[key] for key in self.keys]
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "CityIndex":
+        return cls(read_names(path or default_path()))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def is_complete(self) -> bool:
+        return len(self.keys) >= FULL_LIST_MIN_NAMES
+
+    def suggest(self, prefix: str, limit: int = 6) -> list[str]:
+        """Up to ``limit`` city names starting with prefix, alphabetically."""
+        key = fold(prefix)
+        if not key:
+            return []
+        start = bisect_left(self.keys, key)
+        results = []
+        for index in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[index].startswith(key):
+                break
+            results.append(self.names[index])
+        return results
+
+    def __contains__(self, city: str) -> bool:
+        # "Manila, PH" style queries are checked by the city part only
+        key = fold(city.split(",")[0])
+        index = bisect_left(self.keys, key)
+        return index < len(self.keys) and self.keys[index] == key
+
+
+def download_geonames(target: Path = FULL_LIST) -> int:
+    """Build the full city list from the GeoNames cities1000 dump."""
+    import urllib.request
+    import zipfile
+
+    with urllib.request.urlopen(GEONAMES_URL, timeout=60) as response:
+        archive = zipfile.ZipFile(io.BytesIO(response.read()))
+    names: set[str] = set()
+    with archive.open("cities1000.txt") as f:
+        for line in io.TextIOWrapper(f, encoding="utf-8"):
+            columns = line.split("\t")
+            if len(columns) > 2:
+                names.add(columns[1])
+                names.add(columns[2])
+    names.discard("")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(target, "wt", encoding="utf-8") as f:
+        f.write("\n".join(sorted(names, key=fold)))
+    return len(names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="City index tools")
+    parser.add_argument("--download", action="store_true", help="build data/cities.txt.gz from GeoNames")
+    parser.add_argument("prefix", nargs="?", help="print suggestions for a prefix")
+    args = parser.parse_args()
+    if args.download:
+        print(f"wrote {download_geonames()} names to {FULL_LIST}")
+    if args.prefix:
+        print(CityIndex.load().suggest(args.prefix))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 import os
 
-from dotenv import load_dotenv
-
 
 def load_config() -> str:
     """Load OpenWeatherMap API key from environment variables."""
+    # imported here so parsing .env stays off the app's import path
+    from dotenv import load_dotenv
+
     load_dotenv()
     api_key = os.getenv("OPENWEATHER_API_KEY", "").strip()
     if not api_key:
@@ -15,4 +16,27 @@ def load_config() -> str:
     return api_key
 
 
+def get_base_url(default: str) -> str:
+    """OpenWeatherMap endpoint, overridable to point at a local stand-in server."""
+    return os.getenv("OPENWEATHER_BASE_URL", "").strip() or default
+
+
+def get_float(name: str, default: float) -> float:
+    """Read a numeric setting from the environment, falling back to default."""
+    try:
+        return float(os.getenv(name, ""))
+    except ValueError:
+        return default
+
+
+def get_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back to default."""
+    try:
+        return int(os.getenv(name, ""))
+    except ValueError:
+        return default
+
 
+def get_str(name: str, default: str = "") -> str:
+    """Read a string setting from the environment, falling back to default."""
+    return os.getenv(name, "").strip() or default
@@ -0,0 +1,145 @@
+import time
+from array import array
+from collections import OrderedDict
+
+from weather_cache import normalize_city
+
+
+def forecast_url(weather_url: str) -> str:
+    """The 3-hourly forecast endpoint next to a ``.../weather`` endpoint."""
+    base, _, last = weather_url.rstrip("/").rpartition("/")
+    return f"{base}/forecast" if last == "weather" else f"{weather_url.rstrip('/')}/forecast"
+
+
+def celsius_to_fahrenheit(values: array) -> array:
+    """Convert a whole series at once, keeping the compact float32 storage."""
+    return array("f", [v * 1.8 + 32 for v in values])
+
+
+class ForecastSeries:
+    """3-hourly forecast for one city stored as parallel typed arrays.
+
+    Temperatures are kept in canonical Celsius; ``temperatures(unit)``
+    converts the whole series once per unit and keeps the result, so
+    toggling units never refetches or re-parses.
+    """
+
+    __slots__ = ("city", "timezone", "timestamps", "temp_c", "humidity", "wind", "_converted")
+
+    def __init__(self, city: str = "", timezone: int = 0) -> None:
+        self.city = city
+        # offset from UTC in seconds, used to group slots by local day
+        self.timezone = timezone
+        self.timestamps = array("I")  # unix seconds
+        self.temp_c = array("f")
+        self.humidity = array("B")  # percent
+        self.wind = array("f")  # m/s
+        self._converted: dict[str, array] = {}
+
+    @classmethod
+    def parse(cls, payload: dict) -> "ForecastSeries":
+        """Build a series from a /forecast response in a single pass."""
+        city = payload.get("city") or {}
+        series = cls(str(city.get("name", "")), int(city.get("timezone") or 0))
+        timestamps, temp_c = series.timestamps, series.temp_c
+        humidity, wind = series.humidity, series.wind
+        for slot in payload.get("list") or ():
+            main = slot.get("main") or {}
+            temp = main.get("temp")
+            if temp is None or "dt" not in slot:
+                continue
+            timestamps.append(int(slot["dt"]))
+            temp_c.append(float(temp))
+            humidity.append(min(100, max(0, int(main.get("humidity") or 0))))
+            wind.append(float((slot.get("wind") or {}).get("speed") or 0.0))
+        return series
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays, including converted copies."""
+        arrays = (self.timestamps, self.temp_c, self.humidity, self.wind, *self._converted.values())
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def temperatures(self, unit: str = "metric") -> array:
+        if unit == "metric":
+            return self.temp_c
+        converted = self._converted.get(unit)
+        if converted is None:
+            converted = self._converted[unit] = celsius_to_fahrenheit(self.temp_c)
+        return converted
+
+    def daily(self, unit: str = "metric") -> list[tuple[int, float, float, int, float]]:
+        """Per local day: (day start as unix time, min, max, mean humidity, max wind)."""
+        temps = self.temperatures(unit)
+        days: list[tuple[int, float, float, int, float]] = []
+        start = 0
+        count = len(self.timestamps)
+        while start < count:
+            day = (self.timestamps[start] + self.timezone) // 86400
+            end = start + 1
+            while end < count and (self.timestamps[end] + self.timezone) // 86400 == day:
+                end += 1
+            day_temps = temps[start:end]
+            days.append(
+                (
+                    day * 86400 - self.timezone,
+                    min(day_temps),
+                    max(day_temps),
+                    round(sum(self.humidity[start:end]) / (end - start)),
+                    max(self.wind[start:end]),
+                )
+            )
+            start = end
+        return days
+
+
+class ForecastCache:
+    """LRU cache of forecast series bounded by the memory they use.
+
+    Entries expire after ``ttl`` seconds. When the series together hold
+    more than ``max_bytes``, the least recently used ones are dropped.
+    """
+
+    def __init__(self, ttl: float = 1800.0, max_bytes: int = 256 * 1024) -> None:
+        self.ttl = ttl
+        self.max_bytes = max(1, max_bytes)
+        # normalized city -> (fetched_at, series), least recently used first
+        self._entries: OrderedDict[str, tuple[float, ForecastSeries]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(series.nbytes for _, series in self._entries.values())
+
+    def get(self, city: str) -> ForecastSeries | None:
+        key = normalize_city(city)
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, city: str, series: ForecastSeries) -> None:
+        key = normalize_city(city)
+        self._entries[key] = (time.time(), series)
+        self._entries.move_to_end(key)
+        self.trim()
+
+    def trim(self) -> None:
+        """Drop least recently used series until under ``max_bytes``.
+
+        Also called after unit conversions, which add a converted copy.
+        """
+        total = self.nbytes
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, (_, series) = self._entries.popitem(last=False)
+            total -= series.nbytes
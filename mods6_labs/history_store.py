@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from weather_cache import normalize_city
+
+
+class SearchHistory:
+    """Bounded search history with frequency-weighted ranking.
+
+    Keeps at most ``capacity`` cities; adding one more drops the least
+    recently searched city, like a ring buffer. Cities are ranked by a
+    score that grows with every search and halves every ``half_life``
+    seconds, so frequent and recent searches come first.
+
+    Saving is asynchronous: ``add`` only schedules a write, and all
+    changes within ``flush_delay`` seconds go out as one atomic file write
+    on a worker thread. ``run_task`` starts that write on the event loop;
+    pass ``page.run_task`` since Flet runs sync handlers on other threads.
+    ``entries`` is shared with those threads; hold ``_lock`` to touch it.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        capacity: int = 10,
+        half_life: float = 7 * 86400.0,
+        flush_delay: float = 1.0,
+        run_task: Callable[[Callable[[], Awaitable[Any]]], Any] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.capacity = max(1, capacity)
+        self.half_life = half_life
+        self.flush_delay = flush_delay
+        # key -> {"city", "count", "score", "last_used"}, oldest first
+        self.entries: OrderedDict[str, dict] = OrderedDict()
+        self.run_task = run_task
+        self._save_pending = False
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.entries)
+
+    def _decayed(self, entry: dict, now: float) -> float:
+        elapsed = max(0.0, now - entry["last_used"])
+        return entry["score"] * 0.5 ** (elapsed / self.half_life)
+
+    def add(self, city: str) -> None:
+        city = " ".join(city.split())
+        if not city:
+            return
+        now = time.time()
+        key = normalize_city(city)
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                entry = {"city": city, "count": 0, "score": 0.0, "last_used": now}
+            entry["city"] = city
+            entry["count"] += 1
+            entry["score"] = self._decayed(entry, now) + 1.0
+            entry["last_used"] = now
+            self.entries[key] = entry
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        self.schedule_save()
+
+    def ranked(self) -> list[str]:
+        """Cities ordered by decayed score, most recent first on ties."""
+        now = time.time()
+        with self._lock:
+            entries = [dict(entry) for entry in self.entries.values()]
+        items = sorted(
+            entries,
+            key=lambda e: (self._decayed(e, now), e["last_used"]),
+            reverse=True,
+        )
+        return [e["city"] for e in items]
+
+    # ---------------- Persistence ----------------
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        if not isinstance(data, list):
+            return
+        now = time.time()
+        # file is stored oldest first; older versions stored plain names,
+        # most recent first
+        if all(isinstance(item, str) for item in data):
+            data = [{"city": c, "last_used": now - i} for i, c in reversed(list(enumerate(data)))]
+        loaded: OrderedDict[str, dict] = OrderedDict()
+        for item in data[-self.capacity :]:
+            if not isinstance(item, dict) or not str(item.get("city", "")).strip():
+                continue
+            city = str(item["city"]).strip()
+            loaded[normalize_city(city)] = {
+                "city": city,
+                "count": int(item.get("count", 1)),
+                "score": float(item.get("score", 1.0)),
+                "last_used": float(item.get("last_used", now)),
+            }
+        with self._lock:
+            self.entries.update(loaded)
+
+    def schedule_save(self) -> None:
+        """Coalesce saves: one write per ``flush_delay`` window at most."""
+        with self._lock:
+            if self._save_pending:
+                return
+            if self.run_task is not None:
+                self._save_pending = True
+        if self.run_task is None:
+            # no event loop to hand off to (e.g. scripts): write straight away
+            self._write(self.snapshot())
+            return
+        self.run_task(self._delayed_save)
+
+    async def _delayed_save(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write pending changes now, e.g. before the app closes."""
+        with self._lock:
+            if not self._save_pending:
+                return
+            self._save_pending = False
+        await asyncio.to_thread(self._write, self.snapshot())
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return [dict(entry) for entry in self.entries.values()]
+
+    def _write(self, payload: list[dict]) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self.writes += 1
+        except Exception:
+            # silently ignore file write issues for this simple app
+            pass
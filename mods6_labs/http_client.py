@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import importlib.util
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_MAX_KEEPALIVE = 5
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+
+def http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional ``h2`` package (``httpx[http2]``)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_async_client(
+    http2: bool = False,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> httpx.AsyncClient:
+    """Build the long-lived client the app reuses for every API call.
+
+    Keeping one client open lets httpx reuse TCP/TLS connections between
+    searches instead of doing a fresh handshake for each request. HTTP/2 is
+    only enabled when asked for and ``h2`` is installed.
+    """
+    import httpx
+
+    return httpx.AsyncClient(
+        http2=http2 and http2_available(),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(timeout, connect=min(timeout, DEFAULT_CONNECT_TIMEOUT)),
+    )
@@ -0,0 +1,112 @@
+"""Local cache for the small, fixed set of OpenWeatherMap condition icons.
+
+Icons are stored under ``assets/icons`` and served by Flet as local assets,
+so rendering a result does not make the client download an image. Run this
+file directly to download every icon once, e.g. before bundling the app for
+offline use:
+
+    python icon_cache.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+
+
+ASSETS_DIR = Path(__file__).resolve().parent / "assets"
+ICON_BASE_URL = "https://openweathermap.org/img/wn"
+ICON_CODES = [
+    f"{number}{time_of_day}"
+    for number in ("01", "02", "03", "04", "09", "10", "11", "13", "50")
+    for time_of_day in ("d", "n")
+]
+
+
+class IconCache:
+    """Serve weather icons from disk, downloading missing ones on demand.
+
+    In bundled mode nothing is ever downloaded: icons shipped in the assets
+    folder are used and missing ones render as no image.
+    """
+
+    def __init__(
+        self,
+        assets_dir: Path = ASSETS_DIR,
+        base_url: str = ICON_BASE_URL,
+        bundled: bool = False,
+    ) -> None:
+        self.assets_dir = Path(assets_dir)
+        self.icon_dir = self.assets_dir / "icons"
+        self.base_url = base_url.rstrip("/")
+        self.bundled = bundled
+        self._available: set[str] = set()
+        if self.icon_dir.is_dir():
+            self._available = {path.name for path in self.icon_dir.glob("*.png")}
+
+    @staticmethod
+    def filename(code: str) -> str:
+        return f"{code}@2x.png"
+
+    def is_cached(self, code: str) -> bool:
+        return self.filename(code) in self._available
+
+    def remote_url(self, code: str) -> str:
+        return f"{self.base_url}/{self.filename(code)}"
+
+    def src(self, code: str) -> str:
+        """Image source for an icon code: local asset if cached, else remote."""
+        if not code:
+            return ""
+        if self.is_cached(code):
+            return f"/icons/{self.filename(code)}"
+        return "" if self.bundled else self.remote_url(code)
+
+    async def fetch(self, client: httpx.AsyncClient, code: str) -> bool:
+        """Download one icon into the cache. Returns True if it is now cached."""
+        import httpx
+
+        if self.is_cached(code):
+            return True
+        if self.bundled:
+            return False
+        try:
+            response = await client.get(self.remote_url(code))
+            response.raise_for_status()
+        except httpx.HTTPError:
+            return False
+        await asyncio.to_thread(self._write, self.filename(code), response.content)
+        self._available.add(self.filename(code))
+        return True
+
+    def _write(self, name: str, content: bytes) -> None:
+        self.icon_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.icon_dir / (name + ".tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, self.icon_dir / name)
+
+    async def prefetch(self, client: httpx.AsyncClient, codes: list[str] | None = None) -> int:
+        """Download every missing icon concurrently. Returns how many are cached."""
+        codes = codes or ICON_CODES
+        missing = [code for code in codes if not self.is_cached(code)]
+        if missing and not self.bundled:
+            await asyncio.gather(*(self.fetch(client, code) for code in missing))
+        return sum(1 for code in codes if self.is_cached(code))
+
+
+async def _download_all() -> None:
+    import httpx
+
+    cache = IconCache()
+    async with httpx.AsyncClient(timeout=10) as client:
+        count = await cache.prefetch(client)
+    print(f"{count}/{len(ICON_CODES)} icons cached in {cache.icon_dir}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_download_all())
@@ -0,0 +1,156 @@
+import asyncio
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+def nearest_rank(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0-100) of non-empty, sorted samples.
+
+    The one definition shared by timeouts, the telemetry panel and the
+    benchmarks, so they all report the same p95 for the same samples.
+    """
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit breaker is open."""
+
+
+class LatencyTracker:
+    """Rolling window of request durations used to derive timeouts.
+
+    Until ``min_samples`` requests have been seen the default timeout is
+    used and no hedge delay is suggested.
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        min_samples: int = 20,
+        default_timeout: float = 10.0,
+        min_timeout: float = 2.0,
+        max_timeout: float = 10.0,
+        timeout_multiplier: float = 3.0,
+    ) -> None:
+        self.samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        if not self.samples:
+            return None
+        return nearest_rank(sorted(self.samples), pct)
+
+    def timeout(self) -> float:
+        """Request timeout: a multiple of observed p99, kept within bounds."""
+        if len(self.samples) < self.min_samples:
+            return self.default_timeout
+        p99 = self.percentile(99) or self.default_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self) -> float | None:
+        """How long to wait before hedging: observed p95, once known."""
+        if len(self.samples) < self.min_samples:
+            return None
+        return self.percentile(95)
+
+
+class CircuitBreaker:
+    """Fail fast after repeated upstream failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    ``allow()`` returns False for ``reset_timeout`` seconds. Then one trial
+    call is let through (half-open): success closes the circuit again,
+    failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial_started: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+        # half-open: one trial at a time; a trial that never reported back
+        # (e.g. it was cancelled) stops blocking after another reset_timeout
+        now = time.monotonic()
+        if self.trial_started is None or now - self.trial_started >= self.reset_timeout:
+            self.trial_started = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.trial_started is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.trial_started = None
+
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 2.0) -> float:
+    """Exponential backoff with full jitter for retry number ``attempt``."""
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+async def hedged(
+    fn: Callable[[], Awaitable[Any]],
+    delay: float | None,
+    allow_hedge: Callable[[], bool] = lambda: True,
+) -> Any:
+    """Run fn; if it has not finished after ``delay`` seconds, start a second
+    copy and return whichever succeeds first.
+
+    ``allow_hedge`` is checked before the second copy starts, e.g. to make
+    sure the rate-limit budget has room for it.
+    """
+    first = asyncio.ensure_future(fn())
+    tasks = [first]
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if not done and allow_hedge():
+                tasks.append(asyncio.ensure_future(fn()))
+        if len(tasks) == 1:
+            return await first
+
+        pending = set(tasks)
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,154 @@
+"""Concurrent load test for WeatherApp against mock_server.py.
+
+Simulated users call ``fetch_weather`` (the data path) or
+``load_and_display_weather`` (the full search path including the UI
+update) in a loop for a fixed time, with no API key or network needed:
+
+    python load_test.py --users 20 --seconds 10
+    python load_test.py --mode display --latency 0.1 --rate-429 0.05
+    python load_test.py --cache-ttl 0 --json no-cache.json
+
+The report gives p50/p95/p99 latency, throughput and the error rate per
+kind of error, plus cache and server counters; ``--json`` saves it so runs
+before and after a change can be compared.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+
+from bench import create_headless_app, percentile
+from mock_server import MISSING_CITIES, start_in_thread
+
+
+def classify(error: BaseException) -> str:
+    """Short error kind for the report."""
+    import httpx
+
+    if isinstance(error, ValueError):
+        return "not_found"
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "network"
+    return type(error).__name__
+
+
+async def _user(app, args: argparse.Namespace, deadline: float, results: list, rng: random.Random) -> None:
+    cities = [f"City {i}" for i in range(args.cities)]
+    missing = sorted(MISSING_CITIES)
+    while time.perf_counter() < deadline:
+        city = rng.choice(missing) if rng.random() < args.missing else rng.choice(cities)
+        start = time.perf_counter()
+        outcome = "ok"
+        if args.mode == "fetch":
+            try:
+                await app.fetch_weather(city)
+            except Exception as err:
+                outcome = classify(err)
+        else:
+            await app.load_and_display_weather(city)
+            # the status is set before the call returns, with no await in
+            # between, so it belongs to this call even under concurrency
+            if app.status_text.value != "Weather loaded successfully.":
+                outcome = app.status_text.value or "no_status"
+        results.append((time.perf_counter() - start, outcome))
+        # cache hits never await; yield so other users get a turn
+        await asyncio.sleep(args.think)
+
+
+async def run_load(base_url: str, server, args: argparse.Namespace) -> dict:
+    from rate_limiter import TokenBucket
+
+    app, _ = await create_headless_app(base_url)
+    if args.rate_per_min:
+        app.rate_limiter = TokenBucket.per_minute(args.rate_per_min, args.burst)
+    if args.debounce is not None:
+        app.search_debounce = args.debounce
+
+    rng = random.Random(args.seed)
+    results: list[tuple[float, str]] = []
+    server.state.reset()
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    await asyncio.gather(
+        *(_user(app, args, deadline, results, random.Random(rng.random())) for _ in range(args.users))
+    )
+    elapsed = time.perf_counter() - start
+    await app.close()
+
+    latencies = [seconds * 1000 for seconds, _ in results]
+    outcomes = Counter(outcome for _, outcome in results)
+    errors = {kind: count for kind, count in outcomes.items() if kind != "ok"}
+    lookups = app.weather_cache.hits + app.weather_cache.misses
+    return {
+        "mode": args.mode,
+        "users": args.users,
+        "seconds": round(elapsed, 2),
+        "calls": len(results),
+        "throughput_per_s": round(len(results) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "error_rate": round(sum(errors.values()) / max(1, len(results)), 4),
+        "errors": errors,
+        "cache_hit_ratio": round(app.weather_cache.hits / lookups, 4) if lookups else None,
+        "server": server.state.snapshot() | {"by_city": None},
+    }
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"mode={report['mode']} users={report['users']} "
+        f"calls={report['calls']} in {report['seconds']}s "
+        f"-> {report['throughput_per_s']}/s"
+    )
+    print(f"latency p50={report['p50_ms']}ms p95={report['p95_ms']}ms p99={report['p99_ms']}ms")
+    print(f"error rate={report['error_rate']:.2%} {report['errors'] or ''}")
+    server = report["server"]
+    print(
+        f"cache hit ratio={report['cache_hit_ratio']} "
+        f"server requests={server['requests']} (429s: {server['rate_limited']})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["fetch", "display"], default="fetch")
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated users")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--think", type=float, default=0.0, help="pause between a user's calls")
+    parser.add_argument("--cities", type=int, default=50, help="distinct cities to pick from")
+    parser.add_argument("--missing", type=float, default=0.02, help="share of lookups for unknown cities")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--cache-ttl", type=float, help="override WEATHER_CACHE_TTL (0 disables caching)")
+    parser.add_argument("--rate-per-min", type=int, default=60_000, help="0 keeps the app default")
+    parser.add_argument("--burst", type=int, default=1_000)
+    parser.add_argument("--debounce", type=float, default=0.0, help="search debounce for display mode")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    if args.cache_ttl is not None:
+        os.environ["WEATHER_CACHE_TTL"] = str(args.cache_ttl)
+    server = start_in_thread(latency=args.latency, jitter=args.jitter, rate_429=args.rate_429)
+    try:
+        report = asyncio.run(run_load(server.base_url, server, args))
+    finally:
+        server.shutdown()
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
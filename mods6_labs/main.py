@@ -1,27 +1,122 @@
-import json
+from __future__ import annotations
+
+import asyncio
+import time
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import flet as ft
-import httpx
 
-from config import load_config
+from auto_refresh import RefreshScheduler
+from config import get_base_url, get_float, get_int, get_str, load_config
+from forecast import ForecastCache, ForecastSeries, forecast_url
+from history_store import SearchHistory
+from icon_cache import ASSETS_DIR, ICON_BASE_URL, IconCache
+from latency import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    backoff_delay,
+    hedged,
+)
+from rate_limiter import TokenBucket, retry_after_seconds
+from render_scheduler import RenderScheduler
+from singleflight import SingleFlight
+from telemetry import Telemetry
+from weather_cache import WeatherCache, normalize_city
+
+if TYPE_CHECKING:
+    import httpx
+
+    from city_index import CityIndex
 
 
 OPENWEATHER_BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
+MAX_ATTEMPTS = 3
+
+
+def format_age(seconds: float) -> str:
+    """Human-friendly age such as "just now" or "5 min ago"."""
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} h ago"
+    return f"{int(seconds // 86400)} days ago"
+
+
+def parse_city_list(text: str) -> list[str]:
+    """Split a comma-separated city list, dropping blanks and duplicates."""
+    cities: list[str] = []
+    seen: set[str] = set()
+    for part in text.split(","):
+        city = " ".join(part.split())
+        key = normalize_city(city)
+        if city and key not in seen:
+            seen.add(key)
+            cities.append(city)
+    return cities
 
 
 class WeatherApp:
     def __init__(self, page: ft.Page) -> None:
+        """Build and show the UI.
+
+        Loading ``.env``, settings, the cache and history files and the
+        network stack is left to ``start``, which runs after the first
+        frame has been drawn.
+        """
+        init_started = time.perf_counter()
         self.page = page
-        self.api_key = load_config()
+        self.startup_timings: dict[str, float] = {}
+        self.ready = asyncio.Event()
+        self.config_error = ""
+
+        # rolling timing samples, only recorded while the debug panel is
+        # open (Ctrl+Shift+D) or WEATHER_TELEMETRY=1
+        self.telemetry = Telemetry()
+
+        # batches UI refreshes into one page update per frame window
+        self.render = RenderScheduler(
+            self.page, on_update=partial(self.telemetry.record, "page.update")
+        )
+
+        # one pooled HTTP client for the whole session, created on first use
+        self.http_client: httpx.AsyncClient | None = None
+
+        # request coalescing and "latest search wins" state
+        self.inflight = SingleFlight()
+        self.search_generation = 0
+        self.search_task = None
+
+        # offline city index for type-ahead and validation, loaded in the
+        # background once startup has finished
+        self.city_index: CityIndex | None = None
+
+        # 5-day forecast for the displayed city, loaded after current weather
+        self.forecast_task = None
+        self.forecast_series: ForecastSeries | None = None
+
+        # background refresh of pinned (dashboard) cities, set up in start()
+        self.auto_refresh: RefreshScheduler | None = None
+        self.auto_refresh_task = None
+        self.displayed_city = ""
+
+        # multi-city dashboard state
+        self.dashboard_task = None
+        self.dashboard_rows: dict[str, ft.Text] = {}
+        self.dashboard_data: dict[str, tuple[str, dict]] = {}
 
         # temperature unit state
         self.current_unit = "metric"  # or "imperial"
         self.current_temp_c: float | None = None
 
-        # search history state
+        # search history state: bounded, frequency-ranked, saved in the
+        # background; the file is read in start()
         self.history_file = Path("search_history.json")
-        self.search_history: list[str] = self.load_history()
+        self.history = SearchHistory(self.history_file, run_task=self.page.run_task)
 
         self.city_input = ft.TextField(
             label="City",
@@ -29,10 +124,12 @@ class WeatherApp:
             autofocus=True,
             expand=True,
             on_submit=self.on_search_click,
+            on_change=self.on_city_input_change,
         )
+        self.suggestions = ft.Column(spacing=0, visible=False)
         self.search_button = ft.ElevatedButton(
             text="Search",
-            icon=ft.icons.SEARCH,
+            icon=ft.Icons.SEARCH,
             on_click=self.on_search_click,
         )
 
@@ -45,12 +142,12 @@ class WeatherApp:
         self.history_dropdown = ft.Dropdown(
             label="Recent cities",
             hint_text="Select from history",
-            options=[ft.dropdown.Option(city) for city in self.search_history],
+            options=[],
             on_change=self.on_history_change,
             width=250,
         )
 
-        self.status_text = ft.Text("", color=ft.colors.RED_400)
+        self.status_text = ft.Text("", color=ft.Colors.RED_400)
 
         self.weather_icon = ft.Image(height=80, width=80)
         self.temperature_text = ft.Text(size=32, weight=ft.FontWeight.BOLD)
@@ -77,11 +174,66 @@ class WeatherApp:
             elevation=4,
         )
 
+        self.forecast_row = ft.Row(
+            spacing=8,
+            alignment=ft.MainAxisAlignment.CENTER,
+            scroll=ft.ScrollMode.AUTO,
+        )
+        self.forecast_status = ft.Text("", size=12, color=ft.Colors.GREY)
+
+        self.debug_text = ft.Text("", size=11, font_family="monospace", selectable=True)
+        self.debug_panel = ft.Container(
+            content=ft.Column(
+                [
+                    ft.Text("Debug telemetry", weight=ft.FontWeight.BOLD),
+                    self.debug_text,
+                    ft.Row(
+                        [
+                            ft.TextButton("Export JSON", on_click=self.on_export_telemetry),
+                            ft.TextButton("Clear", on_click=self.on_clear_telemetry),
+                        ]
+                    ),
+                ],
+                spacing=4,
+            ),
+            padding=10,
+            border_radius=8,
+            bgcolor=ft.Colors.GREY_100,
+            visible=False,
+        )
+        self.debug_task = None
+
+        self.dashboard_input = ft.TextField(
+            label="Dashboard cities",
+            hint_text="Comma-separated, e.g. Manila, Cebu, Tokyo",
+            expand=True,
+            on_submit=self.on_dashboard_click,
+        )
+        self.dashboard_button = ft.ElevatedButton(
+            text="Load all",
+            icon=ft.Icons.DASHBOARD,
+            on_click=self.on_dashboard_click,
+        )
+        self.dashboard_status = ft.Text("", size=12, color=ft.Colors.GREY)
+        self.auto_refresh_switch = ft.Switch(
+            label="Auto-refresh",
+            value=False,
+            on_change=self.on_auto_refresh_change,
+        )
+        self.dashboard_list = ft.ListView(spacing=4, height=250)
+
         self.page.title = "Weather Application - CCCS 106"
         self.page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
         self.page.vertical_alignment = ft.MainAxisAlignment.START
         self.page.theme_mode = ft.ThemeMode.LIGHT
 
+        # release pooled connections when the session or window goes away
+        self.page.on_disconnect = self.on_disconnect
+        self.page.window.prevent_close = True
+        self.page.window.on_event = self.on_window_event
+        self.page.on_app_lifecycle_state_change = self.on_lifecycle_change
+        self.page.on_keyboard_event = self.on_keyboard
+
         self.page.add(
             ft.Container(
                 content=ft.Column(
@@ -94,12 +246,13 @@ class WeatherApp:
                         ft.Text(
                             "Search for a city to see the current weather.",
                             size=14,
-                            color=ft.colors.GREY,
+                            color=ft.Colors.GREY,
                         ),
                         ft.Row(
                             controls=[self.city_input, self.search_button],
                             alignment=ft.MainAxisAlignment.CENTER,
                         ),
+                        self.suggestions,
                         ft.Row(
                             controls=[self.unit_switch, self.history_dropdown],
                             alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
@@ -109,6 +262,29 @@ class WeatherApp:
                             alignment=ft.MainAxisAlignment.START,
                         ),
                         self.content_card,
+                        ft.Text(
+                            "5-day Forecast",
+                            size=18,
+                            weight=ft.FontWeight.BOLD,
+                        ),
+                        self.forecast_status,
+                        self.forecast_row,
+                        ft.Divider(),
+                        ft.Text(
+                            "Multi-city Dashboard",
+                            size=18,
+                            weight=ft.FontWeight.BOLD,
+                        ),
+                        ft.Row(
+                            controls=[self.dashboard_input, self.dashboard_button],
+                            alignment=ft.MainAxisAlignment.CENTER,
+                        ),
+                        ft.Row(
+                            controls=[self.dashboard_status, self.auto_refresh_switch],
+                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                        ),
+                        self.dashboard_list,
+                        self.debug_panel,
                     ],
                     spacing=15,
                     expand=False,
@@ -118,107 +294,666 @@ class WeatherApp:
             )
         )
 
-    # ---------------- History handling ----------------
-    def load_history(self) -> list[str]:
-        if self.history_file.exists():
-            try:
-                with self.history_file.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        return [str(c) for c in data][:10]
-            except Exception:
-                return []
-        return []
-
-    def save_history(self) -> None:
+        self.startup_timings["first_frame"] = time.perf_counter() - init_started
+        self.page.run_task(self.start, init_started)
+
+    # ---------------- Deferred startup ----------------
+    async def start(self, init_started: float) -> None:
+        """Finish startup after the first frame.
+
+        Settings and files are read on a worker thread; the icon prefetch
+        and the city index follow in the background.
+        """
         try:
-            with self.history_file.open("w", encoding="utf-8") as f:
-                json.dump(self.search_history, f, ensure_ascii=False, indent=2)
-        except Exception:
-            # silently ignore file write issues for this simple app
-            pass
+            await asyncio.to_thread(self.configure)
+        except RuntimeError as err:
+            # missing API key: keep the UI up and explain what to do
+            self.config_error = str(err)
+            self.show_error(self.config_error)
+            return
+        finally:
+            self.ready.set()
+            self.startup_timings["ready"] = time.perf_counter() - init_started
+
+        self.sync_history_dropdown()
+        self.render.request(self.history_dropdown)
+
+        if not self.icon_cache.bundled:
+            self.page.run_task(self.prefetch_icons)
+        self.page.run_task(self.load_city_index)
+
+        self.auto_refresh_task = self.page.run_task(self.auto_refresh.run)
+        pinned = parse_city_list(get_str("WEATHER_PINNED_CITIES"))
+        if pinned:
+            # status-screen mode: show and keep refreshing these cities
+            self.dashboard_input.value = ", ".join(pinned)
+            self.auto_refresh_switch.value = True
+            self.render.request(self.dashboard_input, self.auto_refresh_switch)
+            self.on_dashboard_click(None)
+
+    def configure(self) -> None:
+        """Load ``.env`` and set up everything that depends on settings."""
+        self.api_key = load_config()
+        self.render.frame_window = get_float("WEATHER_RENDER_FRAME", 0.016)
+        self.base_url = get_base_url(OPENWEATHER_BASE_URL)
+
+        # weather response cache: TTL in seconds, LRU size, JSON file
+        # ("off" disables persistence). Expired entries double as the
+        # last-known weather shown while refreshing or offline.
+        cache_file = get_str("WEATHER_CACHE_FILE", "weather_cache.json")
+        self.weather_cache = WeatherCache(
+            ttl=get_float("WEATHER_CACHE_TTL", 600.0),
+            max_entries=get_int("WEATHER_CACHE_SIZE", 50),
+            path=None if cache_file.lower() == "off" else Path(cache_file),
+            run_task=self.page.run_task,
+        )
+        self.max_stale_age = get_float("WEATHER_MAX_STALE_AGE", 7 * 86400.0)
+
+        # forecasts are kept as compact arrays, bounded by memory used
+        self.forecast_url = forecast_url(self.base_url)
+        self.forecast_cache = ForecastCache(
+            ttl=get_float("WEATHER_FORECAST_TTL", 1800.0),
+            max_bytes=get_int("WEATHER_FORECAST_CACHE_KB", 256) * 1024,
+        )
+        self.search_debounce = get_float("WEATHER_SEARCH_DEBOUNCE", 0.25)
+
+        # client-side budget shared by every API call (free tier: 60/min)
+        self.rate_limiter = TokenBucket.per_minute(
+            get_int("WEATHER_RATE_LIMIT_PER_MIN", 60),
+            get_int("WEATHER_RATE_BURST", 10),
+        )
+
+        # tail-latency control: adaptive timeouts from observed latency,
+        # optional hedged requests and a circuit breaker for outages
+        self.latency = LatencyTracker(
+            min_timeout=get_float("WEATHER_TIMEOUT_MIN", 2.0),
+            max_timeout=get_float("WEATHER_TIMEOUT_MAX", 10.0),
+        )
+        self.hedge_requests = get_str("WEATHER_HEDGE_REQUESTS") == "1"
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=get_int("WEATHER_BREAKER_FAILURES", 5),
+            reset_timeout=get_float("WEATHER_BREAKER_RESET", 30.0),
+        )
+
+        # weather icons served as local assets and prefetched in the background;
+        # bundled mode never downloads, for fully offline rendering
+        self.icon_cache = IconCache(
+            base_url=get_str("WEATHER_ICON_BASE_URL", ICON_BASE_URL),
+            bundled=get_str("WEATHER_ICONS_BUNDLED") == "1",
+        )
+
+        # "auto" only rejects unknown cities once the full list is loaded
+        self.city_validation = get_str("WEATHER_CITY_VALIDATION", "auto").lower()
+        self.dashboard_concurrency = get_int("WEATHER_DASHBOARD_CONCURRENCY", 8)
+
+        # pinned cities are refreshed in the background within an hourly
+        # request budget, more often while their weather is changing
+        self.auto_refresh = RefreshScheduler(
+            refresh=self.refresh_pinned_city,
+            age=self.weather_cache.age,
+            budget_per_hour=get_int("WEATHER_REFRESH_BUDGET_PER_HOUR", 60),
+            interval=get_float("WEATHER_REFRESH_INTERVAL", 900.0),
+            min_interval=get_float("WEATHER_REFRESH_MIN", 300.0),
+            max_interval=get_float("WEATHER_REFRESH_MAX", 3600.0),
+        )
+
+        self.telemetry.enabled = get_str("WEATHER_TELEMETRY") == "1"
+
+        self.history.capacity = max(1, get_int("WEATHER_HISTORY_SIZE", 10))
+        self.history.load()
 
+    def check_ready(self) -> bool:
+        """Return True once startup is done, otherwise explain why not."""
+        if self.ready.is_set() and not self.config_error:
+            return True
+        self.show_error(self.config_error or "Still starting up, please try again.")
+        return False
+
+    async def prefetch_icons(self) -> None:
+        """Download any weather icons that are not cached on disk yet."""
+        await self.icon_cache.prefetch(self.get_http_client())
+
+    # ---------------- City autocomplete ----------------
+    async def load_city_index(self) -> None:
+        """Build the city index off the event loop so startup stays fast."""
+        from city_index import CityIndex
+
+        try:
+            self.city_index = await asyncio.to_thread(CityIndex.load)
+        except OSError:
+            self.city_index = None
+
+    def on_city_input_change(self, e: ft.ControlEvent) -> None:
+        """Show type-ahead suggestions for the text typed so far."""
+        text = self.city_input.value or ""
+        names = self.city_index.suggest(text) if self.city_index else []
+        if len(names) == 1 and names[0].casefold() == text.strip().casefold():
+            names = []
+        self.suggestions.controls = [
+            ft.TextButton(text=name, on_click=lambda _, n=name: self.on_suggestion_click(n))
+            for name in names
+        ]
+        self.suggestions.visible = bool(names)
+        self.render.request(self.suggestions)
+
+    def on_suggestion_click(self, city: str) -> None:
+        self.city_input.value = city
+        self.on_search_click(None)
+
+    def hide_suggestions(self) -> None:
+        self.suggestions.controls = []
+        self.suggestions.visible = False
+
+    def is_known_city(self, city: str) -> bool:
+        """Whether a search for city should go to the network at all."""
+        if self.city_index is None or self.city_validation == "off":
+            return True
+        if self.city_validation == "auto" and not self.city_index.is_complete:
+            return True
+        return city in self.city_index
+
+    # ---------------- History handling ----------------
     def add_to_history(self, city: str) -> None:
-        city = city.strip()
-        if not city:
-            return
-        if city in self.search_history:
-            self.search_history.remove(city)
-        self.search_history.insert(0, city)
-        self.search_history = self.search_history[:10]
-        self.save_history()
-
-        self.history_dropdown.options = [
-            ft.dropdown.Option(c) for c in self.search_history
+        """Record a search; the file write happens later in the background."""
+        self.history.add(city)
+        self.sync_history_dropdown()
+
+    def sync_history_dropdown(self) -> None:
+        """Reorder dropdown options to match the ranking, reusing existing ones.
+
+        Only new cities get a fresh Option, so the page diff is a reorder
+        rather than a full replacement. The caller updates the page.
+        """
+        existing = {option.key: option for option in self.history_dropdown.options}
+        self.history_dropdown.options[:] = [
+            existing.get(city) or ft.dropdown.Option(city)
+            for city in self.history.ranked()
         ]
-        self.page.update()
 
     def on_history_change(self, e: ft.ControlEvent) -> None:
         selected_city = e.control.value
         if selected_city:
             self.city_input.value = selected_city
-            self.page.update()
+            self.render.request(self.city_input)
             self.on_search_click(e)
 
+    # ---------------- HTTP client lifecycle ----------------
+    def get_http_client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it on first use.
+
+        The client module is imported here rather than at startup, so the
+        TLS and connection-pool setup stays out of the cold start.
+        """
+        if self.http_client is None or self.http_client.is_closed:
+            from http_client import create_async_client
+
+            with self.telemetry.timer("http.client_setup"):
+                self.http_client = create_async_client(
+                    http2=get_str("WEATHER_HTTP2") == "1",
+                    max_connections=get_int("WEATHER_HTTP_MAX_CONNECTIONS", 10),
+                    max_keepalive=get_int("WEATHER_HTTP_MAX_KEEPALIVE", 5),
+                    keepalive_expiry=get_float("WEATHER_HTTP_KEEPALIVE_EXPIRY", 60.0),
+                )
+        return self.http_client
+
+    async def close(self) -> None:
+        """Stop auto-refresh, flush pending saves and close the shared HTTP client."""
+        if self.auto_refresh_task is not None:
+            self.auto_refresh_task.cancel()
+        await self.history.flush()
+        # configure() may have stopped before creating the cache (no API key)
+        if hasattr(self, "weather_cache"):
+            await self.weather_cache.flush()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    def on_disconnect(self, e: ft.ControlEvent) -> None:
+        self.page.run_task(self.close)
+
+    async def on_window_event(self, e: ft.WindowEvent) -> None:
+        if e.type == ft.WindowEventType.CLOSE:
+            await self.close()
+            self.page.window.destroy()
+        elif e.type in (ft.WindowEventType.MINIMIZE, ft.WindowEventType.HIDE):
+            self.set_visible(False)
+        elif e.type in (ft.WindowEventType.RESTORE, ft.WindowEventType.SHOW):
+            self.set_visible(True)
+
+    def on_lifecycle_change(self, e: ft.AppLifecycleStateChangeEvent) -> None:
+        # web and mobile report visibility through the app lifecycle instead
+        if e.state in (ft.AppLifecycleState.HIDE, ft.AppLifecycleState.PAUSE):
+            self.set_visible(False)
+        elif e.state in (ft.AppLifecycleState.SHOW, ft.AppLifecycleState.RESUME):
+            self.set_visible(True)
+
+    def set_visible(self, visible: bool) -> None:
+        """Pause background refreshes while nobody can see the window."""
+        if self.auto_refresh is None:
+            return
+        if visible:
+            self.auto_refresh.resume()
+        else:
+            self.auto_refresh.pause()
+
     async def fetch_weather(self, city: str) -> dict | None:
-        """Fetch current weather data for the specified city."""
+        """Fetch current weather data for the specified city.
+
+        Served from the response cache when the city was fetched recently.
+        Concurrent calls for the same city share a single network request.
+        """
+        start = time.perf_counter()
+        cached = self.weather_cache.get(city)
+        if cached is not None:
+            self.telemetry.record("fetch_weather.hit", time.perf_counter() - start)
+            return cached
+
+        try:
+            return await self.inflight.do(
+                normalize_city(city), lambda: self.request_weather(city)
+            )
+        finally:
+            self.telemetry.record("fetch_weather.miss", time.perf_counter() - start)
+
+    async def request_weather(self, city: str) -> dict:
+        """Call the weather API and store the response in the cache."""
+        response = await self.call_api(self.base_url, city)
+        data = response.json()
+        self.weather_cache.set(city, data)
+        return data
+
+    async def call_api(self, url: str, city: str) -> httpx.Response:
+        """GET an OpenWeatherMap endpoint for city, with retries.
+
+        Every call waits for a rate-limiter token; a 429 answer pauses the
+        limiter for the server's Retry-After and the call is retried; a 429
+        on the last attempt counts as a circuit-breaker failure.
+        Timeouts, connection errors and 5xx answers are retried with jittered
+        backoff and counted by the circuit breaker, which makes calls fail
+        fast while upstream is down.
+        """
+        import httpx
+
+        if not self.circuit_breaker.allow():
+            raise CircuitOpenError("Weather service is temporarily unavailable.")
+
         params = {
             "q": city,
             "appid": self.api_key,
             "units": "metric",
         }
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(OPENWEATHER_BASE_URL, params=params)
+        for attempt in range(MAX_ATTEMPTS):
+            last_attempt = attempt == MAX_ATTEMPTS - 1
+            with self.telemetry.timer("rate_limiter.wait"):
+                await self.rate_limiter.acquire()
+            try:
+                response = await self.send_weather_request(url, params)
+            except httpx.TransportError:
+                self.circuit_breaker.record_failure()
+                if last_attempt or not self.circuit_breaker.allow():
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status_code == 429:
+                self.rate_limiter.pause(retry_after_seconds(response.headers))
+                if not last_attempt:
+                    continue
+                # still rate limited after every retry: a failure, so a
+                # throttling upstream can open the breaker too
+                self.circuit_breaker.record_failure()
+            elif response.status_code >= 500:
+                self.circuit_breaker.record_failure()
+                if not last_attempt and self.circuit_breaker.allow():
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+            else:
+                self.circuit_breaker.record_success()
+            break
 
         if response.status_code == 404:
             raise ValueError("City not found. Please check the spelling.")
 
         response.raise_for_status()
-        return response.json()
+        return response
+
+    async def send_weather_request(self, url: str, params: dict) -> httpx.Response:
+        """GET an endpoint once, with an adaptive timeout.
+
+        With hedging on, a call still running after the observed p95 latency
+        gets a second copy (if the rate limiter has a spare token) and the
+        first response wins.
+        """
+        client = self.get_http_client()
+        timeout = self.latency.timeout()
+
+        async def attempt() -> httpx.Response:
+            start = time.perf_counter()
+            trace = self.telemetry.http_trace()
+            response = await client.get(
+                url,
+                params=params,
+                timeout=timeout,
+                extensions={"trace": trace} if trace else None,
+            )
+            elapsed = time.perf_counter() - start
+            self.latency.record(elapsed)
+            self.telemetry.record_http(trace)
+            self.telemetry.record("http.total", elapsed)
+            return response
+
+        delay = self.latency.hedge_delay() if self.hedge_requests else None
+        return await hedged(attempt, delay, allow_hedge=self.rate_limiter.try_acquire)
 
     def on_search_click(self, e: ft.ControlEvent) -> None:
         """Start async weather fetch using page.run_task."""
         city = self.city_input.value.strip()
+        self.render.begin_interaction(f"search:{city}")
+        if not self.check_ready():
+            return
 
         if not city:
             self.show_error("Please enter a city name.")
             return
 
+        self.hide_suggestions()
+        if not self.is_known_city(city):
+            close_matches = self.city_index.suggest(city[:3], limit=3) if self.city_index else []
+            hint = f" Did you mean {', '.join(close_matches)}?" if close_matches else ""
+            self.show_error(f"Unknown city.{hint}")
+            return
+
         # remember city in history
         self.add_to_history(city)
 
         self.status_text.value = "Fetching weather..."
-        self.status_text.color = ft.colors.PRIMARY
-        self.page.update()
+        self.status_text.color = ft.Colors.PRIMARY
+        self.render.request(
+            self.city_input, self.suggestions, self.history_dropdown, self.status_text
+        )
 
-        self.page.run_task(self.load_and_display_weather, city)
+        # a new search supersedes whatever is still pending
+        self.search_generation += 1
+        if self.search_task is not None and not self.search_task.done():
+            self.search_task.cancel()
+        self.search_task = self.page.run_task(
+            self.load_and_display_weather, city, self.search_generation
+        )
+
+    def is_current_search(self, generation: int | None) -> bool:
+        return generation is None or generation == self.search_generation
+
+    async def load_and_display_weather(
+        self, city: str, generation: int | None = None
+    ) -> None:
+        """Async task to fetch weather and update UI.
+
+        If the city is not freshly cached but its last known weather is, that
+        is shown straight away (marked with its age) while fresh data is
+        fetched, and kept on screen if the fetch fails.
+
+        Uncached lookups wait out a short debounce window first, so a burst
+        of submits only fetches once. Results from superseded searches are
+        dropped instead of overwriting newer ones.
+        """
+        with self.telemetry.timer("load_and_display_weather"):
+            await self._load_and_display_weather(city, generation)
+
+    async def _load_and_display_weather(self, city: str, generation: int | None) -> None:
+        stale = None
+        if city not in self.weather_cache:
+            stale = self.weather_cache.get_stale(city, self.max_stale_age)
+            if stale is not None:
+                stale_data, age = stale
+                self.update_weather_display(
+                    stale_data,
+                    status=f"Showing weather from {format_age(age)}. Refreshing...",
+                    status_color=ft.Colors.ORANGE,
+                )
+            if self.search_debounce > 0:
+                await asyncio.sleep(self.search_debounce)
+                if not self.is_current_search(generation):
+                    return
 
-    async def load_and_display_weather(self, city: str) -> None:
-        """Async task to fetch weather and update UI."""
+        import httpx
+
+        data = None
+        offline = False
         try:
             data = await self.fetch_weather(city)
         except ValueError as ve:
-            self.show_error(str(ve))
-            return
+            message = str(ve)
         except httpx.RequestError:
-            self.show_error("Network error. Please check your internet connection.")
-            return
+            message = "Network error. Please check your internet connection."
+            offline = True
         except httpx.HTTPStatusError:
-            self.show_error("Unable to get weather data. Please try again later.")
+            message = "Unable to get weather data. Please try again later."
+            offline = True
+        except CircuitOpenError:
+            message = "Weather service is unavailable right now. Please try again shortly."
+            offline = True
+        except Exception:
+            message = "An unexpected error occurred."
+        else:
+            message = "" if data else "No data received from server."
+
+        if not self.is_current_search(generation):
+            return
+        if offline and stale is not None:
+            # keep the last known weather on screen instead of an error
+            self.status_text.value = (
+                f"Offline: showing weather from {format_age(stale[1])}."
+            )
+            self.status_text.color = ft.Colors.ORANGE
+            self.render.request(self.status_text)
             return
+        if message:
+            self.show_error(message)
+            return
+
+        self.displayed_city = normalize_city(city)
+        self.update_weather_display(data)
+
+        if self.forecast_task is not None and not self.forecast_task.done():
+            self.forecast_task.cancel()
+        self.forecast_task = self.page.run_task(self.load_forecast, city, generation)
+
+    # ---------------- 5-day forecast ----------------
+    async def fetch_forecast(self, city: str) -> ForecastSeries:
+        """3-hourly forecast for city, from the forecast cache when fresh."""
+        cached = self.forecast_cache.get(city)
+        if cached is not None:
+            return cached
+
+        async def request_forecast() -> ForecastSeries:
+            response = await self.call_api(self.forecast_url, city)
+            # parsed straight into arrays; the JSON dicts are not kept
+            series = ForecastSeries.parse(response.json())
+            self.forecast_cache.set(city, series)
+            return series
+
+        return await self.inflight.do(f"forecast:{normalize_city(city)}", request_forecast)
+
+    async def load_forecast(self, city: str, generation: int | None = None) -> None:
+        self.forecast_status.value = "Loading forecast..."
+        self.render.request(self.forecast_status)
+        try:
+            series = await self.fetch_forecast(city)
         except Exception:
-            self.show_error("An unexpected error occurred.")
+            if self.is_current_search(generation):
+                self.forecast_series = None
+                self.forecast_row.controls = []
+                self.forecast_status.value = "Forecast unavailable."
+                self.render.request(self.forecast_row, self.forecast_status)
+            return
+        if not self.is_current_search(generation):
+            return
+        self.forecast_series = series
+        self.forecast_status.value = ""
+        self.update_forecast_display()
+
+    def update_forecast_display(self) -> None:
+        """Render one card per day from the series in the current unit."""
+        series = self.forecast_series
+        if series is None:
+            return
+        symbol = "°C" if self.current_unit == "metric" else "°F"
+        cards = []
+        for day_start, low, high, humidity, wind in series.daily(self.current_unit)[:5]:
+            day = time.strftime("%a %d", time.gmtime(day_start + series.timezone))
+            cards.append(
+                ft.Container(
+                    content=ft.Column(
+                        [
+                            ft.Text(day, weight=ft.FontWeight.BOLD),
+                            ft.Text(f"{high:.0f}{symbol} / {low:.0f}{symbol}"),
+                            ft.Text(f"{humidity}%  {wind:.0f} m/s", size=12),
+                        ],
+                        spacing=2,
+                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                    ),
+                    padding=8,
+                    border_radius=8,
+                    bgcolor=ft.Colors.BLUE_50,
+                )
+            )
+        # a unit switch adds a converted copy of the series
+        self.forecast_cache.trim()
+        self.forecast_row.controls = cards
+        self.render.request(self.forecast_row, self.forecast_status)
+
+    # ---------------- Multi-city dashboard ----------------
+    def on_dashboard_click(self, e: ft.ControlEvent) -> None:
+        """Start fetching every city in the dashboard input."""
+        cities = parse_city_list(self.dashboard_input.value or "")
+        self.render.begin_interaction("dashboard")
+        if not self.check_ready():
+            return
+        if not cities:
+            self.dashboard_status.value = "Enter one or more cities separated by commas."
+            self.render.request(self.dashboard_status)
             return
 
+        if self.dashboard_task is not None and not self.dashboard_task.done():
+            self.dashboard_task.cancel()
+
+        self.dashboard_data = {}
+        self.dashboard_rows = {
+            normalize_city(city): ft.Text(f"{city}: loading...", size=14)
+            for city in cities
+        }
+        self.dashboard_list.controls = list(self.dashboard_rows.values())
+        self.dashboard_status.value = f"Loading {len(cities)} cities..."
+        self.render.request(self.dashboard_list, self.dashboard_status)
+
+        self.dashboard_task = self.page.run_task(self.load_dashboard, cities)
+        if self.auto_refresh_switch.value:
+            self.pin_cities(cities)
+
+    async def load_dashboard(self, cities: list[str]) -> None:
+        """Fetch dashboard cities concurrently, rendering each one as it arrives.
+
+        At most ``dashboard_concurrency`` requests are open at once, and all
+        of them go through the shared rate limiter.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.dashboard_concurrency))
+
+        async def fetch_one(city: str) -> tuple[str, dict | None, str]:
+            async with semaphore:
+                try:
+                    return city, await self.fetch_weather(city), ""
+                except ValueError:
+                    return city, None, "city not found"
+                except Exception:
+                    return city, None, "unavailable"
+
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(fetch_one(city)) for city in cities]
+        try:
+            for done, next_result in enumerate(asyncio.as_completed(tasks), start=1):
+                city, data, error = await next_result
+                if data:
+                    self.dashboard_data[normalize_city(city)] = (city, data)
+                self.update_dashboard_row(city, data, error)
+                self.dashboard_status.value = f"Loaded {done}/{len(cities)} cities"
+                self.render.request(self.dashboard_list, self.dashboard_status)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        elapsed = time.perf_counter() - start
+        self.dashboard_status.value = f"Loaded {len(cities)} cities in {elapsed:.1f}s"
+        self.render.request(self.dashboard_list, self.dashboard_status)
+
+    # ---------------- Auto-refresh ----------------
+    def on_auto_refresh_change(self, e: ft.ControlEvent) -> None:
+        """Pin the dashboard cities for background refresh, or unpin them."""
+        if not self.check_ready():
+            self.auto_refresh_switch.value = False
+            self.render.request(self.auto_refresh_switch)
+            return
+        if self.auto_refresh_switch.value:
+            self.pin_cities(parse_city_list(self.dashboard_input.value or ""))
+        else:
+            self.auto_refresh.unpin()
+
+    def pin_cities(self, cities: list[str]) -> None:
+        """Make ``cities`` the set that is refreshed in the background."""
+        self.auto_refresh.unpin()
+        # cities the dashboard just loaded are found fresh in the cache
+        # and skipped until their interval is up
+        self.auto_refresh.pin(cities)
+
+    async def refresh_pinned_city(self, city: str) -> dict | None:
+        """Fetch fresh weather for a pinned city and update where it is shown.
+
+        Goes through the same request path as a search (shared client, rate
+        limiter, circuit breaker) and stores the result in the cache.
+        """
+        key = normalize_city(city)
+        data = await self.inflight.do(key, lambda: self.request_weather(city))
+        updated = time.strftime("%H:%M")
+        if key in self.dashboard_rows:
+            self.dashboard_data[key] = (city, data)
+            self.update_dashboard_row(city, data)
+            self.dashboard_status.value = f"Auto-refreshed {city} at {updated}"
+            self.render.request(self.dashboard_list, self.dashboard_status)
+        if key == self.displayed_city:
+            self.update_weather_display(data, status=f"Updated automatically at {updated}.")
+        return data
+
+    def update_dashboard_row(self, city: str, data: dict | None, error: str = "") -> None:
+        row = self.dashboard_rows.get(normalize_city(city))
+        if row is None:
+            return
         if not data:
-            self.show_error("No data received from server.")
+            row.value = f"{city}: {error or 'no data'}"
+            row.color = ft.Colors.RED_400
             return
+        weather_list = data.get("weather", [])
+        description = weather_list[0].get("description", "") if weather_list else ""
+        temp_c = data.get("main", {}).get("temp")
+        temperature = self.format_temperature(float(temp_c)) if temp_c is not None else "N/A"
+        row.value = f"{data.get('name') or city}: {temperature}, {description}"
+        row.color = None
 
-        self.update_weather_display(data)
+    def refresh_dashboard_rows(self) -> None:
+        """Re-render dashboard rows, e.g. after the unit toggle changes."""
+        for city, data in self.dashboard_data.values():
+            self.update_dashboard_row(city, data)
 
-    def update_weather_display(self, data: dict) -> None:
+    def update_weather_display(
+        self,
+        data: dict,
+        status: str = "Weather loaded successfully.",
+        status_color: str = ft.Colors.GREEN,
+    ) -> None:
         """Update the UI with weather data."""
+        with self.telemetry.timer("update_weather_display"):
+            self._update_weather_display(data, status, status_color)
+
+    def _update_weather_display(self, data: dict, status: str, status_color: str) -> None:
         main = data.get("main", {})
         wind = data.get("wind", {})
         weather_list = data.get("weather", [])
@@ -245,22 +980,96 @@ class WeatherApp:
             else "Additional details unavailable"
         )
 
-        if icon_code:
-            self.weather_icon.src = (
-                f"https://openweathermap.org/img/wn/{icon_code}@2x.png"
-            )
-        else:
-            self.weather_icon.src = ""
+        self.weather_icon.src = self.icon_cache.src(icon_code) if icon_code else ""
 
-        self.status_text.value = "Weather loaded successfully."
-        self.status_text.color = ft.colors.GREEN
-        self.page.update()
+        self.status_text.value = status
+        self.status_text.color = status_color
+        self.render.request(self.content_card, self.status_text)
 
     def show_error(self, message: str) -> None:
         """Display error message in the status text."""
         self.status_text.value = message
-        self.status_text.color = ft.colors.RED_400
-        self.page.update()
+        self.status_text.color = ft.Colors.RED_400
+        self.render.request(self.status_text)
+
+    # ---------------- Debug telemetry panel ----------------
+    def on_keyboard(self, e: ft.KeyboardEvent) -> None:
+        # hidden shortcut: Ctrl+Shift+D shows or hides the debug panel
+        if e.ctrl and e.shift and e.key.upper() == "D":
+            self.toggle_debug_panel()
+
+    def toggle_debug_panel(self) -> None:
+        """Show or hide the panel; telemetry is recorded while it is open."""
+        self.debug_panel.visible = not self.debug_panel.visible
+        if self.debug_panel.visible:
+            self.telemetry.enabled = True
+            self.debug_task = self.page.run_task(self.refresh_debug_panel)
+        else:
+            self.telemetry.enabled = get_str("WEATHER_TELEMETRY") == "1"
+            if self.debug_task is not None:
+                self.debug_task.cancel()
+        self.render.request(self.debug_panel)
+
+    async def refresh_debug_panel(self) -> None:
+        while self.debug_panel.visible:
+            self.debug_text.value = self.format_telemetry()
+            self.render.request(self.debug_text)
+            await asyncio.sleep(1.0)
+
+    def telemetry_context(self) -> dict:
+        """Counters shown next to the timing samples and saved on export."""
+        context = {"render": self.render.stats()}
+        if self.ready.is_set() and not self.config_error:
+            cache = self.weather_cache
+            lookups = cache.hits + cache.misses
+            context["cache"] = {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "stale_hits": cache.stale_hits,
+                "hit_ratio": round(cache.hits / lookups, 3) if lookups else None,
+                "stale_ratio": round(cache.stale_hits / lookups, 3) if lookups else None,
+            }
+            context["circuit_breaker"] = self.circuit_breaker.state
+            context["timeout_s"] = round(self.latency.timeout(), 3)
+        return context
+
+    def format_telemetry(self) -> str:
+        lines = [f"{'sample':<26}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, stats in self.telemetry.summary().items():
+            lines.append(
+                f"{name:<26}{stats['count']:>6}{stats['p50_ms']:>10.2f}"
+                f"{stats['p95_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+            )
+        context = self.telemetry_context()
+        cache = context.get("cache")
+        if cache:
+            lines.append(
+                f"cache: {cache['hits']} hits, {cache['misses']} misses, "
+                f"{cache['stale_hits']} stale (hit ratio {cache['hit_ratio']})"
+            )
+        render = context["render"]
+        lines.append(f"page updates: {render['updates']} sent for {render['requested']} requests")
+        if "circuit_breaker" in context:
+            lines.append(
+                f"circuit breaker: {context['circuit_breaker']}, timeout {context['timeout_s']}s"
+            )
+        return "\n".join(lines)
+
+    def on_export_telemetry(self, e: ft.ControlEvent) -> None:
+        path = Path(f"telemetry-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        try:
+            self.telemetry.export(path, self.telemetry_context())
+        except OSError:
+            self.show_error("Could not write the telemetry file.")
+            return
+        self.status_text.value = f"Telemetry saved to {path.resolve()}"
+        self.status_text.color = ft.Colors.GREEN
+        self.render.request(self.status_text)
+
+    def on_clear_telemetry(self, e: ft.ControlEvent) -> None:
+        self.telemetry.clear()
+        self.debug_text.value = self.format_telemetry()
+        self.render.request(self.debug_text)
 
     # ---------------- Unit toggle handling ----------------
     def update_temperature_label(self) -> None:
@@ -269,17 +1078,23 @@ class WeatherApp:
             self.temperature_text.value = "N/A"
             return
 
+        self.temperature_text.value = self.format_temperature(self.current_temp_c)
+
+    def format_temperature(self, temp_c: float) -> str:
+        """Format a Celsius value in the currently selected unit."""
         if self.current_unit == "metric":
-            self.temperature_text.value = f"{self.current_temp_c:.1f} °C"
-        else:
-            temp_f = (self.current_temp_c * 9 / 5) + 32
-            self.temperature_text.value = f"{temp_f:.1f} °F"
+            return f"{temp_c:.1f} °C"
+        temp_f = (temp_c * 9 / 5) + 32
+        return f"{temp_f:.1f} °F"
 
     def toggle_units(self, e: ft.ControlEvent) -> None:
         """Toggle between Celsius and Fahrenheit without refetching data."""
         self.current_unit = "imperial" if e.control.value else "metric"
+        self.render.begin_interaction("toggle_units")
         self.update_temperature_label()
-        self.page.update()
+        self.refresh_dashboard_rows()
+        self.update_forecast_display()
+        self.render.request(self.temperature_text, self.dashboard_list)
 
 
 def main(page: ft.Page) -> None:
@@ -287,6 +1102,6 @@ def main(page: ft.Page) -> None:
 
 
 if __name__ == "__main__":
-    ft.app(target=main)
+    ft.app(target=main, assets_dir=str(ASSETS_DIR))
 
 
@@ -0,0 +1,306 @@
+"""Local stand-in for the OpenWeatherMap current weather and forecast endpoints.
+
+Run it and point the app at it instead of the real API:
+
+    python mock_server.py --port 8765
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8765/data/2.5/weather python main.py
+
+Every request is counted, and ``GET /stats`` returns the counts as JSON so
+you can check, for example, that a cached search made no network call.
+``--latency``/``--jitter`` slow responses down and ``--rate-429`` answers a
+fraction of requests with 429 Too Many Requests. For fault injection,
+``--rate-5xx`` answers a fraction with 503, ``--tail-rate``/``--tail-latency``
+make a fraction of responses very slow, and ``GET /control?down=1`` (or
+``down=0``) simulates a full outage. ``--drift`` makes the temperature of
+about half the cities (picked by name) change by that many degrees per
+minute, for exercising auto-refresh. Icons are served under
+``/img/wn/`` so ``WEATHER_ICON_BASE_URL`` can point here as well.
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+WEATHER_PATH = "/data/2.5/weather"
+FORECAST_PATH = "/data/2.5/forecast"
+ICON_PATH = "/img/wn/"
+# 1x1 transparent PNG returned for every icon request
+ICON_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082"
+)
+MISSING_CITIES = {"atlantis", "notacity"}
+ICONS = ["01d", "02d", "03d", "04d", "09d", "10d", "11d", "13d", "50d"]
+DESCRIPTIONS = [
+    "clear sky",
+    "few clouds",
+    "scattered clouds",
+    "broken clouds",
+    "shower rain",
+    "rain",
+    "thunderstorm",
+    "snow",
+    "mist",
+]
+
+
+def fake_weather(city: str, drift: float = 0.0) -> dict:
+    """Fake payload shaped like the real /weather response.
+
+    Deterministic per city, except that cities with an odd name hash have
+    ``drift`` degrees added to their temperature.
+    """
+    seed = zlib.crc32(city.casefold().encode("utf-8"))
+    index = seed % len(ICONS)
+    return {
+        "name": city.title(),
+        "main": {
+            "temp": round(-5 + (seed % 4000) / 100 + (drift if seed % 2 else 0.0), 2),
+            "humidity": 30 + seed % 70,
+        },
+        "wind": {"speed": round((seed % 150) / 10, 1)},
+        "weather": [{"description": DESCRIPTIONS[index], "icon": ICONS[index]}],
+        "cod": 200,
+    }
+
+
+def fake_forecast(city: str, drift: float = 0.0, slots: int = 40) -> dict:
+    """Fake 3-hourly forecast shaped like the real /forecast response.
+
+    Temperatures follow a daily cycle around the city's current weather.
+    """
+    current = fake_weather(city, drift)
+    seed = zlib.crc32(city.casefold().encode("utf-8"))
+    start = (int(time.time()) // 10800 + 1) * 10800
+    items = []
+    for i in range(slots):
+        dt = start + i * 10800
+        hour = (dt // 3600) % 24
+        items.append(
+            {
+                "dt": dt,
+                "main": {
+                    "temp": round(current["main"]["temp"] + 4 * math.sin((hour - 9) * math.pi / 12), 2),
+                    "humidity": min(100, current["main"]["humidity"] + (i * 7) % 15),
+                },
+                "wind": {"speed": round(current["wind"]["speed"] + (i % 5) / 2, 1)},
+                "weather": current["weather"],
+                "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(dt)),
+            }
+        )
+    return {
+        "cod": "200",
+        "cnt": slots,
+        "list": items,
+        "city": {"name": city.title(), "timezone": (seed % 25 - 12) * 3600},
+    }
+
+
+class MockState:
+    """Request counters shared by all handler threads."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+        self.by_city: dict[str, int] = {}
+
+    def record_429(self) -> None:
+        with self.lock:
+            self.rate_limited += 1
+
+    def record(self, city: str) -> None:
+        with self.lock:
+            self.requests += 1
+            key = city.casefold()
+            self.by_city[key] = self.by_city.get(key, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "rate_limited": self.rate_limited,
+                "by_city": dict(self.by_city),
+            }
+
+    def reset(self) -> None:
+        with self.lock:
+            self.requests = 0
+            self.rate_limited = 0
+            self.by_city.clear()
+
+
+class MockWeatherHandler(BaseHTTPRequestHandler):
+    server: "MockWeatherServer"
+    # keep-alive, like the real API, so client connection pooling is exercised
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; without this, delayed
+    # ACKs add ~40 ms to every response on a reused connection
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        state = self.server.state
+        if url.path == "/stats":
+            self.send_json(200, state.snapshot())
+            return
+        if url.path == "/control":
+            query = parse_qs(url.query)
+            if "down" in query:
+                self.server.down = query["down"][0] == "1"
+            self.send_json(200, {"down": self.server.down})
+            return
+        if url.path == "/reset":
+            state.reset()
+            self.send_json(200, {"ok": True})
+            return
+        if url.path.startswith(ICON_PATH):
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(ICON_PNG)))
+            self.end_headers()
+            self.wfile.write(ICON_PNG)
+            return
+        if url.path not in (WEATHER_PATH, FORECAST_PATH):
+            self.send_json(404, {"cod": "404", "message": "not found"})
+            return
+
+        city = parse_qs(url.query).get("q", [""])[0].strip()
+        state.record(city)
+        server = self.server
+        if server.down:
+            self.send_json(503, {"cod": 503, "message": "service unavailable"})
+            return
+        delay = server.latency + random.uniform(0, server.jitter)
+        if server.tail_rate and random.random() < server.tail_rate:
+            delay += server.tail_latency
+        if delay:
+            time.sleep(delay)
+        if server.rate_5xx and random.random() < server.rate_5xx:
+            self.send_json(503, {"cod": 503, "message": "service unavailable"})
+            return
+        if server.rate_429 and random.random() < server.rate_429:
+            state.record_429()
+            self.send_json(
+                429,
+                {"cod": 429, "message": "rate limit exceeded"},
+                headers={"Retry-After": str(server.retry_after)},
+            )
+            return
+        if not city or city.casefold() in MISSING_CITIES:
+            self.send_json(404, {"cod": "404", "message": "city not found"})
+            return
+        drift = server.drift * (time.monotonic() - server.started) / 60
+        if url.path == FORECAST_PATH:
+            self.send_json(200, fake_forecast(city, drift))
+            return
+        self.send_json(200, fake_weather(city, drift))
+
+
+class MockWeatherServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        verbose: bool = False,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_429: float = 0.0,
+        retry_after: float = 1.0,
+        rate_5xx: float = 0.0,
+        tail_rate: float = 0.0,
+        tail_latency: float = 0.0,
+        drift: float = 0.0,
+    ) -> None:
+        super().__init__(address, MockWeatherHandler)
+        self.state = MockState()
+        self.verbose = verbose
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.rate_5xx = rate_5xx
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.drift = drift
+        self.started = time.monotonic()
+        self.down = False
+
+    def handle_error(self, request, client_address) -> None:
+        # clients hang up on purpose (timeouts, cancelled hedges); stay quiet
+        if self.verbose:
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{WEATHER_PATH}"
+
+
+def start_in_thread(host: str = "127.0.0.1", port: int = 0, **kwargs) -> MockWeatherServer:
+    """Start a mock server on a background thread (port 0 picks a free port)."""
+    server = MockWeatherServer((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    parser.add_argument("--latency", type=float, default=0.0, help="base delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay in seconds")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests answered 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with 429s")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="fraction of requests answered 503")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="fraction of requests made slow")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="extra delay for slow requests")
+    parser.add_argument("--drift", type=float, default=0.0, help="temperature change per minute")
+    args = parser.parse_args()
+
+    server = MockWeatherServer(
+        (args.host, args.port),
+        verbose=args.verbose,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        rate_5xx=args.rate_5xx,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+        drift=args.drift,
+    )
+    print(f"Mock OpenWeatherMap API on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
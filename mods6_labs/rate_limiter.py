@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter.
+
+    Up to ``capacity`` calls may go out in a burst; after that tokens refill
+    at ``rate`` per second. ``pause()`` blocks all callers for a while, e.g.
+    after the server answers 429 with a Retry-After header.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, calls: int, burst: int) -> "TokenBucket":
+        """Bucket that never exceeds ``calls`` in any 60-second window.
+
+        A full burst plus a minute of refill is at most ``calls``, so the
+        burst is trimmed to leave room for a positive refill rate. With
+        ``calls == 1`` the single token comes back after exactly 60 seconds.
+        """
+        calls = max(1, calls)
+        burst = max(1, min(burst, calls - 1))
+        refill = max(calls - burst, 1) / 60.0
+        return cls(rate=refill, capacity=burst)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token without waiting. Returns False if none is available."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return False
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then take it."""
+        # the lock keeps waiters in FIFO order instead of racing each other
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for the given number of seconds."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+        self.updated = self.paused_until
+
+
+def retry_after_seconds(headers, default: float = 1.0) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds form only)."""
+    try:
+        return max(0.0, float(headers.get("Retry-After", default)))
+    except (TypeError, ValueError):
+        return default
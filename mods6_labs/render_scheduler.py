@@ -0,0 +1,144 @@
+import asyncio
+import dataclasses
+import json
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+class RenderScheduler:
+    """Coalesce UI refreshes into one ``page.update()`` per frame window.
+
+    Handlers call ``request(*controls)`` instead of ``page.update()``. The
+    first request in a window schedules a flush ``frame_window`` seconds
+    later; everything requested until then goes out in a single update.
+    Requests naming specific controls are sent as a targeted
+    ``page.update(*controls)``; a request without controls refreshes the
+    whole page.
+
+    Counters record how many refreshes were requested, how many updates
+    were actually sent, and (when the Flet connection is available) how
+    many bytes of update commands went to the client. ``begin_interaction``
+    starts a fresh set of counters for one user action. ``on_update`` is
+    called with the seconds each ``page.update()`` took.
+    """
+
+    def __init__(
+        self,
+        page: Any,
+        frame_window: float = 0.016,
+        on_update: Callable[[float], None] | None = None,
+    ) -> None:
+        self.page = page
+        self.frame_window = frame_window
+        self.on_update = on_update
+        self._lock = threading.Lock()
+        self._controls: dict[int, Any] = {}
+        self._full = False
+        self._pending = False
+
+        self.requested = 0
+        self.updates = 0
+        self.bytes_sent = 0
+        self.interaction = "startup"
+        self.interaction_started = time.perf_counter()
+        self.interaction_stats = {"requested": 0, "updates": 0, "bytes": 0}
+        self.last_interaction: dict | None = None
+        self.bytes_measured = self._instrument_connection()
+
+    # ---------------- Scheduling ----------------
+    def request(self, *controls: Any) -> None:
+        """Mark controls (or the whole page) as needing a refresh."""
+        with self._lock:
+            self.requested += 1
+            self.interaction_stats["requested"] += 1
+            if controls:
+                for control in controls:
+                    self._controls[id(control)] = control
+            else:
+                self._full = True
+            if self._pending:
+                return
+            self._pending = True
+        # run_task is thread-safe, and Flet runs sync handlers off the loop
+        self.page.run_task(self._flush_later)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.frame_window)
+        self.flush()
+
+    def flush(self) -> None:
+        """Send everything requested so far as one update."""
+        with self._lock:
+            if not self._pending:
+                return
+            controls = list(self._controls.values())
+            full = self._full
+            self._controls.clear()
+            self._full = False
+            self._pending = False
+        start = time.perf_counter()
+        if full or not controls:
+            self.page.update()
+        else:
+            self.page.update(*controls)
+        if self.on_update is not None:
+            self.on_update(time.perf_counter() - start)
+        with self._lock:
+            self.updates += 1
+            self.interaction_stats["updates"] += 1
+
+    # ---------------- Measurement ----------------
+    def begin_interaction(self, name: str) -> None:
+        """Close out the current interaction's counters and start new ones."""
+        with self._lock:
+            self.last_interaction = {
+                "name": self.interaction,
+                "seconds": round(time.perf_counter() - self.interaction_started, 3),
+                **self.interaction_stats,
+            }
+            self.interaction = name
+            self.interaction_started = time.perf_counter()
+            self.interaction_stats = {"requested": 0, "updates": 0, "bytes": 0}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requested": self.requested,
+                "updates": self.updates,
+                "saved": self.requested - self.updates,
+                "bytes_sent": self.bytes_sent if self.bytes_measured else None,
+                "current": {"name": self.interaction, **self.interaction_stats},
+                "last": self.last_interaction,
+            }
+
+    def _instrument_connection(self) -> bool:
+        """Wrap the Flet connection so every update's payload size is counted."""
+        conn = getattr(self.page, "connection", None)
+        send_commands = getattr(conn, "send_commands", None)
+        if send_commands is None:
+            return False
+
+        def counting_send_commands(session_id: str, commands: list) -> Any:
+            size = _payload_size(commands)
+            with self._lock:
+                self.bytes_sent += size
+                self.interaction_stats["bytes"] += size
+            return send_commands(session_id, commands)
+
+        conn.send_commands = counting_send_commands
+        return True
+
+
+def _payload_size(commands: list) -> int:
+    """Approximate wire size of a batch of Flet protocol commands."""
+    try:
+        return len(
+            json.dumps(
+                [dataclasses.asdict(c) if dataclasses.is_dataclass(c) else c for c in commands],
+                default=str,
+            )
+        )
+    except (TypeError, ValueError):
+        return 0
@@ -0,0 +1,160 @@
+"""Cold-start profile for the weather app.
+
+Reports import time (from ``python -X importtime``) and time to first
+frame / time until the app is ready, each measured in a fresh interpreter:
+
+    python startup_profile.py --runs 5
+    python startup_profile.py --max-first-frame-ms 50 --max-ready-ms 500
+
+The exit code is 1 when a median exceeds its budget or a module meant to
+load after the first frame (``DEFERRED_MODULES``) was imported earlier, so
+the script can guard against startup regressions.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+
+APP_DIR = Path(__file__).resolve().parent
+# modules the app is meant to load only after the first frame
+DEFERRED_MODULES = ("dotenv", "city_index", "http_client")
+
+
+def import_report(top: int) -> tuple[float, list[tuple[str, float]]]:
+    """Total import time of ``main`` and its slowest top-level packages (ms)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    packages: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:") :].split("|")
+            cumulative_ms = int(cumulative) / 1000
+        except ValueError:
+            continue
+        raw_name = name.rstrip()
+        module = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip())) // 2
+        if module == "main":
+            total = cumulative_ms
+        elif depth == 1:
+            # direct imports of main (and what they pull in)
+            packages[module] = packages.get(module, 0.0) + cumulative_ms
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return total, slowest
+
+
+class ProfilePage:
+    """Bare page stand-in; only what WeatherApp touches while starting."""
+
+    def __init__(self) -> None:
+        self.window = types.SimpleNamespace(destroy=lambda: None)
+
+    def add(self, *controls) -> None:
+        pass
+
+    def update(self, *controls) -> None:
+        pass
+
+    def run_task(self, handler, *args):
+        return asyncio.ensure_future(handler(*args))
+
+
+async def _child_measure() -> dict:
+    start = time.perf_counter()
+    import main
+
+    imported = time.perf_counter()
+    app = main.WeatherApp(ProfilePage())
+    loaded_at_first_frame = [m for m in DEFERRED_MODULES if m in sys.modules]
+    await app.ready.wait()
+    return {
+        "import_ms": (imported - start) * 1000,
+        "first_frame_ms": app.startup_timings["first_frame"] * 1000,
+        "ready_ms": app.startup_timings["ready"] * 1000,
+        "deferred_loaded_early": loaded_at_first_frame,
+        "config_error": app.config_error,
+    }
+
+
+def measure_once() -> dict:
+    env = dict(os.environ)
+    env.setdefault("OPENWEATHER_API_KEY", "startup-profile")
+    env.setdefault("WEATHER_ICONS_BUNDLED", "1")
+    # run in an empty directory so local cache/history files do not skew runs
+    with tempfile.TemporaryDirectory() as workdir:
+        env["PYTHONPATH"] = str(APP_DIR)
+        result = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--child"],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-first-frame-ms", type=float)
+    parser.add_argument("--max-ready-ms", type=float)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child_measure())))
+        return 0
+
+    total, slowest = import_report(args.top)
+    print(f"import main: {total:.1f} ms (python -X importtime)")
+    for name, ms in slowest:
+        print(f"  {name:<24} {ms:8.1f} ms")
+
+    runs = [measure_once() for _ in range(max(1, args.runs))]
+    medians = {
+        key: statistics.median(run[key] for run in runs)
+        for key in ("import_ms", "first_frame_ms", "ready_ms")
+    }
+    print(f"\nmedian of {len(runs)} cold starts:")
+    print(f"  import          {medians['import_ms']:8.1f} ms")
+    print(f"  first frame     {medians['first_frame_ms']:8.1f} ms (after import)")
+    print(f"  ready           {medians['ready_ms']:8.1f} ms (after import)")
+    early = sorted({m for run in runs for m in run["deferred_loaded_early"]})
+    print(f"  deferred modules loaded before first frame: {', '.join(early) or 'none'}")
+    if runs[-1]["config_error"]:
+        print(f"  note: startup reported: {runs[-1]['config_error']}")
+
+    failed = False
+    for key, budget in (
+        ("import_ms", args.max_import_ms),
+        ("first_frame_ms", args.max_first_frame_ms),
+        ("ready_ms", args.max_ready_ms),
+    ):
+        if budget is not None and medians[key] > budget:
+            print(f"FAIL: {key} {medians[key]:.1f} ms exceeds budget {budget:.1f} ms")
+            failed = True
+    return 1 if failed or early else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from latency import nearest_rank
+
+# httpcore trace events, as ``<phase>: (started event, completed event)``.
+# DNS lookup happens inside connect_tcp, so it is part of "connect".
+HTTP_PHASES = {
+    "connect": ("connection.connect_tcp.started", "connection.connect_tcp.complete"),
+    "tls": ("connection.start_tls.started", "connection.start_tls.complete"),
+    "send": ("send_request_headers.started", "send_request_body.complete"),
+    "wait": ("receive_response_headers.started", "receive_response_headers.complete"),
+    "transfer": ("receive_response_body.started", "receive_response_body.complete"),
+}
+
+
+class HttpTrace:
+    """Collects httpcore trace events for one request.
+
+    Pass an instance as ``extensions={"trace": trace}``; ``phases()`` then
+    gives the seconds spent connecting, in TLS, sending, waiting for the
+    first byte and transferring the body.
+    """
+
+    __slots__ = ("events",)
+
+    def __init__(self) -> None:
+        self.events: dict[str, float] = {}
+
+    async def __call__(self, name: str, info: dict) -> None:
+        # http11./http2. prefixes differ by protocol; keep the event part
+        prefix, _, event = name.partition(".")
+        self.events[name if prefix == "connection" else event] = time.perf_counter()
+
+    def phases(self) -> dict[str, float]:
+        result = {}
+        for phase, (started, completed) in HTTP_PHASES.items():
+            if started in self.events and completed in self.events:
+                result[phase] = self.events[completed] - self.events[started]
+        return result
+
+
+class Telemetry:
+    """Rolling in-memory store of timing samples.
+
+    Keeps the last ``capacity`` samples as (wall time, name, seconds).
+    While ``enabled`` is False, ``record`` returns straight away and no
+    HTTP tracing is set up, so instrumented code costs next to nothing
+    when nobody is looking.
+    """
+
+    def __init__(self, capacity: int = 2000, enabled: bool = False) -> None:
+        self.samples: deque[tuple[float, str, float]] = deque(maxlen=max(1, capacity))
+        self.enabled = enabled
+
+    def record(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self.samples.append((time.time(), name, seconds))
+
+    def timer(self, name: str) -> "_Timer":
+        """Context manager recording how long its block took."""
+        return _Timer(self, name)
+
+    def http_trace(self) -> HttpTrace | None:
+        """A trace collector for one request, or None while disabled."""
+        return HttpTrace() if self.enabled else None
+
+    def record_http(self, trace: HttpTrace | None) -> None:
+        if trace is None:
+            return
+        for phase, seconds in trace.phases().items():
+            self.record(f"http.{phase}", seconds)
+
+    def clear(self) -> None:
+        self.samples.clear()
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Per sample name: count, mean, p50, p95 and max in milliseconds."""
+        by_name: dict[str, list[float]] = {}
+        for _, name, seconds in list(self.samples):
+            by_name.setdefault(name, []).append(seconds * 1000)
+        result = {}
+        for name in sorted(by_name):
+            ordered = sorted(by_name[name])
+            result[name] = {
+                "count": len(ordered),
+                "mean_ms": round(sum(ordered) / len(ordered), 3),
+                "p50_ms": round(nearest_rank(ordered, 50), 3),
+                "p95_ms": round(nearest_rank(ordered, 95), 3),
+                "max_ms": round(ordered[-1], 3),
+            }
+        return result
+
+    def export(self, path: Path, extra: dict[str, Any] | None = None) -> Path:
+        """Write the summary, raw samples and ``extra`` to a JSON file."""
+        payload = {
+            "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "summary": self.summary(),
+            **(extra or {}),
+            "samples": [
+                {"time": round(at, 3), "name": name, "ms": round(seconds * 1000, 3)}
+                for at, name, seconds in list(self.samples)
+            ],
+        }
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+class _Timer:
+    __slots__ = ("telemetry", "name", "start")
+
+    def __init__(self, telemetry: Telemetry, name: str) -> None:
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.telemetry.record(self.name, time.perf_counter() - self.start)
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+
+def normalize_city(city: str) -> str:
+    """Cache key for a city: trimmed, single-spaced and case-insensitive."""
+    return " ".join(city.split()).casefold()
+
+
+class WeatherCache:
+    """In-memory weather response cache with TTL expiry and LRU eviction.
+
+    Entries are keyed by normalized city name. When ``path`` is given the
+    cache is loaded from and written back to a small JSON file so responses
+    survive restarts. Expired entries are kept until evicted so they can
+    still be served as "last known" data via ``get_stale``.
+
+    Saving works like ``SearchHistory``: changes within ``flush_delay``
+    seconds are written together, atomically, on a worker thread started
+    through ``run_task``. Without ``run_task`` every change is written
+    straight away.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        max_entries: int = 100,
+        path: Path | None = None,
+        flush_delay: float = 1.0,
+        run_task: Callable[[Callable[[], Awaitable[Any]]], Any] | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.path = Path(path) if path else None
+        self.flush_delay = flush_delay
+        self.run_task = run_task
+        self._save_pending = False
+        self.writes = 0
+        # key -> (fetched_at as unix time, response data)
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        if self.path:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, city: str) -> bool:
+        return self.get(city, count=False) is not None
+
+    def get(self, city: str, count: bool = True) -> dict | None:
+        """Return cached data for city if present and not expired."""
+        key = normalize_city(city)
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            if count:
+                self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if count:
+            self.hits += 1
+        return entry[1]
+
+    def get_stale(self, city: str, max_age: float | None = None) -> tuple[dict, float] | None:
+        """Return (data, age in seconds) for city, ignoring the TTL.
+
+        Entries older than ``max_age`` are treated as missing.
+        """
+        entry = self._entries.get(normalize_city(city))
+        if entry is None:
+            return None
+        age = max(0.0, time.time() - entry[0])
+        if max_age is not None and age > max_age:
+            return None
+        self.stale_hits += 1
+        return entry[1], age
+
+    def age(self, city: str) -> float | None:
+        """Seconds since city was last fetched, or None if it is not cached."""
+        entry = self._entries.get(normalize_city(city))
+        return None if entry is None else max(0.0, time.time() - entry[0])
+
+    def set(self, city: str, data: dict) -> None:
+        key = normalize_city(city)
+        self._entries[key] = (time.time(), data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.schedule_save()
+
+    def invalidate(self, city: str) -> None:
+        self._entries.pop(normalize_city(city), None)
+        self.schedule_save()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.schedule_save()
+
+    # ---------------- Persistence ----------------
+    def load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except Exception:
+            return
+        if not isinstance(raw, list):
+            return
+        # file is stored least- to most-recently used
+        for item in raw[-self.max_entries :]:
+            try:
+                key, fetched_at, data = item
+                self._entries[str(key)] = (float(fetched_at), dict(data))
+            except (TypeError, ValueError):
+                continue
+
+    def schedule_save(self) -> None:
+        """Coalesce saves: one write per ``flush_delay`` window at most."""
+        if not self.path or self._save_pending:
+            return
+        if self.run_task is None:
+            self.save()
+            return
+        self._save_pending = True
+        self.run_task(self._delayed_save)
+
+    async def _delayed_save(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write pending changes now, e.g. before the app closes."""
+        if not self._save_pending:
+            return
+        self._save_pending = False
+        await asyncio.to_thread(self._write, self.snapshot())
+
+    def snapshot(self) -> list:
+        return [[key, fetched_at, data] for key, (fetched_at, data) in self._entries.items()]
+
+    def save(self) -> None:
+        """Write the cache now, on the calling thread."""
+        if self.path:
+            self._write(self.snapshot())
+
+    def _write(self, payload: list) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            # swap in the complete file so a crash mid-write keeps the old one
+            os.replace(tmp_path, self.path)
+            self.writes += 1
+        except Exception:
+            # cache persistence is best effort, same as search history
+            pass
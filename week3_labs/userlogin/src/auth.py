@@ -0,0 +1,140 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from db_connection import POOL_SIZE
+from passwords import PasswordHasher, get_hasher, verify_password
+from session import SessionStore, get_session_store
+from throttle import LoginThrottle, get_throttle
+from user_repository import RepositoryError, UserRepository, get_repository
+
+LOGIN_TIMEOUT = 5.0
+# checks allowed in flight (running or queued) before new ones are refused
+MAX_PENDING = 2 * POOL_SIZE
+
+# one worker per pooled connection; more threads would only wait for one
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="login-db")
+_pending = threading.BoundedSemaphore(MAX_PENDING)
+
+
+class LoginBusyError(Exception):
+    """Raised when too many credential checks are already in progress."""
+
+
+def _lookup(username: str, repository: UserRepository, hasher: PasswordHasher) -> tuple[int, str] | None:
+    # calibrates on the very first login if startup has not done it yet;
+    # a no-op afterwards
+    hasher.current_scheme()
+    return repository.find_user(username)
+
+
+def _upgrade_password(repository: UserRepository, hasher: PasswordHasher, user_id: int, password: str) -> None:
+    # runs on a login thread nobody waits for; a failure is dropped with
+    # its future and the next successful login tries again
+    repository.set_password(user_id, hasher.hash(password).result())
+
+
+def check_credentials(
+    username: str,
+    password: str,
+    repository: UserRepository | None = None,
+    hasher: PasswordHasher | None = None,
+) -> bool:
+    """
+    Look the user up and verify the password in the calling thread.
+    Blocking, hash included; the app uses ``check_credentials_async``.
+    """
+    hasher = hasher or get_hasher()
+    user = _lookup(username, repository or get_repository(), hasher)
+    try:
+        return verify_password(password, user[1] if user is not None else hasher.dummy) and user is not None
+    except ValueError as err:
+        raise _unreadable(user, err) from err
+
+
+def _unreadable(user: tuple[int, str] | None, err: ValueError) -> RepositoryError:
+    # a truncated or hand-edited password column fails to parse; report it
+    # like any other broken row instead of letting ValueError escape
+    user_id = user[0] if user is not None else None
+    return RepositoryError(f"Stored password of user {user_id} is unreadable: {err}")
+
+
+async def check_credentials_async(
+    username: str,
+    password: str,
+    repository: UserRepository | None = None,
+    hasher: PasswordHasher | None = None,
+    timeout: float = LOGIN_TIMEOUT,
+) -> bool:
+    """
+    Check credentials without blocking the event loop. The lookup runs on
+    the bounded login thread pool and the password hash is verified in the
+    hasher's process pool. After a successful check, a plaintext or
+    outdated hash is replaced in the background.
+
+    Raises ``asyncio.TimeoutError`` after ``timeout`` seconds,
+    ``LoginBusyError`` when ``MAX_PENDING`` lookups are already in flight and
+    ``RepositoryError`` when the stored password cannot be parsed.
+    Cancelling the caller (e.g. on a second click) stops waiting right away;
+    a query that already started finishes on its thread and is discarded.
+    """
+    repository = repository or get_repository()
+    hasher = hasher or get_hasher()
+    if not _pending.acquire(blocking=False):
+        raise LoginBusyError("Too many login attempts in progress")
+    try:
+        job = _executor.submit(_lookup, username, repository, hasher)
+    except RuntimeError:
+        _pending.release()
+        raise
+    # released when the thread is done (or the job is cancelled before it
+    # starts), so abandoned queries still count against MAX_PENDING
+    job.add_done_callback(lambda _: _pending.release())
+    return await asyncio.wait_for(_verify(job, password, repository, hasher), timeout)
+
+
+async def _verify(job: Future, password: str, repository: UserRepository, hasher: PasswordHasher) -> bool:
+    user = await asyncio.wrap_future(job)
+    # an unknown username costs a full verification too, so response times
+    # do not tell which usernames exist
+    stored = user[1] if user is not None else hasher.dummy
+    try:
+        valid = await hasher.verify(password, stored) and user is not None
+    except ValueError as err:
+        raise _unreadable(user, err) from err
+    if valid and hasher.needs_rehash(stored):
+        _executor.submit(_upgrade_password, repository, hasher, user[0], password)
+    return valid
+
+
+async def log_in(
+    username: str,
+    password: str,
+    repository: UserRepository | None = None,
+    sessions: SessionStore | None = None,
+    throttle: LoginThrottle | None = None,
+    hasher: PasswordHasher | None = None,
+    timeout: float = LOGIN_TIMEOUT,
+) -> str | None:
+    """
+    Log in and return a session token, or None for wrong credentials.
+
+    A user who already has a live session opened with the same password is
+    answered from memory. Anything else must get past the throttle, which
+    raises ``LoginThrottledError`` without touching the database, before
+    the credentials are checked (with the errors of
+    ``check_credentials_async``).
+    """
+    if sessions is None:
+        sessions = get_session_store()
+    if throttle is None:
+        throttle = get_throttle()
+    session = sessions.check(username, password)
+    if session is not None:
+        return session.token
+    throttle.acquire(username)
+    if not await check_credentials_async(username, password, repository, hasher, timeout):
+        throttle.record_failure(username)
+        return None
+    throttle.record_success(username)
+    return sessions.issue(username, password)
@@ -0,0 +1,583 @@
+"""
+Login benchmarks against an in-process stand-in database (fake_db.py),
+so no MySQL server is needed:
+
+    python bench_login.py pool --logins 200 --connect-ms 20
+    python bench_login.py loop --query-ms 300
+    python bench_login.py repo --users 100000
+    python bench_login.py session --users 50 --repeats 20
+    python bench_login.py throttle --usernames 1000000
+    python bench_login.py hash --logins 40 --target-ms 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import tracemalloc
+import threading
+import time
+from pathlib import Path
+
+import auth
+from db_connection import ConnectionPool
+from fake_db import FakeDatabase
+from passwords import PasswordHasher, calibrate, hash_password
+from session import SessionStore
+from throttle import LoginThrottle, LoginThrottledError
+from user_repository import MySQLUserRepository, RepositoryError, SQLiteUserRepository, UserRepository
+
+def cheap_hasher() -> PasswordHasher:
+    """A near-free work factor, for benchmarks of the layers around hashing."""
+    return PasswordHasher("pbkdf2_sha256", scheme="pbkdf2_sha256$1", workers=1)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of samples (pct in 0-100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(label: str, samples: list[float]) -> str:
+    ms = [s * 1000 for s in samples]
+    return (
+        f"{label:<24} n={len(ms):<5} mean={statistics.fmean(ms):7.2f}ms "
+        f"p50={percentile(ms, 50):7.2f}ms p95={percentile(ms, 95):7.2f}ms"
+    )
+
+
+def run_threads(count: int, threads: int, login) -> list[float]:
+    """Run ``count`` logins spread over ``threads`` threads; return durations."""
+    samples: list[float] = []
+    lock = threading.Lock()
+
+    def worker(n: int) -> None:
+        for _ in range(n):
+            start = time.perf_counter()
+            login()
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples.append(elapsed)
+
+    workers = [threading.Thread(target=worker, args=(count // threads,)) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return samples
+
+
+# ---------------- pool: connect per login vs pooled connections ----------------
+def bench_pool(args: argparse.Namespace) -> None:
+    db = FakeDatabase(connect_latency=args.connect_ms / 1000, query_latency=args.query_ms / 1000)
+
+    def connect_per_login() -> None:
+        conn = db.connect()
+        cursor = conn.cursor()
+        cursor.execute(UserRepository.FIND_USER, ("testuser",))
+        cursor.fetchone()
+        conn.close()
+
+    pool = ConnectionPool(connect=db.connect, size=args.pool_size)
+    start = time.perf_counter()
+    pool.warm_up()
+    warm_up = time.perf_counter() - start
+
+    def pooled_login() -> None:
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(UserRepository.FIND_USER, ("testuser",))
+            cursor.fetchone()
+
+    for threads in (1, args.threads):
+        db.connects = 0
+        plain = run_threads(args.logins, threads, connect_per_login)
+        plain_connects = db.connects
+        db.connects = 0
+        pooled = run_threads(args.logins, threads, pooled_login)
+        print(f"threads={threads}")
+        print(f"  {summarize('connect per login', plain)} connects={plain_connects}")
+        print(f"  {summarize('pooled', pooled)} connects={db.connects}")
+    print(f"warm-up of {args.pool_size} connections took {warm_up * 1000:.0f}ms at startup")
+
+    # the server restarts: idle connections are dead and must not be handed out
+    pool.health_check_after = 0.0
+    for conn, _ in list(pool._idle.queue):
+        conn.close()
+    db.connects = 0
+    pooled_login()
+    print(
+        f"after a server restart: {pool.failed_checks} dead connections dropped by the "
+        f"health check, {db.connects} new connection opened, login still succeeded"
+    )
+    pool.close()
+
+
+# ---------------- loop: event-loop responsiveness during logins ----------------
+async def _heartbeat(gaps: list[float], stop: asyncio.Event, interval: float = 0.01) -> None:
+    """Tick every ``interval`` seconds and record how late each tick was."""
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        gaps.append(now - last - interval)
+        last = now
+
+
+async def _measure(login, logins: int) -> tuple[float, float]:
+    """Run logins one after another next to a heartbeat; return (worst stall, total)."""
+    gaps: list[float] = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(_heartbeat(gaps, stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    for _ in range(logins):
+        await login()
+    total = time.perf_counter() - start
+    stop.set()
+    await beat
+    return max(gaps), total
+
+
+async def _run_loop(args: argparse.Namespace) -> None:
+    hasher = cheap_hasher()
+    db = FakeDatabase(connect_latency=args.connect_ms / 1000, query_latency=args.query_ms / 1000)
+    repository = MySQLUserRepository(ConnectionPool(connect=db.connect))
+    repository.warm_up()
+
+    async def inline_login() -> bool:
+        # what login_click used to do: blocking driver calls on the loop
+        return auth.check_credentials("testuser", "password123", repository, hasher)
+
+    async def offloaded_login() -> bool:
+        return await auth.check_credentials_async("testuser", "password123", repository, hasher)
+
+    stall, total = await _measure(inline_login, args.logins)
+    print(f"blocking on the loop:   worst UI stall {stall * 1000:7.1f}ms, {args.logins} logins in {total:.2f}s")
+    stall, total = await _measure(offloaded_login, args.logins)
+    print(f"offloaded to threads:   worst UI stall {stall * 1000:7.1f}ms, {args.logins} logins in {total:.2f}s")
+
+    # a second click cancels the first: only the newest attempt reports back
+    first = asyncio.create_task(offloaded_login())
+    await asyncio.sleep(0.01)
+    first.cancel()
+    second = await offloaded_login()
+    print(f"re-click: first attempt cancelled={first.cancelled()}, second attempt valid={second}")
+
+    # a hung database is given up on after the timeout
+    db.query_latency = args.timeout * 4
+    start = time.perf_counter()
+    try:
+        await auth.check_credentials_async("testuser", "password123", repository, hasher, args.timeout)
+    except asyncio.TimeoutError:
+        print(f"hung database: gave up after {time.perf_counter() - start:.2f}s (timeout {args.timeout}s)")
+    hasher.close()
+
+
+def bench_loop(args: argparse.Namespace) -> None:
+    asyncio.run(_run_loop(args))
+
+
+# ---------------- repo: prepared statements and the username index ----------------
+class _UnindexedSQLiteRepository(SQLiteUserRepository):
+    # the table alone: every lookup scans all users
+    SCHEMA = SQLiteUserRepository.SCHEMA[:1]
+
+
+def _populate(repository: SQLiteUserRepository, users: int) -> None:
+    conn = sqlite3.connect(repository.path)
+    for statement in repository.SCHEMA:
+        conn.execute(statement)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (username, password) VALUES (?, ?)",
+            ((f"user{i}", f"password{i}") for i in range(users)),
+        )
+    conn.close()
+
+
+def bench_repo(args: argparse.Namespace) -> None:
+    # MySQL: how often the server parses the login query
+    db = FakeDatabase(connect_latency=0, query_latency=0)
+    pool = ConnectionPool(connect=db.connect, size=args.pool_size)
+
+    def plain_login() -> None:
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(UserRepository.FIND_USER, ("testuser",))
+            cursor.fetchone()
+
+    run_threads(args.logins, args.threads, plain_login)
+    plain_parses, db.parses = db.parses, 0
+    repository = MySQLUserRepository(pool)
+    run_threads(args.logins, args.threads, lambda: repository.find_user("testuser"))
+    print(f"mysql, {args.logins} logins over {args.pool_size} pooled connections:")
+    print(f"  plain cursor:       {plain_parses} statement parses")
+    print(f"  cached prepared:    {db.parses} statement parses")
+
+    # SQLite: lookup cost with and without the index and the statement cache
+    names = [f"user{random.randrange(args.users)}" for _ in range(args.logins)]
+    with tempfile.TemporaryDirectory() as tmp:
+        variants = {
+            "no index": _UnindexedSQLiteRepository(Path(tmp, "plain.db")),
+            "index, no stmt cache": SQLiteUserRepository(Path(tmp, "indexed.db"), cached_statements=0),
+            "index + stmt cache": SQLiteUserRepository(Path(tmp, "indexed.db")),
+        }
+        _populate(variants["no index"], args.users)
+        _populate(variants["index + stmt cache"], args.users)
+        print(f"sqlite, {args.users} users:")
+        for label, repository in variants.items():
+            logins = iter(names[: args.scan_logins] if label == "no index" else names)
+
+            def login(repository: UserRepository = repository) -> None:
+                name = next(logins)
+                assert repository.find_user(name) is not None
+
+            samples = run_threads(args.scan_logins if label == "no index" else args.logins, 1, login)
+            print(f"  {summarize(label, samples)}")
+            repository.close()
+
+        # load test: the app's repository under concurrent logins
+        repository = variants["index + stmt cache"]
+        logins = iter(names * args.threads)
+        lock = threading.Lock()
+
+        def concurrent_login() -> None:
+            with lock:
+                name = next(logins)
+            repository.find_user(name)
+
+        start = time.perf_counter()
+        samples = run_threads(args.logins * args.threads, args.threads, concurrent_login)
+        elapsed = time.perf_counter() - start
+        print(f"  {summarize(f'{args.threads} threads', samples)} {len(samples) / elapsed:,.0f} logins/s")
+        repository.close()
+
+
+# ---------------- session: repeated logins served from memory ----------------
+async def _burst(login, attempts: list[tuple[str, str]], concurrency: int) -> list[float]:
+    """Run every attempt with at most ``concurrency`` in flight; return durations."""
+    samples: list[float] = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def attempt(username: str, password: str) -> None:
+        async with gate:
+            start = time.perf_counter()
+            assert await login(username, password)
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(attempt(u, p) for u, p in attempts))
+    return samples
+
+
+async def _run_session(args: argparse.Namespace) -> None:
+    hasher = cheap_hasher()
+    users = {f"user{i}": f"password{i}" for i in range(args.users)}
+    db = FakeDatabase(users, connect_latency=0, query_latency=args.query_ms / 1000)
+    repository = MySQLUserRepository(ConnectionPool(connect=db.connect))
+    repository.warm_up()
+    # a burst: every user clicks Login several times in a row
+    attempts = [item for item in users.items() for _ in range(args.repeats)]
+    random.shuffle(attempts)
+
+    async def without_sessions(username: str, password: str) -> bool:
+        return await auth.check_credentials_async(username, password, repository, hasher)
+
+    sessions = SessionStore(ttl=args.ttl)
+    # measure the session store alone, not the login throttle
+    unlimited = LoginThrottle(user_rate=1e9, user_burst=10**9, global_rate=1e9, global_burst=10**9)
+
+    async def with_sessions(username: str, password: str) -> str | None:
+        return await auth.log_in(username, password, repository, sessions, unlimited, hasher)
+
+    for label, login in (("database every time", without_sessions), ("session store", with_sessions)):
+        db.queries = 0
+        start = time.perf_counter()
+        samples = await _burst(login, attempts, auth.MAX_PENDING)
+        elapsed = time.perf_counter() - start
+        print(f"{summarize(label, samples)} db queries={db.queries:<5} total={elapsed:.2f}s")
+    print(f"session store: hits={sessions.hits} misses={sessions.misses}")
+
+    # a wrong password never rides on someone's session
+    db.queries = 0
+    rejected = await auth.log_in("user0", "wrong", repository, sessions, unlimited, hasher)
+    print(f"wrong password with a live session: token={rejected}, db queries={db.queries}")
+
+    # sessions expire after the TTL and are re-checked against the database
+    short = SessionStore(ttl=0.05)
+    await auth.log_in("user0", "password0", repository, short, unlimited, hasher)
+    await asyncio.sleep(0.1)
+    db.queries = 0
+    await auth.log_in("user0", "password0", repository, short, unlimited, hasher)
+    print(f"after the TTL: expired={short.expired}, db queries={db.queries}")
+
+    # a store smaller than the user base keeps the most recent users
+    small = SessionStore(capacity=max(1, args.users // 2))
+    db.queries = 0
+    await _burst(lambda u, p: auth.log_in(u, p, repository, small, unlimited, hasher), attempts, auth.MAX_PENDING)
+    print(
+        f"capacity {small.capacity} for {args.users} users: {len(small)} sessions kept, "
+        f"evictions={small.evictions}, db queries={db.queries}"
+    )
+    hasher.close()
+
+
+def bench_session(args: argparse.Namespace) -> None:
+    asyncio.run(_run_session(args))
+
+
+# ---------------- throttle: rejected attempts never reach the database ----------------
+async def _attack(
+    repository: UserRepository,
+    hasher: PasswordHasher,
+    throttle: LoginThrottle | None,
+    attempts: list[tuple[str, str]],
+) -> dict:
+    outcome = {"accepted": 0, "wrong": 0, "throttled": 0, "locked": 0}
+    for username, password in attempts:
+        try:
+            if throttle is None:
+                ok = await auth.check_credentials_async(username, password, repository, hasher)
+            else:
+                ok = await auth.log_in(username, password, repository, SessionStore(), throttle, hasher)
+        except LoginThrottledError as err:
+            outcome["locked" if err.locked else "throttled"] += 1
+            continue
+        outcome["accepted" if ok else "wrong"] += 1
+    return outcome
+
+
+async def _run_throttle(args: argparse.Namespace) -> None:
+    hasher = cheap_hasher()
+    db = FakeDatabase(connect_latency=0, query_latency=0)
+    repository = MySQLUserRepository(ConnectionPool(connect=db.connect))
+
+    # brute force: one username, many wrong passwords as fast as possible
+    guesses = [("testuser", f"guess{i}") for i in range(args.attempts)]
+    for label, throttle in (("no throttle", None), ("throttled", LoginThrottle())):
+        db.queries = 0
+        outcome = await _attack(repository, hasher, throttle, guesses)
+        print(f"brute force, {label:<12} db queries={db.queries:<5} {outcome}")
+
+    # credential stuffing: a different username every attempt
+    stuffing = [(f"user{i}", "password") for i in range(args.attempts)]
+    throttle = LoginThrottle()
+    db.queries = 0
+    outcome = await _attack(repository, hasher, throttle, stuffing)
+    print(f"stuffing,    {'throttled':<12} db queries={db.queries:<5} {outcome}")
+
+    # lockouts double with every further failure
+    throttle = LoginThrottle(lockout_after=3, lockout_base=1.0)
+    waits = []
+    for _ in range(7):
+        throttle.record_failure("testuser")
+        try:
+            throttle.acquire("testuser")
+        except LoginThrottledError as err:
+            waits.append(round(err.retry_after))
+    print(f"lockout after failures 3..7: {waits} seconds; a correct password clears it")
+
+    # memory stays fixed however many usernames are tried
+    throttle = LoginThrottle(global_rate=1e9, global_burst=10**9)
+    tracemalloc.start()
+    start = time.perf_counter()
+    shared = 0
+    for i in range(args.usernames):
+        try:
+            throttle.acquire(f"sprayed{i}")
+        except LoginThrottledError:
+            shared += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{args.usernames:,} distinct usernames: state {throttle.nbytes / 2**20:.1f} MiB "
+        f"(fixed), extra peak {peak / 2**20:.2f} MiB, {elapsed / args.usernames * 1e6:.2f}us per attempt"
+    )
+    # with the global bucket off, the spray lands all at once; at GLOBAL_RATE
+    # a slot would see one attempt every slots / rate seconds
+    print(
+        f"  {shared:,} rejected by buckets shared with earlier usernames in the same instant; "
+        f"at {LoginThrottle().global_rate:.0f}/s a slot sees one attempt every "
+        f"{throttle.slots / LoginThrottle().global_rate / 60:.0f} min"
+    )
+    sample = min(args.usernames, 100_000)
+    tracemalloc.start()
+    buckets = {f"sprayed{i}": [5.0, 0.0, 0, 0.0, 0.0] for i in range(sample)}
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del buckets
+    print(f"  a dict of per-user buckets would need ~{current / sample * args.usernames / 2**20:.0f} MiB")
+    hasher.close()
+
+
+def bench_throttle(args: argparse.Namespace) -> None:
+    asyncio.run(_run_throttle(args))
+
+
+# ---------------- hash: KDF verification in a process pool ----------------
+async def _run_hash(args: argparse.Namespace) -> None:
+    target = args.target_ms / 1000
+    for algorithm in ("pbkdf2_sha256", "scrypt"):
+        scheme = calibrate(algorithm, target)
+        start = time.perf_counter()
+        hash_password("x", scheme)
+        print(f"calibrated {scheme:<24} one hash {(time.perf_counter() - start) * 1000:6.1f}ms (target {args.target_ms:.0f}ms)")
+
+    scheme = calibrate(args.kdf, target)
+    users = {f"user{i}": f"password{i}" for i in range(args.logins)}
+    db = FakeDatabase({u: hash_password(p, scheme) for u, p in users.items()}, connect_latency=0, query_latency=0)
+    repository = MySQLUserRepository(ConnectionPool(connect=db.connect))
+    repository.warm_up()
+    attempts = list(users.items())
+    print(f"{args.logins} concurrent logins with {scheme} on {os.cpu_count()} CPU(s):")
+
+    inline_hasher = PasswordHasher(args.kdf, scheme=scheme, workers=1)
+    inline_hasher.current_scheme()
+
+    async def inline(username: str, password: str) -> bool:
+        # verification on the event loop: what a naive KDF login would do
+        return auth.check_credentials(username, password, repository, inline_hasher)
+
+    gaps: list[float] = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(_heartbeat(gaps, stop))
+    start = time.perf_counter()
+    await _burst(inline, attempts, auth.MAX_PENDING)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    print(f"  {'on the event loop':<22} {args.logins / elapsed:7.1f} logins/s  worst UI stall {max(gaps) * 1000:7.1f}ms")
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        hasher = PasswordHasher(args.kdf, scheme=scheme, workers=workers)
+        hasher.calibrate()
+
+        async def pooled(username: str, password: str, hasher: PasswordHasher = hasher) -> bool:
+            return await auth.check_credentials_async(username, password, repository, hasher, timeout=60)
+
+        gaps = []
+        stop = asyncio.Event()
+        beat = asyncio.create_task(_heartbeat(gaps, stop))
+        start = time.perf_counter()
+        await _burst(pooled, attempts, auth.MAX_PENDING)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await beat
+        print(
+            f"  {f'process pool x{workers}':<22} {args.logins / elapsed:7.1f} logins/s  "
+            f"worst UI stall {max(gaps) * 1000:7.1f}ms"
+        )
+        hasher.close()
+
+    # plaintext rows are upgraded by the first successful login
+    sample = list(users.items())[:5]
+    legacy = FakeDatabase(dict(sample), connect_latency=0, query_latency=0)
+    repository = MySQLUserRepository(ConnectionPool(connect=legacy.connect))
+    hasher = PasswordHasher(args.kdf, scheme=scheme, workers=1)
+    for username, password in sample:
+        assert await auth.check_credentials_async(username, password, repository, hasher)
+    # the upgrades run in the background; give them until the deadline
+    deadline = time.perf_counter() + max(5.0, target * 50)
+    while time.perf_counter() < deadline:
+        upgraded = sum(stored.startswith(scheme) for _, stored in legacy.users.values())
+        if upgraded == len(sample):
+            break
+        await asyncio.sleep(target)
+    again = all([await auth.check_credentials_async(u, p, repository, hasher) for u, p in sample])
+    print(f"plaintext upgrade: {upgraded}/{len(sample)} rows hashed after one login each; logging in again works={again}")
+    # a restart calibrates a slightly different work factor (scrypt one
+    # step of n lower, PBKDF2 20% fewer iterations); that alone must not
+    # rewrite every stored hash
+    algorithm, *cost = scheme.split("$")
+    if algorithm == "scrypt":
+        lower = f"scrypt${int(cost[0]) // 2}${cost[1]}${cost[2]}"
+    else:
+        lower = f"{algorithm}${int(cost[0]) * 4 // 5}"
+    _, stored = next(iter(legacy.users.values()))
+    restarted = PasswordHasher(args.kdf, scheme=lower)
+    print(f"after recalibrating to {lower}: rehash needed={restarted.needs_rehash(stored)}")
+
+    # corrupted password rows: the login reports a database problem
+    # (RepositoryError) instead of failing with a ValueError
+    corrupted = {
+        "truncated": stored[: len(stored) // 2],
+        "bad base64": stored.rsplit("$", 1)[0] + "$not*base64",
+        "bad work factor": f"{algorithm}$abc$" + stored.rsplit("$", 2)[1] + "$" + stored.rsplit("$", 1)[1],
+    }
+    broken = FakeDatabase(corrupted, connect_latency=0, query_latency=0)
+    repository = MySQLUserRepository(ConnectionPool(connect=broken.connect))
+    for username in corrupted:
+        for check in (auth.check_credentials_async, auth.check_credentials):
+            try:
+                result = check(username, "password0", repository, hasher)
+                if asyncio.iscoroutine(result):
+                    await result
+            except RepositoryError:
+                continue
+            raise AssertionError(f"{check.__name__} accepted a {username} password row")
+    print(f"corrupted password rows ({', '.join(corrupted)}): reported as RepositoryError")
+    hasher.close()
+
+
+def bench_hash(args: argparse.Namespace) -> None:
+    asyncio.run(_run_hash(args))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Login benchmarks against a stand-in database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pool = sub.add_parser("pool", help="connect per login vs pooled connections")
+    pool.add_argument("--logins", type=int, default=200)
+    pool.add_argument("--threads", type=int, default=8)
+    pool.add_argument("--pool-size", type=int, default=5)
+    pool.add_argument("--connect-ms", type=float, default=20, help="simulated connection handshake")
+    pool.add_argument("--query-ms", type=float, default=1, help="simulated query round trip")
+    pool.set_defaults(func=bench_pool)
+
+    loop = sub.add_parser("loop", help="event-loop responsiveness while logins run")
+    loop.add_argument("--logins", type=int, default=5)
+    loop.add_argument("--connect-ms", type=float, default=20)
+    loop.add_argument("--query-ms", type=float, default=300, help="a slow database")
+    loop.add_argument("--timeout", type=float, default=0.5)
+    loop.set_defaults(func=bench_loop)
+
+    repo = sub.add_parser("repo", help="prepared statements, username index, SQLite load test")
+    repo.add_argument("--logins", type=int, default=2000)
+    repo.add_argument("--scan-logins", type=int, default=50, help="lookups without the index (slow)")
+    repo.add_argument("--users", type=int, default=100_000)
+    repo.add_argument("--threads", type=int, default=8)
+    repo.add_argument("--pool-size", type=int, default=5)
+    repo.set_defaults(func=bench_repo)
+
+    session = sub.add_parser("session", help="burst of repeated logins with and without sessions")
+    session.add_argument("--users", type=int, default=50)
+    session.add_argument("--repeats", type=int, default=20, help="logins per user in the burst")
+    session.add_argument("--query-ms", type=float, default=5)
+    session.add_argument("--ttl", type=float, default=900)
+    session.set_defaults(func=bench_session)
+
+    throttle = sub.add_parser("throttle", help="brute force, credential stuffing and memory bounds")
+    throttle.add_argument("--attempts", type=int, default=1000)
+    throttle.add_argument("--usernames", type=int, default=1_000_000)
+    throttle.set_defaults(func=bench_throttle)
+
+    hashing = sub.add_parser("hash", help="KDF calibration, concurrent login throughput, plaintext upgrade")
+    hashing.add_argument("--logins", type=int, default=40)
+    hashing.add_argument("--target-ms", type=float, default=50)
+    hashing.add_argument("--kdf", choices=("scrypt", "pbkdf2_sha256"), default="scrypt")
+    hashing.set_defaults(func=bench_hash)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,180 @@
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
 import mysql.connector
 from mysql.connector import MySQLConnection
 
+# Pool defaults: a login app only ever runs a handful of queries at once.
+POOL_SIZE = 5
+MAX_IDLE_SECONDS = 300.0  # recycle connections idle longer than this
+HEALTH_CHECK_SECONDS = 30.0  # ping connections idle longer than this
+ACQUIRE_TIMEOUT = 5.0
+
 
 def connect_db() -> MySQLConnection:
     """
     Establish and return a connection to the MySQL database.
 
-    Update the password below to your actual MySQL root password before running.
+    Connection settings come from ``MYSQL_HOST``, ``MYSQL_USER``,
+    ``MYSQL_PASSWORD`` and ``MYSQL_DATABASE``; the defaults match the lab setup.
     """
     return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="admin123",  # TODO: Replace with your actual MySQL root password
-        database="fletapp",
+        host=os.getenv("MYSQL_HOST", "localhost"),
+        user=os.getenv("MYSQL_USER", "root"),
+        password=os.getenv("MYSQL_PASSWORD", "admin123"),
+        database=os.getenv("MYSQL_DATABASE", "fletapp"),
+        # pooled connections are reused; without autocommit a connection
+        # would keep reading from the snapshot of its first query
+        autocommit=True,
     )
 
 
+def ping(conn: Any) -> bool:
+    """Health check: one round trip to the server."""
+    try:
+        conn.ping(reconnect=False)
+        return True
+    except mysql.connector.Error:
+        return False
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of reusable database connections.
+
+    At most ``size`` connections exist at once; ``connection()`` waits up to
+    ``acquire_timeout`` seconds for one to free up. Idle connections are
+    pinged before reuse once they have been idle ``health_check_after``
+    seconds and are closed and replaced after ``max_idle`` seconds, so
+    connections the server has dropped are never handed out.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any] = connect_db,
+        size: int = POOL_SIZE,
+        max_idle: float = MAX_IDLE_SECONDS,
+        health_check_after: float = HEALTH_CHECK_SECONDS,
+        acquire_timeout: float = ACQUIRE_TIMEOUT,
+        health_check: Callable[[Any], bool] = ping,
+    ) -> None:
+        self.connect = connect
+        self.size = max(1, size)
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.acquire_timeout = acquire_timeout
+        self.health_check = health_check
+        # (connection, idle since); LIFO keeps the warmest connections busy
+        # and lets the rest age out
+        self._idle: queue.LifoQueue[tuple[Any, float]] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.recycled = 0
+        self.failed_checks = 0
+
+    def warm_up(self, count: int | None = None) -> int:
+        """Open connections ahead of the first login. Returns how many opened.
+
+        Brings ``min(count, size)`` connections up, reusing idle ones. Each
+        takes a pool slot like a borrower would, so connections in use count
+        too and the pool never holds more than ``size`` in total.
+        """
+        count = self.size if count is None else min(max(0, count), self.size)
+        held: list[Any] = []
+        opened_before = self.opened
+        try:
+            for _ in range(count):
+                if not self._slots.acquire(blocking=False):
+                    break
+                try:
+                    held.append(self._checkout())
+                except mysql.connector.Error:
+                    self._slots.release()
+                    break
+        finally:
+            for conn in held:
+                self._idle.put((conn, time.monotonic()))
+                self._slots.release()
+        return self.opened - opened_before
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection; it goes back to the pool when the block ends.
+
+        A connection whose block raised a database error is closed instead
+        of being reused.
+        """
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise mysql.connector.errors.PoolError("No database connection available")
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except mysql.connector.Error:
+            self._discard(conn)
+            conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put((conn, time.monotonic()))
+            self._slots.release()
+
+    def _checkout(self) -> Any:
+        while True:
+            try:
+                conn, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            idle = time.monotonic() - idle_since
+            if idle > self.max_idle:
+                self.recycled += 1
+                self._discard(conn)
+                continue
+            if idle > self.health_check_after and not self.health_check(conn):
+                self.failed_checks += 1
+                self._discard(conn)
+                continue
+            return conn
+
+    def _open(self) -> Any:
+        conn = self.connect()
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    @staticmethod
+    def _discard(conn: Any) -> None:
+        if conn is None:
+            return
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """The app-wide connection pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
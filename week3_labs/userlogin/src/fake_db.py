@@ -0,0 +1,113 @@
+"""
+In-process stand-in for the MySQL server, for benchmarks without one.
+
+Every new connection costs ``connect_latency`` seconds (TCP handshake,
+TLS and authentication on a real server) and every query costs
+``query_latency`` seconds. Only the statements the login app runs against
+the ``users`` table are understood.
+"""
+
+import threading
+import time
+from typing import Any
+
+import mysql.connector
+
+
+class FakeDatabase:
+    def __init__(
+        self,
+        users: dict[str, str] | None = None,
+        connect_latency: float = 0.02,
+        query_latency: float = 0.001,
+    ) -> None:
+        # username -> (id, password)
+        self.users: dict[str, tuple[int, str]] = {}
+        for username, password in (users or {"testuser": "password123"}).items():
+            self.users[username] = (len(self.users) + 1, password)
+        self.connect_latency = connect_latency
+        self.query_latency = query_latency
+        self.down = False
+        self.lock = threading.Lock()
+        self.connects = 0
+        self.queries = 0
+        # statements the server had to parse (prepared or plain)
+        self.parses = 0
+
+    def connect(self) -> "FakeConnection":
+        time.sleep(self.connect_latency)
+        if self.down:
+            raise mysql.connector.errors.InterfaceError("Can't connect to MySQL server")
+        with self.lock:
+            self.connects += 1
+        return FakeConnection(self)
+
+    def run(self, sql: str, params: tuple, parse: bool = True) -> list[tuple]:
+        time.sleep(self.query_latency)
+        if self.down:
+            raise mysql.connector.errors.OperationalError("Lost connection to MySQL server")
+        with self.lock:
+            self.queries += 1
+            self.parses += parse
+        statement = " ".join(sql.split())
+        if statement.upper().startswith("UPDATE USERS SET PASSWORD"):
+            password, user_id = params
+            for username, (uid, _) in list(self.users.items()):
+                if uid == user_id:
+                    self.users[username] = (uid, password)
+            return []
+        # SELECT <columns> FROM users WHERE username = %s [AND password = %s]
+        columns = [c.strip() for c in statement[len("SELECT ") : statement.upper().index(" FROM ")].split(",")]
+        user = self.users.get(params[0])
+        if user is None or (len(params) > 1 and user[1] != params[1]):
+            return []
+        values = {"id": user[0], "username": params[0], "password": user[1]}
+        return [tuple(values[c] for c in columns)]
+
+
+class FakeConnection:
+    def __init__(self, db: FakeDatabase) -> None:
+        self.db = db
+        self.open = True
+
+    def cursor(self, prepared: bool = False, **kwargs: Any) -> "FakeCursor":
+        return FakeCursor(self, prepared)
+
+    def ping(self, reconnect: bool = False) -> None:
+        time.sleep(self.db.query_latency)
+        if not self.open or self.db.down:
+            raise mysql.connector.errors.InterfaceError("Lost connection to MySQL server")
+
+    def is_connected(self) -> bool:
+        return self.open and not self.db.down
+
+    def close(self) -> None:
+        self.open = False
+
+
+class FakeCursor:
+    def __init__(self, conn: FakeConnection, prepared: bool = False) -> None:
+        self.conn = conn
+        self.prepared = prepared
+        self.statement: str | None = None
+        self.rows: list[tuple] = []
+        # read by UserRepository._execute; no INSERT here ever sets it
+        self.lastrowid: int | None = None
+
+    def execute(self, sql: str, params: tuple = ()) -> None:
+        if not self.conn.open:
+            raise mysql.connector.errors.OperationalError("Connection closed")
+        # like MySQLCursorPrepared: the same SQL object reuses the statement
+        parse = not self.prepared or sql is not self.statement
+        self.statement = sql
+        self.rows = self.conn.db.run(sql, tuple(params), parse)
+
+    def fetchone(self) -> tuple | None:
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self) -> list[tuple]:
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self) -> None:
+        pass
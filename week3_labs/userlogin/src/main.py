@@ -1,6 +1,11 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+
 import flet as ft
-import mysql.connector
-from db_connection import connect_db
+from auth import LoginBusyError, log_in
+from passwords import get_hasher
+from throttle import LoginThrottledError
+from user_repository import RepositoryError, get_repository
 
 
 def main(page: ft.Page) -> None:
@@ -14,6 +19,13 @@ def main(page: ft.Page) -> None:
     page.window_width = 400
     page.bgcolor = ft.Colors.AMBER_ACCENT
 
+    # Open database connections in the background so the first login
+    # does not pay for the connection handshake
+    repository = get_repository()
+    page.run_thread(repository.warm_up)
+    # Measure the password-hash work factor and start the hashing processes
+    page.run_thread(get_hasher().calibrate)
+
     # UI controls
     title_text = ft.Text(
         value="User Login",
@@ -46,6 +58,16 @@ def main(page: ft.Page) -> None:
         bgcolor=ft.Colors.LIGHT_BLUE_ACCENT,
     )
 
+    # Pending state: a spinner while credentials are checked, and the
+    # click whose check is still running
+    progress_ring = ft.ProgressRing(width=20, height=20, stroke_width=2, visible=False)
+    login_state = {"task": None}
+
+    def set_pending(pending: bool) -> None:
+        progress_ring.visible = pending
+        login_button.text = "Checking..." if pending else "Login"
+        page.update()
+
     async def login_click(e):  # noqa: ANN001
         username = (username_field.value or "").strip()
         password = (password_field.value or "").strip()
@@ -90,6 +112,16 @@ def main(page: ft.Page) -> None:
             actions=[ft.TextButton("OK", on_click=lambda _: close_dialog())],
         )
 
+        def throttled_dialog(err: LoginThrottledError) -> ft.AlertDialog:
+            return ft.AlertDialog(
+                title=ft.Text("Too Many Attempts"),
+                content=ft.Row(
+                    [ft.Icon(ft.Icons.TIMER, color=ft.Colors.ORANGE), ft.Text(f"{err}.")],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                ),
+                actions=[ft.TextButton("OK", on_click=lambda _: close_dialog())],
+            )
+
         def open_dialog(dlg: ft.AlertDialog) -> None:
             page.dialog = dlg
             dlg.open = True
@@ -105,24 +137,38 @@ def main(page: ft.Page) -> None:
             open_dialog(invalid_input_dialog)
             return
 
-        # Database logic
+        # A new click supersedes a login that is still being checked
+        previous = login_state["task"]
+        if previous is not None and not previous.done():
+            previous.cancel()
+        this_task = asyncio.current_task()
+        login_state["task"] = this_task
+        set_pending(True)
+
+        # Repeat logins are answered from the session store; database logic
+        # runs on a worker thread so the UI stays responsive
         try:
-            conn = connect_db()
-            cursor = conn.cursor()
-            # Parameterized query to prevent SQL injection
-            cursor.execute(
-                "SELECT id FROM users WHERE username = %s AND password = %s",
-                (username, password),
-            )
-            row = cursor.fetchone()
-            conn.close()
-
-            if row:
-                open_dialog(success_dialog)
-            else:
-                open_dialog(failure_dialog)
-        except mysql.connector.Error:
+            token = await log_in(username, password, repository)
+            valid = token is not None
+        except (RepositoryError, asyncio.TimeoutError, LoginBusyError, BrokenProcessPool):
+            valid = None
+        except LoginThrottledError as err:
+            # answered from memory; the database never saw this attempt
+            open_dialog(throttled_dialog(err))
+            return
+        finally:
+            # a superseded click leaves the pending state to the newer one
+            if login_state["task"] is this_task:
+                login_state["task"] = None
+                set_pending(False)
+
+        if valid is None:
             open_dialog(database_error_dialog)
+        elif valid:
+            page.session.set("session_token", token)
+            open_dialog(success_dialog)
+        else:
+            open_dialog(failure_dialog)
 
     login_button = ft.ElevatedButton(
         text="Login",
@@ -140,7 +186,7 @@ def main(page: ft.Page) -> None:
                     content=ft.Column([username_field, password_field], spacing=20),
                 ),
                 ft.Container(
-                    content=ft.Row([login_button], alignment=ft.MainAxisAlignment.END),
+                    content=ft.Row([progress_ring, login_button], alignment=ft.MainAxisAlignment.END),
                     margin=ft.margin.only(0, 20, 40, 0),
                 ),
             ],
@@ -0,0 +1,241 @@
+"""
+Password hashing with a key-derivation function from hashlib.
+
+Stored passwords look like
+
+    scrypt$<n>$<r>$<p>$<salt>$<hash>
+    pbkdf2_sha256$<iterations>$<salt>$<hash>
+
+and anything else in the ``password`` column is treated as a plaintext
+password from before hashing, to be upgraded on the user's next login.
+Hashing costs tens of milliseconds of CPU on purpose, so ``PasswordHasher``
+runs it in a process pool: off the event loop, and on every core.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+KDF = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+TARGET_SECONDS = 0.1  # time one hash should take on this machine
+# calibration never goes below these, however slow the machine
+PBKDF2_MIN_ITERATIONS = 100_000
+SCRYPT_MIN_N = 1 << 14
+SCRYPT_MAX_N = 1 << 17  # 128 MiB per hash with r=8
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+# calibration wobbles between runs (and scrypt n moves in doubling steps),
+# so only hashes below this fraction of the current work factor get redone
+REHASH_TOLERANCE = 0.5
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4), validate=True)
+
+
+def _derive(password: str, salt: bytes, scheme: str) -> bytes:
+    algorithm, *cost = scheme.split("$")
+    if algorithm == "scrypt":
+        n, r, p = map(int, cost)
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=32)
+    if algorithm == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, int(cost[0]))
+    raise ValueError(f"Unknown password scheme {scheme!r}")
+
+
+def is_hashed(stored: str) -> bool:
+    return stored.startswith(("scrypt$", "pbkdf2_sha256$"))
+
+
+def scheme_of(stored: str) -> str:
+    """The algorithm and work factor part of a stored hash."""
+    return stored.rsplit("$", 2)[0]
+
+
+def work_factor(scheme: str) -> tuple[str, int]:
+    """(algorithm, cost) of a scheme; cost is comparable within an algorithm."""
+    algorithm, *cost = scheme.split("$")
+    if algorithm == "scrypt":
+        n, r, p = map(int, cost)
+        return algorithm, n * r * p
+    return algorithm, int(cost[0])
+
+
+def hash_password(password: str, scheme: str) -> str:
+    """Hash ``password`` with a fresh salt. CPU-heavy; see ``PasswordHasher``."""
+    salt = secrets.token_bytes(SALT_BYTES)
+    return f"{scheme}${_b64(salt)}${_b64(_derive(password, salt, scheme))}"
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Check ``password`` against a stored hash (or a legacy plaintext value).
+
+    Raises ``ValueError`` when a stored hash is malformed, e.g. truncated.
+    """
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode(), stored.encode())
+    try:
+        scheme, salt, digest = stored.rsplit("$", 2)
+        return hmac.compare_digest(_derive(password, _unb64(salt), scheme), _unb64(digest))
+    except (IndexError, OverflowError, ValueError) as err:
+        raise ValueError(f"Malformed password hash: {err}") from err
+
+
+def calibrate(algorithm: str = KDF, target: float = TARGET_SECONDS) -> str:
+    """The scheme whose hashes take about ``target`` seconds on this machine."""
+    salt = secrets.token_bytes(SALT_BYTES)
+    if algorithm == "pbkdf2_sha256":
+        probe = 20_000
+        start = time.perf_counter()
+        _derive("calibration", salt, f"pbkdf2_sha256${probe}")
+        elapsed = time.perf_counter() - start
+        iterations = int(probe * target / elapsed) // 1000 * 1000
+        return f"pbkdf2_sha256${max(PBKDF2_MIN_ITERATIONS, iterations)}"
+    if algorithm == "scrypt":
+        # time doubles with n; stop at the largest n within the target
+        n = SCRYPT_MIN_N
+        while n < SCRYPT_MAX_N:
+            start = time.perf_counter()
+            _derive("calibration", salt, f"scrypt${n}${SCRYPT_R}${SCRYPT_P}")
+            if (time.perf_counter() - start) * 2 > target:
+                break
+            n *= 2
+        return f"scrypt${n}${SCRYPT_R}${SCRYPT_P}"
+    raise ValueError(f"Unknown KDF {algorithm!r}; use 'scrypt' or 'pbkdf2_sha256'")
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords in a pool of ``workers`` processes.
+
+    The work factor is ``scheme`` when given (e.g. ``"pbkdf2_sha256$600000"``);
+    otherwise ``calibrate()`` measures one for ``target`` seconds per hash.
+    Call it at startup, off the event loop. Verifying an existing hash
+    needs no calibration, since the stored value carries its own work factor.
+    """
+
+    def __init__(
+        self,
+        algorithm: str = KDF,
+        target: float = TARGET_SECONDS,
+        workers: int | None = None,
+        scheme: str | None = None,
+    ) -> None:
+        self.algorithm = algorithm
+        self.target = target
+        self.workers = workers or os.cpu_count() or 1
+        self.scheme = scheme
+        # verified against for unknown usernames, so they take as long as
+        # known ones
+        self.dummy: str | None = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def current_scheme(self) -> str:
+        """The scheme new hashes get; calibrates on first use (blocking)."""
+        with self._lock:
+            if self.scheme is None:
+                self.scheme = calibrate(self.algorithm, self.target)
+            if self.dummy is None:
+                self.dummy = hash_password(secrets.token_hex(8), self.scheme)
+            return self.scheme
+
+    def calibrate(self) -> str:
+        """Settle the work factor and start the worker processes."""
+        scheme = self.current_scheme()
+        with self._lock:
+            executor = self._pool()
+        # spawn the workers now rather than on the first login
+        for job in [executor.submit(scheme_of, scheme) for _ in range(self.workers)]:
+            job.result()
+        return scheme
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._closed:
+            raise RuntimeError("PasswordHasher is closed")
+        if self._executor is None:
+            # spawn, not fork: the app process already runs Flet's threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def needs_rehash(self, stored: str) -> bool:
+        """True for plaintext, another algorithm, or a much weaker work factor.
+
+        Hashes at or above the current work factor are kept, so a restart
+        that calibrates a little lower never downgrades them.
+        """
+        if not is_hashed(stored):
+            return True
+        algorithm, cost = work_factor(scheme_of(stored))
+        current_algorithm, current_cost = work_factor(self.current_scheme())
+        return algorithm != current_algorithm or cost < current_cost * REHASH_TOLERANCE
+
+    def hash(self, password: str) -> Future:
+        """Hash ``password`` in the pool; a concurrent future of the result."""
+        scheme = self.current_scheme()
+        with self._lock:
+            executor = self._pool()
+        return executor.submit(hash_password, password, scheme)
+
+    async def verify(self, password: str, stored: str) -> bool:
+        """Check ``password`` without blocking the event loop."""
+        if not is_hashed(stored):
+            # legacy plaintext: a plain comparison, no KDF to offload
+            return verify_password(password, stored)
+        with self._lock:
+            executor = self._pool()
+        try:
+            return await asyncio.wrap_future(executor.submit(verify_password, password, stored))
+        except BrokenProcessPool:
+            # a worker died (killed, out of memory); start afresh next time
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+
+    def close(self) -> None:
+        """Stop the worker processes; hashing afterwards raises RuntimeError."""
+        with self._lock:
+            self._closed = True
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+_hasher: PasswordHasher | None = None
+_hasher_lock = threading.Lock()
+
+
+def get_hasher() -> PasswordHasher:
+    """The app-wide password hasher, created on first use.
+
+    ``LOGIN_KDF`` (``scrypt`` or ``pbkdf2_sha256``), ``LOGIN_KDF_TARGET_MS``,
+    ``LOGIN_KDF_WORKERS`` and ``LOGIN_KDF_SCHEME`` (a fixed work factor,
+    which skips calibration) override the defaults.
+    """
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher(
+                algorithm=os.getenv("LOGIN_KDF", KDF),
+                target=float(os.getenv("LOGIN_KDF_TARGET_MS", TARGET_SECONDS * 1000)) / 1000,
+                workers=int(os.getenv("LOGIN_KDF_WORKERS", 0)) or None,
+                scheme=os.getenv("LOGIN_KDF_SCHEME") or None,
+            )
+        return _hasher
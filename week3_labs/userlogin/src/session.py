@@ -0,0 +1,160 @@
+"""
+In-process login sessions.
+
+A successful login gets a signed session token. Logging in again as the
+same user with the same password while the session is alive is answered
+from memory, so the database only sees first logins, expired sessions and
+wrong passwords.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+SESSION_TTL = 15 * 60.0  # seconds a session (and its token) stays valid
+MAX_SESSIONS = 10_000  # least recently used sessions are evicted beyond this
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class Session:
+    __slots__ = ("username", "token", "expires", "credential")
+
+    def __init__(self, username: str, token: str, expires: float, credential: bytes) -> None:
+        self.username = username
+        self.token = token
+        self.expires = expires
+        # keyed digest of the password the session was opened with; the
+        # password itself is never kept
+        self.credential = credential
+
+
+class SessionStore:
+    """
+    Thread-safe LRU store of live sessions, one per username.
+
+    Tokens are ``<payload>.<signature>``. The payload holds the username and
+    expiry, and the signature is an HMAC-SHA256 under ``secret``. A token
+    is valid while it is signed correctly, not expired, and still the
+    current session of its user (not revoked or evicted).
+    """
+
+    def __init__(
+        self,
+        secret: bytes | None = None,
+        ttl: float = SESSION_TTL,
+        capacity: int = MAX_SESSIONS,
+    ) -> None:
+        # a per-process secret: tokens die with the process, like the store
+        self.secret = secret or secrets.token_bytes(32)
+        self.ttl = ttl
+        self.capacity = max(1, capacity)
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self.secret, payload, hashlib.sha256).digest()
+
+    def _credential(self, username: str, password: str) -> bytes:
+        return self._sign(b"credential\0" + username.encode() + b"\0" + password.encode())
+
+    def issue(self, username: str, password: str) -> str:
+        """Open a session after the database accepted the credentials."""
+        expires = time.time() + self.ttl
+        payload = f"{int(expires)}:{secrets.token_hex(8)}:{username}".encode()
+        token = f"{_b64(payload)}.{_b64(self._sign(payload))}"
+        session = Session(username, token, expires, self._credential(username, password))
+        with self._lock:
+            self._sessions[username] = session
+            self._sessions.move_to_end(username)
+            while len(self._sessions) > self.capacity:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+        return token
+
+    def _live(self, username: str) -> Session | None:
+        # call with the lock held
+        session = self._sessions.get(username)
+        if session is None:
+            return None
+        if session.expires <= time.time():
+            del self._sessions[username]
+            self.expired += 1
+            return None
+        self._sessions.move_to_end(username)
+        return session
+
+    def check(self, username: str, password: str) -> Session | None:
+        """The live session opened with these credentials, if any."""
+        credential = self._credential(username, password)
+        with self._lock:
+            session = self._live(username)
+            if session is not None and hmac.compare_digest(session.credential, credential):
+                self.hits += 1
+                return session
+            self.misses += 1
+            return None
+
+    def validate(self, token: str) -> Session | None:
+        """The session ``token`` belongs to, or None if it is no longer valid."""
+        try:
+            encoded, signature = token.split(".")
+            payload = _unb64(encoded)
+            valid = hmac.compare_digest(_unb64(signature), self._sign(payload))
+            username = payload.decode().split(":", 2)[2]
+        except (ValueError, IndexError, binascii.Error, UnicodeDecodeError):
+            return None
+        if not valid:
+            return None
+        with self._lock:
+            session = self._live(username)
+        if session is None or not hmac.compare_digest(session.token, token):
+            return None
+        return session
+
+    def revoke(self, token: str) -> None:
+        """End the session ``token`` belongs to (logout)."""
+        session = self.validate(token)
+        if session is not None:
+            with self._lock:
+                if self._sessions.get(session.username) is session:
+                    del self._sessions[session.username]
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+_store: SessionStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """The app-wide session store, created on first use.
+
+    ``LOGIN_SESSION_TTL`` (seconds) and ``LOGIN_MAX_SESSIONS`` override the
+    defaults.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore(
+                ttl=float(os.getenv("LOGIN_SESSION_TTL", SESSION_TTL)),
+                capacity=int(os.getenv("LOGIN_MAX_SESSIONS", MAX_SESSIONS)),
+            )
+        return _store
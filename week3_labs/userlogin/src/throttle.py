@@ -0,0 +1,160 @@
+"""
+Login rate limiting, answered from memory.
+
+Every attempt that reaches the database takes a token from its username's
+bucket and from one global bucket. Repeated failures lock the username out
+for exponentially longer periods. A rejected attempt never touches the
+database.
+"""
+
+import hashlib
+import secrets
+import threading
+import time
+from array import array
+
+# per username: a burst of 5 attempts, then one every 10 seconds
+USER_RATE = 0.1
+USER_BURST = 5
+# all usernames together: what the database is willing to absorb
+GLOBAL_RATE = 50.0
+GLOBAL_BURST = 100
+# lockout: 1 s after the 5th failure in a row, doubling up to 15 minutes
+LOCKOUT_AFTER = 5
+LOCKOUT_BASE = 1.0
+LOCKOUT_MAX = 15 * 60.0
+FAILURE_WINDOW = 15 * 60.0  # failures older than this are forgotten
+SLOTS = 1 << 16  # per-username state slots (about 2 MB)
+
+
+class LoginThrottledError(Exception):
+    """Raised when an attempt is rejected; ``retry_after`` is in seconds."""
+
+    def __init__(self, retry_after: float, locked: bool = False) -> None:
+        self.retry_after = retry_after
+        self.locked = locked
+        reason = "Too many failed logins" if locked else "Too many login attempts"
+        super().__init__(f"{reason}; try again in {retry_after:.0f}s")
+
+
+class LoginThrottle:
+    """
+    Per-username and global token buckets with exponential lockout.
+
+    Per-username state lives in fixed-size typed arrays indexed by a keyed
+    hash of the username. Memory stays at ``slots`` entries however many
+    usernames are tried. Usernames that share a slot share their bucket
+    and lockout. The hash key is secret, so nobody can aim a collision at a
+    given user.
+    """
+
+    def __init__(
+        self,
+        user_rate: float = USER_RATE,
+        user_burst: int = USER_BURST,
+        global_rate: float = GLOBAL_RATE,
+        global_burst: int = GLOBAL_BURST,
+        lockout_after: int = LOCKOUT_AFTER,
+        lockout_base: float = LOCKOUT_BASE,
+        lockout_max: float = LOCKOUT_MAX,
+        failure_window: float = FAILURE_WINDOW,
+        slots: int = SLOTS,
+    ) -> None:
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.lockout_after = max(1, lockout_after)
+        self.lockout_base = lockout_base
+        self.lockout_max = lockout_max
+        self.failure_window = failure_window
+        self.slots = max(1, slots)
+        self._key = secrets.token_bytes(16)
+        # a zero "updated" time marks a slot nobody has used yet (full bucket)
+        self._tokens = array("f", bytes(4 * self.slots))
+        self._updated = array("d", bytes(8 * self.slots))
+        self._failures = array("H", bytes(2 * self.slots))
+        self._failed_at = array("d", bytes(8 * self.slots))
+        self._locked_until = array("d", bytes(8 * self.slots))
+        self._global_tokens = float(global_burst)
+        self._global_updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.lockouts = 0
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self._tokens, self._updated, self._failures, self._failed_at, self._locked_until)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def _slot(self, username: str) -> int:
+        digest = hashlib.blake2b(username.encode(), digest_size=8, key=self._key).digest()
+        return int.from_bytes(digest, "little") % self.slots
+
+    def acquire(self, username: str) -> None:
+        """Admit one attempt or raise ``LoginThrottledError``."""
+        slot = self._slot(username)
+        now = time.monotonic()
+        with self._lock:
+            if self._locked_until[slot] > now:
+                self.rejected += 1
+                raise LoginThrottledError(self._locked_until[slot] - now, locked=True)
+
+            if self._updated[slot] == 0.0:
+                tokens = float(self.user_burst)
+            else:
+                elapsed = now - self._updated[slot]
+                tokens = min(self.user_burst, self._tokens[slot] + elapsed * self.user_rate)
+            self._tokens[slot] = tokens
+            self._updated[slot] = now
+            elapsed = now - self._global_updated
+            self._global_tokens = min(self.global_burst, self._global_tokens + elapsed * self.global_rate)
+            self._global_updated = now
+
+            # take from both buckets or from neither
+            if tokens < 1.0:
+                self.rejected += 1
+                raise LoginThrottledError((1.0 - tokens) / self.user_rate)
+            if self._global_tokens < 1.0:
+                self.rejected += 1
+                raise LoginThrottledError((1.0 - self._global_tokens) / self.global_rate)
+            self._tokens[slot] = tokens - 1.0
+            self._global_tokens -= 1.0
+            self.allowed += 1
+
+    def record_failure(self, username: str) -> None:
+        """Count a rejected password; lock the username out once it adds up."""
+        slot = self._slot(username)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._failed_at[slot] > self.failure_window:
+                self._failures[slot] = 0
+            failures = min(self._failures[slot] + 1, 0xFFFF)
+            self._failures[slot] = failures
+            self._failed_at[slot] = now
+            if failures >= self.lockout_after:
+                exponent = min(failures - self.lockout_after, 32)
+                duration = min(self.lockout_max, self.lockout_base * 2**exponent)
+                self._locked_until[slot] = now + duration
+                self.lockouts += 1
+
+    def record_success(self, username: str) -> None:
+        """A correct password clears the username's failures and lockout."""
+        slot = self._slot(username)
+        with self._lock:
+            self._failures[slot] = 0
+            self._locked_until[slot] = 0.0
+
+
+_throttle: LoginThrottle | None = None
+_throttle_lock = threading.Lock()
+
+
+def get_throttle() -> LoginThrottle:
+    """The app-wide login throttle, created on first use."""
+    global _throttle
+    with _throttle_lock:
+        if _throttle is None:
+            _throttle = LoginThrottle()
+        return _throttle
@@ -0,0 +1,269 @@
+"""
+Where the login app looks users up.
+
+``auth.py`` only talks to a ``UserRepository``. ``MySQLUserRepository`` is
+the lab's MySQL server; ``SQLiteUserRepository`` keeps the users in a local
+database file, so the app runs (and can be load-tested) without a server.
+``LOGIN_DB`` picks the backend (``mysql``, the default, or ``sqlite``).
+
+Add a user (with a hashed password) to the configured backend, creating
+the table if needed:
+
+    LOGIN_DB=sqlite python user_repository.py add testuser password123
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+from typing import Any
+
+import mysql.connector
+from db_connection import ConnectionPool, get_pool
+from passwords import get_hasher, hash_password
+
+SQLITE_PATH = Path(__file__).with_name("users.db")
+SQLITE_CACHED_STATEMENTS = 64  # per connection; the app runs only a few
+
+
+class RepositoryError(Exception):
+    """The user store could not be reached or the query failed."""
+
+
+class UserRepository:
+    """
+    User lookups the login app needs. Methods block; call them from worker
+    threads, never from the Flet event loop.
+
+    Subclasses run the statements below (written with their driver's
+    placeholder) through ``_fetchone`` and ``_execute``. The statements are
+    class constants on purpose: the drivers reuse a prepared statement only
+    when they are handed the same SQL again.
+    """
+
+    FIND_USER = "SELECT id, password FROM users WHERE username = %s"
+    INSERT_USER = "INSERT INTO users (username, password) VALUES (%s, %s)"
+    UPDATE_PASSWORD = "UPDATE users SET password = %s WHERE id = %s"
+    # the unique index turns every lookup by username into an index seek
+    SCHEMA: tuple[str, ...] = (
+        """CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(255) NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            UNIQUE KEY idx_users_username (username)
+        )""",
+    )
+
+    def find_user(self, username: str) -> tuple[int, str] | None:
+        """The user's (id, stored password), or None for an unknown username."""
+        row = self._fetchone(self.FIND_USER, (username,))
+        return None if row is None else (row[0], row[1])
+
+    def add_user(self, username: str, password: str) -> int:
+        """Insert a user (``password`` as stored, normally a hash); return the id."""
+        return self._execute(self.INSERT_USER, (username, password))
+
+    def set_password(self, user_id: int, password: str) -> None:
+        """Replace the stored password, e.g. a plaintext one by its hash."""
+        self._execute(self.UPDATE_PASSWORD, (password, user_id))
+
+    def create_schema(self) -> None:
+        """Create the users table and its index if they do not exist yet."""
+        for statement in self.SCHEMA:
+            self._execute(statement, ())
+
+    def warm_up(self) -> None:
+        """Get ready for the first login (open connections and the like)."""
+
+    def close(self) -> None:
+        """Release every connection the repository holds."""
+
+    def _fetchone(self, sql: str, params: tuple) -> tuple | None:
+        raise NotImplementedError
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        """Run a statement; return the last inserted row id."""
+        raise NotImplementedError
+
+
+class MySQLUserRepository(UserRepository):
+    """
+    Users in MySQL, reached through the connection pool.
+
+    Every pooled connection keeps one server-side prepared statement per
+    SQL string, so a login sends only the parameters instead of having the
+    server parse the query again.
+    """
+
+    def __init__(self, pool: ConnectionPool | None = None) -> None:
+        self.pool = pool or get_pool()
+        # connection -> {sql: prepared cursor}; entries go away with the
+        # connection when the pool drops it
+        self._statements: weakref.WeakKeyDictionary[Any, dict[str, Any]] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _cursor(self, conn: Any, sql: str) -> Any:
+        with self._lock:
+            cursors = self._statements.setdefault(conn, {})
+        cursor = cursors.get(sql)
+        if cursor is None:
+            cursor = cursors[sql] = conn.cursor(prepared=True)
+        return cursor
+
+    def _fetchone(self, sql: str, params: tuple) -> tuple | None:
+        try:
+            with self.pool.connection() as conn:
+                cursor = self._cursor(conn, sql)
+                cursor.execute(sql, params)
+                # read every row so the connection is clean for the next query
+                rows = cursor.fetchall()
+        except mysql.connector.Error as err:
+            raise RepositoryError(str(err)) from err
+        return rows[0] if rows else None
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        try:
+            with self.pool.connection() as conn:
+                cursor = self._cursor(conn, sql)
+                cursor.execute(sql, params)
+                return cursor.lastrowid
+        except mysql.connector.Error as err:
+            raise RepositoryError(str(err)) from err
+
+    def warm_up(self) -> None:
+        self.pool.warm_up()
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class SQLiteUserRepository(UserRepository):
+    """
+    Users in an embedded SQLite file; no server needed.
+
+    Each thread gets its own connection (SQLite connections must not be
+    used from two threads at once) and each connection keeps up to
+    ``cached_statements`` compiled statements. The file is created with
+    its schema on first use. ``path`` must be a file, not ``:memory:``,
+    since every connection would otherwise see its own empty database.
+    """
+
+    FIND_USER = "SELECT id, password FROM users WHERE username = ?"
+    INSERT_USER = "INSERT INTO users (username, password) VALUES (?, ?)"
+    UPDATE_PASSWORD = "UPDATE users SET password = ? WHERE id = ?"
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username TEXT NOT NULL,
+            password TEXT NOT NULL
+        )""",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users (username)",
+    )
+
+    def __init__(self, path: str | Path = SQLITE_PATH, cached_statements: int = SQLITE_CACHED_STATEMENTS) -> None:
+        self.path = str(path)
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        conn = sqlite3.connect(
+            self.path,
+            timeout=5.0,
+            # autocommit, like the MySQL connections
+            isolation_level=None,
+            cached_statements=self.cached_statements,
+            # only close() touches it from another thread
+            check_same_thread=False,
+        )
+        # readers do not wait for a writer
+        conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock:
+            self._connections.append(conn)
+            if not self._schema_ready:
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+                self._schema_ready = True
+        self._local.conn = conn
+        return conn
+
+    def _fetchone(self, sql: str, params: tuple) -> tuple | None:
+        try:
+            return self._connection().execute(sql, params).fetchone()
+        except sqlite3.Error as err:
+            raise RepositoryError(str(err)) from err
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        try:
+            return self._connection().execute(sql, params).lastrowid
+        except sqlite3.Error as err:
+            raise RepositoryError(str(err)) from err
+
+    def warm_up(self) -> None:
+        try:
+            self._connection()
+        except sqlite3.Error:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def create_repository(backend: str | None = None) -> UserRepository:
+    """A repository for ``backend``, or for ``LOGIN_DB`` when not given."""
+    backend = (backend or os.getenv("LOGIN_DB", "mysql")).lower()
+    if backend == "mysql":
+        return MySQLUserRepository()
+    if backend == "sqlite":
+        return SQLiteUserRepository(os.getenv("LOGIN_SQLITE_PATH", SQLITE_PATH))
+    raise ValueError(f"Unknown LOGIN_DB backend {backend!r}; use 'mysql' or 'sqlite'")
+
+
+_repository: UserRepository | None = None
+_repository_lock = threading.Lock()
+
+
+def get_repository() -> UserRepository:
+    """The app-wide repository, created on first use."""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = create_repository()
+        return _repository
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage login users in the LOGIN_DB backend")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("init", help="create the users table and index")
+    add = sub.add_parser("add", help="add a user")
+    add.add_argument("username")
+    add.add_argument("password")
+    args = parser.parse_args()
+
+    repository = get_repository()
+    try:
+        repository.create_schema()
+        if args.command == "add":
+            stored = hash_password(args.password, get_hasher().current_scheme())
+            user_id = repository.add_user(args.username, stored)
+            print(f"added {args.username!r} with id {user_id}")
+    except RepositoryError as err:
+        parser.exit(1, f"error: {err}\n")
+    finally:
+        repository.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, List, Optional
+
+from .service import ContactService
+
+
+DEFAULT_DATA_PATH = Path("data/contacts.json")
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_SEARCH_LIMIT = 100
+
+CONTACT_FIELDS = ("first_name", "last_name", "phone", "email", "address", "notes")
+
+
+def _fields(cmd: Dict[str, Any]) -> Dict[str, Any]:
+    fields = {k: cmd[k] for k in CONTACT_FIELDS if k in cmd}
+    for name, value in fields.items():
+        # The validators expect text; reject anything else here so it is
+        # reported on its own line instead of failing inside them.
+        if value is not None and not isinstance(value, str):
+            raise TypeError(f"{name} must be a string")
+    return fields
+
+
+def _op_create(service: ContactService, cmd: Dict[str, Any]) -> Dict[str, Any]:
+    fields = _fields(cmd)
+    contact = service.create_contact(
+        fields.pop("first_name", ""), fields.pop("last_name", ""), **fields
+    )
+    return {"contact": contact.to_dict()}
+
+
+def _op_update(service: ContactService, cmd: Dict[str, Any]) -> Dict[str, Any]:
+    contact = service.update_contact(str(cmd.get("id", "")), **_fields(cmd))
+    return {"contact": contact.to_dict()}
+
+
+def _op_delete(service: ContactService, cmd: Dict[str, Any]) -> Dict[str, Any]:
+    contact_id = str(cmd.get("id", ""))
+    service.delete_contact(contact_id)
+    return {"id": contact_id}
+
+
+def _op_search(service: ContactService, cmd: Dict[str, Any]) -> Dict[str, Any]:
+    limit = int(cmd.get("limit", DEFAULT_SEARCH_LIMIT))
+    results: List[Dict[str, Any]] = []
+    for contact in service.book.find_by_name(str(cmd.get("query", ""))).values():
+        if len(results) >= limit:
+            break
+        results.append(contact.to_dict())
+    return {"results": results}
+
+
+# op name -> (handler, mutates storage)
+OPERATIONS: Dict[str, tuple[Callable[[ContactService, Dict[str, Any]], Dict[str, Any]], bool]] = {
+    "create": (_op_create, True),
+    "update": (_op_update, True),
+    "delete": (_op_delete, True),
+    "search": (_op_search, False),
+}
+
+
+def run_pipe(
+    service: ContactService,
+    infile: IO[str],
+    outfile: IO[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """Apply JSON Lines commands from infile, writing one JSON result per line.
+
+    Input is consumed line by line and every result is written as soon as it
+    is produced, so memory use does not grow with the length of the stream.
+    Every ``batch_size`` changes are appended to the storage change log;
+    the contacts file itself is rewritten once, when the stream ends.
+    """
+    batch_size = max(1, batch_size)
+    stats = {"ops": 0, "errors": 0, "commits": 0}
+    pending = 0
+    start = time.perf_counter()
+
+    service.autosave = False
+    try:
+        for line in infile:
+            line = line.strip()
+            if not line:
+                continue
+            stats["ops"] += 1
+            ref: Optional[Any] = None
+            try:
+                cmd = json.loads(line)
+                if not isinstance(cmd, dict):
+                    raise ValueError("command must be a JSON object")
+                ref = cmd.get("ref")
+                op = cmd.get("op")
+                if op not in OPERATIONS:
+                    raise ValueError(f"unknown op '{op}'")
+                handler, mutates = OPERATIONS[op]
+                result: Dict[str, Any] = {"ok": True, "op": op, **handler(service, cmd)}
+                if mutates:
+                    pending += 1
+            except (ValueError, KeyError, TypeError) as error:
+                stats["errors"] += 1
+                message = error.args[0] if isinstance(error, KeyError) and error.args else str(error)
+                result = {"ok": False, "error": str(message)}
+            if ref is not None:
+                result["ref"] = ref
+            outfile.write(json.dumps(result, ensure_ascii=False))
+            outfile.write("\n")
+
+            if pending >= batch_size:
+                if service.flush():
+                    stats["commits"] += 1
+                pending = 0
+    finally:
+        if service.flush():
+            stats["commits"] += 1
+        service.compact()
+        service.autosave = True
+        outfile.flush()
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["ops_per_sec"] = round(stats["ops"] / elapsed, 1) if elapsed > 0 else 0.0
+    return stats
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Stream JSON Lines contact commands from stdin to stdout.",
+    )
+    parser.add_argument(
+        "--data",
+        type=Path,
+        default=DEFAULT_DATA_PATH,
+        help=f"contacts JSON file (default: {DEFAULT_DATA_PATH})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"number of changes per change-log write (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="do not print the throughput summary to stderr",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    service = ContactService(args.data)
+    stats = run_pipe(service, sys.stdin, sys.stdout, batch_size=args.batch_size)
+    if not args.quiet:
+        print(
+            f"{stats['ops']} ops ({stats['errors']} errors, {stats['commits']} commits) "
+            f"in {stats['seconds']}s = {stats['ops_per_sec']} ops/s",
+            file=sys.stderr,
+        )
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Set
 
 from .models import Contact, ContactBook
 from .storage import JsonStorage, export_to_csv, import_from_csv
@@ -15,6 +16,67 @@ class ContactService:
     def __init__(self, data_path: Path) -> None:
         self.storage = JsonStorage(Path(data_path))
         self.book: ContactBook = self.storage.load()
+        if self.storage.has_log():
+            # Left by a run that stopped before compacting; fold it in so new
+            # entries never follow a half-written line.
+            self.storage.save(self.book)
+        # When autosave is off, mutations only record which contacts changed
+        # and the caller decides when to write them out (see batch() / flush()).
+        self.autosave = True
+        self._dirty = False
+        self._changed: Set[str] = set()
+        self._rewrite = False  # a change not tracked by id; flush saves it all
+
+    # Persistence
+    def _commit(self, contact_id: Optional[str] = None) -> None:
+        if self.autosave:
+            self.storage.save(self.book)
+            self._dirty = False
+            self._changed.clear()
+            self._rewrite = False
+            return
+        self._dirty = True
+        if contact_id is None:
+            self._rewrite = True
+        else:
+            self._changed.add(contact_id)
+
+    def flush(self) -> bool:
+        """Write pending changes to storage. Returns True if anything was saved.
+
+        Changes to single contacts are appended to the storage change log, so
+        a flush costs the size of the batch rather than of the whole book.
+        """
+        if not self._dirty:
+            return False
+        if self._rewrite:
+            self.storage.save(self.book)
+        else:
+            contacts = self.book.contacts
+            self.storage.append((cid, contacts.get(cid)) for cid in self._changed)
+        self._changed.clear()
+        self._rewrite = False
+        self._dirty = False
+        return True
+
+    def compact(self) -> bool:
+        """Flush, then fold the change log into the contacts file."""
+        self.flush()
+        if not self.storage.has_log():
+            return False
+        self.storage.save(self.book)
+        return True
+
+    @contextmanager
+    def batch(self) -> Iterator["ContactService"]:
+        """Group several mutations into a single save."""
+        previous = self.autosave
+        self.autosave = False
+        try:
+            yield self
+        finally:
+            self.autosave = previous
+            self.compact()
 
     # CRUD
     def create_contact(
@@ -40,7 +102,7 @@ class ContactService:
             notes=(notes or None),
         )
         self.book.add(contact)
-        self.storage.save(self.book)
+        self._commit(contact.id)
         return contact
 
     def list_contacts(self, sort_by: str = "last_name") -> List[Contact]:
@@ -79,12 +141,12 @@ class ContactService:
         if notes is not None:
             updates["notes"] = notes or None
         contact = self.book.update(contact_id, **updates)
-        self.storage.save(self.book)
+        self._commit(contact_id)
         return contact
 
     def delete_contact(self, contact_id: str) -> None:
         self.book.remove(contact_id)
-        self.storage.save(self.book)
+        self._commit(contact_id)
 
     # Import/Export
     def export_csv(self, csv_path: Path) -> None:
@@ -101,7 +163,7 @@ class ContactService:
             else:
                 self.book.add(contact)
             count += 1
-        self.storage.save(self.book)
+        self._commit()
         return count
 
 
@@ -2,29 +2,67 @@ from __future__ import annotations
 
 import csv
 import json
+import os
 from pathlib import Path
-from typing import Iterable, Dict
+from typing import Iterable, Dict, Optional, Tuple
 
 from .models import Contact, ContactBook
 
 
 class JsonStorage:
-    """File-based JSON storage for contacts."""
+    """File-based JSON storage for contacts.
+
+    Besides the contacts file there may be a change log next to it
+    (``contacts.json.log``, one JSON object per line). ``append`` adds to the
+    log at a cost proportional to the changes, ``load`` replays it over the
+    file, and ``save`` rewrites the file and drops the log.
+    """
 
     def __init__(self, filepath: Path) -> None:
         self.filepath = Path(filepath)
+        self.log_path = self.filepath.with_name(self.filepath.name + ".log")
 
     def load(self) -> ContactBook:
-        if not self.filepath.exists():
-            return ContactBook()
-        data = json.loads(self.filepath.read_text(encoding="utf-8"))
-        contacts = {c["id"]: Contact.from_dict(c) for c in data.get("contacts", [])}
+        contacts: Dict[str, Contact] = {}
+        if self.filepath.exists():
+            data = json.loads(self.filepath.read_text(encoding="utf-8"))
+            contacts = {c["id"]: Contact.from_dict(c) for c in data.get("contacts", [])}
+        if self.log_path.exists():
+            with self.log_path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # last line cut short by a crash mid-append
+                        break
+                    if entry.get("contact") is None:
+                        contacts.pop(entry["id"], None)
+                    else:
+                        contacts[entry["id"]] = Contact.from_dict(entry["contact"])
         return ContactBook(contacts=contacts)
 
+    def append(self, changes: Iterable[Tuple[str, Optional[Contact]]]) -> None:
+        """Log (id, contact) changes; a contact of None records a deletion."""
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        with self.log_path.open("a", encoding="utf-8") as f:
+            for contact_id, contact in changes:
+                entry = {"id": contact_id, "contact": contact.to_dict() if contact else None}
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def has_log(self) -> bool:
+        return self.log_path.exists()
+
     def save(self, book: ContactBook) -> None:
         payload = {"contacts": [c.to_dict() for c in book.to_list()]}
         self.filepath.parent.mkdir(parents=True, exist_ok=True)
-        self.filepath.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        # Write to a sibling temp file and swap it in so a crash mid-write
+        # never leaves a truncated contacts file behind.
+        tmp_path = self.filepath.with_name(self.filepath.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.filepath)
+        # The file now holds everything the log did. Replaying a log that
+        # survives a crash right here only repeats changes already saved.
+        self.log_path.unlink(missing_ok=True)
 
 
 def export_to_csv(contacts: Iterable[Contact], csv_path: Path) -> None:
@@ -0,0 +1,234 @@
+"""
+Benchmarks for enhanced_calculator:
+
+	python bench_calculator.py expression --evaluations 200000
+	python bench_calculator.py batch --rows 5000000
+	python bench_calculator.py history --records 1000000
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List
+
+import calculation_history
+import enhanced_calculator as calc
+from calculation_history import CalculationHistory
+
+FORMULAS = [
+	"2 * (x + 1) ^ 2 - y / 3",
+	"sqrt(divide(x, y)) + modulo(x, 7)",
+	"power(x, 2) + power(y, 2) - 2 * x * y * 0.5",
+]
+
+
+def rate(label: str, count: int, run: Callable[[], None]) -> float:
+	start = time.perf_counter()
+	run()
+	elapsed = time.perf_counter() - start
+	print(f"  {label:<26} {count / elapsed:>12,.0f} evaluations/s")
+	return elapsed
+
+
+def bench_expression(args: argparse.Namespace) -> None:
+	values = [(random.uniform(1, 100), random.uniform(1, 100)) for _ in range(args.evaluations)]
+	handwritten = {
+		FORMULAS[0]: lambda x, y: calc.subtract((calc.multiply((2.0, calc.power((calc.add((x, 1.0)), 2.0)))), calc.divide((y, 3.0)))),
+		FORMULAS[1]: lambda x, y: calc.add((calc.square_root(calc.divide((x, y))), calc.modulo((x, 7.0)))),
+		FORMULAS[2]: lambda x, y: calc.subtract((calc.add((calc.power((x, 2.0)), calc.power((y, 2.0)))), calc.multiply((calc.multiply((calc.multiply((2.0, x)), y)), 0.5)))),
+	}
+	for source in FORMULAS:
+		print(source)
+		compiled = calc.compile_expression(source)
+		expected = [handwritten[source](x, y) for x, y in values[:100]]
+		assert [compiled.evaluate(x, y) for x, y in values[:100]] == expected
+
+		def parse_every_time(source: str = source) -> None:
+			for x, y in values[: args.evaluations // 20]:
+				calc.compile_expression.__wrapped__(source)({"x": x, "y": y})
+
+		def cached(source: str = source) -> None:
+			for x, y in values:
+				calc.compile_expression(source)({"x": x, "y": y})
+
+		def cached_positional(compiled: calc.CompiledExpression = compiled) -> None:
+			evaluate = compiled.evaluate
+			for x, y in values:
+				evaluate(x, y)
+
+		def by_hand(function: Callable[[float, float], float] = handwritten[source]) -> None:
+			for x, y in values:
+				function(x, y)
+
+		rate("parse + compile each time", args.evaluations // 20, parse_every_time)
+		rate("LRU-cached, dict of vars", args.evaluations, cached)
+		rate("cached, positional", args.evaluations, cached_positional)
+		rate("hand-written calls", args.evaluations, by_hand)
+	print(calc.compile_expression.cache_info())
+
+
+def scalar_results(operation: str, pairs: List[tuple]) -> List[float]:
+	# the interactive path: one call per row, errors caught per row
+	function = calc.square_root if operation == "square_root" else getattr(calc, operation)
+	results = []
+	for left, right in pairs:
+		try:
+			value = function(left) if operation == "square_root" else function((left, right))
+			results.append(value if isinstance(value, float) else math.nan)
+		except (ArithmeticError, ValueError):
+			results.append(math.nan)
+	return results
+
+
+def bench_batch(args: argparse.Namespace) -> None:
+	# imported here so the expression benchmark runs without NumPy
+	import numpy as np
+
+	import calculator_batch as batch
+
+	generator = np.random.default_rng(106)
+	data = generator.uniform(-100, 100, (args.rows, 2))
+	# some rows every operation has to reject
+	data[::50, 1] = 0.0
+	with tempfile.TemporaryDirectory() as tmp:
+		pairs_path = os.path.join(tmp, "pairs.bin")
+		data.tofile(pairs_path)
+		values_path = os.path.join(tmp, "values.bin")
+		data[:, 0].tofile(values_path)
+		output_path = os.path.join(tmp, "results.bin")
+		sample = [tuple(row) for row in data[: args.scalar_rows].tolist()]
+		print(f"{args.rows:,} rows, chunks of {args.chunk_rows:,}; scalar loop on {len(sample):,} rows")
+		for operation in ("add", "divide", "power", "modulo", "square_root"):
+			source = values_path if operation == "square_root" else pairs_path
+			summary = batch.run_batch(operation, source, output_path, chunk_rows=args.chunk_rows)
+			vector_rate = summary["rows"] / summary["seconds"]
+			start = time.perf_counter()
+			expected = scalar_results(operation, sample)
+			scalar_rate = len(sample) / (time.perf_counter() - start)
+			got = np.fromfile(output_path, dtype=batch.RESULT_DTYPE, count=len(sample))["result"]
+			assert np.allclose(got, expected, rtol=1e-15, atol=0, equal_nan=True)
+			print(
+				f"  {operation:<12} numpy {vector_rate:>13,.0f} rows/s   scalar {scalar_rate:>11,.0f} rows/s   "
+				f"x{vector_rate / scalar_rate:5.0f}   errors {summary['errors']}"
+			)
+
+		# memory depends on the chunk size, not on the number of rows
+		for rows in (args.rows // 4, args.rows):
+			data[:rows].tofile(pairs_path)
+			tracemalloc.start()
+			batch.run_batch("divide", pairs_path, output_path, chunk_rows=args.chunk_rows)
+			_, peak = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+			print(f"  divide over {rows:>11,} rows: peak {peak / 2**20:6.1f} MiB")
+
+		csv_path = os.path.join(tmp, "pairs.csv")
+		csv_rows = min(args.rows, args.csv_rows)
+		np.savetxt(csv_path, data[:csv_rows], delimiter=",", fmt="%.17g")
+		summary = batch.run_batch("divide", csv_path, os.path.join(tmp, "results.csv"), chunk_rows=args.chunk_rows)
+		print(f"  csv in/out   {summary['rows'] / summary['seconds']:>13,.0f} rows/s (divide, {csv_rows:,} rows; text parsing dominates)")
+
+
+def bench_history(args: argparse.Namespace) -> None:
+	operations = calculation_history.OPERATIONS[:6]
+	generator = random.Random(106)
+	calls = [(generator.choice(operations), (generator.uniform(-100, 100), generator.uniform(-100, 100))) for _ in range(args.records)]
+
+	# memory is set by the capacity, however many calculations are added
+	for capacity in (args.capacity, args.capacity * 10):
+		history = CalculationHistory(capacity)
+		start = time.perf_counter()
+		for operation, operands in calls:
+			history.add(operation, operands, operands[0] + operands[1])
+		elapsed = time.perf_counter() - start
+		tracemalloc.start()
+		history = CalculationHistory(capacity)
+		for operation, operands in calls:
+			history.add(operation, operands, operands[0] + operands[1])
+		_, peak = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+		print(f"  capacity {capacity:>9,}: {args.records / elapsed:>10,.0f} adds/s, peak {peak / 2**20:6.1f} MiB")
+	unbounded: List[str] = []
+	tracemalloc.start()
+	for operation, (left, right) in calls:
+		unbounded.append(f"{operation}: {left} and {right} = {left + right}")
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	print(f"  old List[str] history:  peak {peak / 2**20:6.1f} MiB")
+	del unbounded
+
+	# search the last history, full to capacity * 10
+	expected = [
+		position
+		for position, record in enumerate(history)
+		if record.operation == "divide" and -10 <= record.result <= 10
+	]
+	start = time.perf_counter()
+	for _ in range(args.searches):
+		found = history.search("divide", -10, 10)
+	vectorized = (time.perf_counter() - start) / args.searches
+	assert found == expected
+	numpy = sys.modules.pop("numpy")
+	sys.modules["numpy"] = None  # makes "import numpy" raise ImportError
+	try:
+		start = time.perf_counter()
+		for _ in range(args.searches):
+			found = history.search("divide", -10, 10)
+		plain = (time.perf_counter() - start) / args.searches
+	finally:
+		sys.modules["numpy"] = numpy
+	assert found == expected
+	print(f"  search {len(history):,} records: numpy {vectorized * 1000:7.2f} ms, plain Python {plain * 1000:7.2f} ms ({len(found):,} matches)")
+
+	start = time.perf_counter()
+	pages = [history.page(number) for number in range(1, history.page_count() + 1)]
+	print(f"  {len(pages):,} pages of 10 in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+	with tempfile.TemporaryDirectory() as tmp:
+		log_path = os.path.join(tmp, "history.jsonl")
+		history = CalculationHistory(args.capacity, log_path)
+		start = time.perf_counter()
+		for operation, operands in calls:
+			history.add(operation, operands, operands[0] + operands[1])
+		elapsed = time.perf_counter() - start
+		history.close()
+		print(f"  with a log: {args.records / elapsed:>10,.0f} adds/s ({os.path.getsize(log_path) / 2**20:.1f} MiB written)")
+		start = time.perf_counter()
+		replayed = CalculationHistory(args.capacity, log_path)
+		elapsed = time.perf_counter() - start
+		replayed.close()
+		assert list(replayed) == list(history)
+		print(f"  replay {args.records:,} log lines: {elapsed:.2f}s")
+
+
+def main(argv: List[str] = None) -> None:
+	parser = argparse.ArgumentParser(description="enhanced_calculator benchmarks")
+	sub = parser.add_subparsers(dest="command", required=True)
+
+	expression = sub.add_parser("expression", help="compiled, cached expressions vs parsing every time")
+	expression.add_argument("--evaluations", type=int, default=200_000)
+	expression.set_defaults(func=bench_expression)
+
+	batch = sub.add_parser("batch", help="NumPy batch mode vs the scalar functions")
+	batch.add_argument("--rows", type=int, default=5_000_000)
+	batch.add_argument("--scalar-rows", type=int, default=500_000)
+	batch.add_argument("--csv-rows", type=int, default=500_000)
+	batch.add_argument("--chunk-rows", type=int, default=1 << 20)
+	batch.set_defaults(func=bench_batch)
+
+	history = sub.add_parser("history", help="ring-buffer history: adds, memory, search, log replay")
+	history.add_argument("--records", type=int, default=1_000_000)
+	history.add_argument("--capacity", type=int, default=calculation_history.HISTORY_CAPACITY * 10)
+	history.add_argument("--searches", type=int, default=20)
+	history.set_defaults(func=bench_history)
+
+	args = parser.parse_args(argv)
+	args.func(args)
+
+
+if __name__ == "__main__":
+	main()
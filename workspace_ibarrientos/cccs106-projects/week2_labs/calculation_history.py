@@ -0,0 +1,233 @@
+"""
+Bounded calculation history for enhanced_calculator.
+
+The newest ``capacity`` calculations are kept in a ring buffer of typed
+arrays (operation code, operands, result, time), so a long scripted session
+never grows past a fixed size. With a log path, every calculation is also
+appended to a JSON Lines file. The file is replayed on startup, so the
+history survives restarts; clearing appends a marker instead of rewriting
+the file.
+"""
+
+import json
+import math
+import os
+import time
+from array import array
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+HISTORY_CAPACITY = 1000
+OPERATIONS = ("add", "subtract", "multiply", "divide", "power", "modulo", "sqrt", "expression")
+SEARCH_FIELDS = ("result", "left", "right")
+_CODES = {operation: code for code, operation in enumerate(OPERATIONS)}
+
+
+class HistoryRecord(NamedTuple):
+	number: int  # 1 for the first calculation of the history, never reused
+	operation: str
+	operands: Tuple[float, ...]
+	result: Union[float, complex]  # power of a negative number can be complex
+	timestamp: float
+	expression: Optional[str] = None
+
+	def format(self) -> str:
+		if self.operation == "sqrt":
+			return f"sqrt: √{self.operands[0]} = {self.result}"
+		if self.operation == "expression":
+			return f"expr: {self.expression} = {self.result}"
+		left, right = self.operands
+		return f"{self.operation}: {left} and {right} = {self.result}"
+
+
+class CalculationHistory:
+	def __init__(self, capacity: int = HISTORY_CAPACITY, log_path: Optional[str] = None) -> None:
+		self.capacity = max(1, capacity)
+		self._operation = array("B", bytes(self.capacity))
+		self._left = array("d", bytes(8 * self.capacity))
+		# NaN for single-operand calculations
+		self._right = array("d", bytes(8 * self.capacity))
+		self._result = array("d", bytes(8 * self.capacity))
+		# imaginary part of complex results, 0.0 otherwise; searches use the real part
+		self._imag = array("d", bytes(8 * self.capacity))
+		self._timestamp = array("d", bytes(8 * self.capacity))
+		self._expression: List[Optional[str]] = [None] * self.capacity
+		self._next = 0  # slot the next record goes to
+		self._count = 0
+		self.total = 0  # calculations recorded since the history was last cleared
+		self.log_path = log_path
+		self._log = None
+		if log_path:
+			self._replay(log_path)
+			self._log = open(log_path, "a", encoding="utf-8")
+
+	def __len__(self) -> int:
+		return self._count
+
+	def _store(self, operation: str, operands: Sequence[float], result: Union[float, complex], timestamp: float, expression: Optional[str]) -> None:
+		slot = self._next
+		self._operation[slot] = _CODES[operation]
+		self._left[slot] = operands[0] if operands else math.nan
+		self._right[slot] = operands[1] if len(operands) > 1 else math.nan
+		if isinstance(result, complex):
+			self._result[slot] = result.real
+			self._imag[slot] = result.imag
+		else:
+			self._result[slot] = result
+			self._imag[slot] = 0.0
+		self._timestamp[slot] = timestamp
+		self._expression[slot] = expression
+		self._next = (slot + 1) % self.capacity
+		self._count = min(self._count + 1, self.capacity)
+		self.total += 1
+
+	def add(self, operation: str, operands: Sequence[float], result: Union[float, complex], expression: Optional[str] = None) -> HistoryRecord:
+		if operation not in _CODES:
+			raise ValueError(f"Unknown operation: {operation}")
+		timestamp = time.time()
+		self._store(operation, operands, result, timestamp, expression)
+		if self._log is not None:
+			value = complex(result)
+			entry = {"op": operation, "operands": list(operands), "result": value.real, "time": timestamp}
+			if value.imag:
+				entry["imag"] = value.imag
+			if expression is not None:
+				entry["expression"] = expression
+			self._log.write(json.dumps(entry) + "\n")
+			self._log.flush()
+		return self.record(self._count - 1)
+
+	def clear(self) -> None:
+		self._next = 0
+		self._count = 0
+		self.total = 0
+		self._expression = [None] * self.capacity
+		if self._log is not None:
+			self._log.write(json.dumps({"clear": True, "time": time.time()}) + "\n")
+			self._log.flush()
+
+	def _replay(self, log_path: str) -> None:
+		try:
+			handle = open(log_path, "rb")
+		except FileNotFoundError:
+			return
+		last = b"\n"
+		parsed = True
+		with handle:
+			for last in handle:
+				try:
+					entry = json.loads(last)
+					if entry.get("clear"):
+						self._next = self._count = self.total = 0
+						parsed = True
+						continue
+					result = complex(entry["result"], entry.get("imag", 0.0))
+					self._store(entry["op"], entry["operands"], result, entry["time"], entry.get("expression"))
+					parsed = True
+				except (ValueError, KeyError, TypeError, IndexError):
+					# a line cut short by a crash; skip it
+					parsed = False
+		if not last.endswith(b"\n"):
+			# A crash mid-write left the last line without its newline. Mend it
+			# before appending, or the next record would be glued onto it.
+			with open(log_path, "r+b") as repair:
+				end = repair.seek(0, os.SEEK_END)
+				if parsed:
+					repair.write(b"\n")
+				else:
+					repair.truncate(end - len(last))
+
+	def close(self) -> None:
+		if self._log is not None:
+			self._log.close()
+			self._log = None
+
+	def _slot(self, position: int) -> int:
+		# position 0 is the oldest record still in the buffer
+		return (self._next - self._count + position) % self.capacity
+
+	def record(self, position: int) -> HistoryRecord:
+		if not 0 <= position < self._count:
+			raise IndexError("history position out of range")
+		slot = self._slot(position)
+		operation = OPERATIONS[self._operation[slot]]
+		if operation == "expression":
+			operands: Tuple[float, ...] = ()
+		elif operation == "sqrt":
+			operands = (self._left[slot],)
+		else:
+			operands = (self._left[slot], self._right[slot])
+		imag = self._imag[slot]
+		return HistoryRecord(
+			number=self.total - self._count + position + 1,
+			operation=operation,
+			operands=operands,
+			result=complex(self._result[slot], imag) if imag else self._result[slot],
+			timestamp=self._timestamp[slot],
+			expression=self._expression[slot],
+		)
+
+	def __iter__(self) -> Iterator[HistoryRecord]:
+		for position in range(self._count):
+			yield self.record(position)
+
+	def page(self, number: int, size: int = 10, positions: Optional[Sequence[int]] = None) -> List[HistoryRecord]:
+		# pages count from 1, oldest first; over the given positions (e.g.
+		# search() results) instead of the whole history when passed
+		if positions is None:
+			positions = range(self._count)
+		start = max(0, (number - 1) * size)
+		return [self.record(position) for position in positions[start : start + size]]
+
+	def page_count(self, size: int = 10, positions: Optional[Sequence[int]] = None) -> int:
+		total = self._count if positions is None else len(positions)
+		return max(1, -(-total // size))
+
+	def _ordered(self, column, np):
+		# the filled part of a buffer column, oldest first; a view unless wrapped
+		if self._count < self.capacity:
+			return column[: self._count]
+		return np.concatenate((column[self._next :], column[: self._next]))
+
+	def search(
+		self,
+		operation: Optional[str] = None,
+		minimum: Optional[float] = None,
+		maximum: Optional[float] = None,
+		field: str = "result",
+	) -> List[int]:
+		# Positions (oldest first) of the records matching every given filter;
+		# fetch them with record(). Ranges are inclusive and skip NaN values.
+		if field not in SEARCH_FIELDS:
+			raise ValueError(f"Cannot search by {field!r}; use one of {', '.join(SEARCH_FIELDS)}")
+		if operation is not None and operation not in _CODES:
+			raise ValueError(f"Unknown operation: {operation}")
+		try:
+			# imported on first search so the calculator starts without it
+			import numpy as np
+		except ImportError:  # plain Python below
+			np = None
+		code = None if operation is None else _CODES[operation]
+		values = {"result": self._result, "left": self._left, "right": self._right}[field]
+		if np is not None:
+			mask = np.ones(self._count, dtype=bool)
+			if code is not None:
+				mask &= self._ordered(np.frombuffer(self._operation, dtype=np.uint8), np) == code
+			if minimum is not None or maximum is not None:
+				column = self._ordered(np.frombuffer(values, dtype=np.float64), np)
+				if minimum is not None:
+					mask &= column >= minimum
+				if maximum is not None:
+					mask &= column <= maximum
+			return np.flatnonzero(mask).tolist()
+		matches = []
+		for position in range(self._count):
+			slot = self._slot(position)
+			if code is not None and self._operation[slot] != code:
+				continue
+			value = values[slot]
+			if minimum is not None and not value >= minimum:
+				continue
+			if maximum is not None and not value <= maximum:
+				continue
+			matches.append(position)
+		return matches
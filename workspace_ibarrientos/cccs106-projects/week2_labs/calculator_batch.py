@@ -0,0 +1,195 @@
+"""
+Batch mode for enhanced_calculator: apply one operation to every row of a
+file, vectorized with NumPy, in fixed-size chunks so memory stays flat for
+inputs of any length.
+
+	python enhanced_calculator.py batch divide pairs.csv results.csv
+	python enhanced_calculator.py batch square_root values.bin roots.bin --chunk-rows 1048576
+
+Inputs are CSV (one row per line), raw little-endian float64 (row-major,
+two values per row, one for square_root) or .npy files (memory-mapped).
+Each output row holds the result and an error code. Rows where the scalar
+function would raise get result NaN and the code of that error instead of
+stopping the batch. CSV output has ``result,error`` columns; binary output
+is packed ``RESULT_DTYPE`` records.
+"""
+
+import argparse
+import itertools
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+CHUNK_ROWS = 1 << 20  # 16 MiB of float64 pairs per chunk
+
+OK = 0
+ZERO_DIVISION = 1  # divide/modulo by zero, zero to a negative power
+NEGATIVE_SQRT = 2  # square_root of a negative number
+OVERFLOW = 3  # power result out of range
+COMPLEX_RESULT = 4  # negative number to a fractional power
+ERROR_NAMES = {
+	ZERO_DIVISION: "zero_division",
+	NEGATIVE_SQRT: "negative_sqrt",
+	OVERFLOW: "overflow",
+	COMPLEX_RESULT: "complex_result",
+}
+
+RESULT_DTYPE = np.dtype([("result", "<f8"), ("error", "u1")])
+OPERATIONS = ("add", "subtract", "multiply", "divide", "power", "modulo", "square_root")
+
+
+def apply_operation(operation: str, left: np.ndarray, right: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+	# Returns (results, error codes). Where a code is set the scalar function
+	# raises (or, for power, returns a complex number) and the result is NaN.
+	errors = np.zeros(len(left), dtype=np.uint8)
+	with np.errstate(all="ignore"):
+		if operation == "square_root":
+			negative = left < 0
+			result = np.sqrt(left)
+			errors[negative] = NEGATIVE_SQRT
+		elif operation == "add":
+			result = left + right
+		elif operation == "subtract":
+			result = left - right
+		elif operation == "multiply":
+			result = left * right
+		elif operation in ("divide", "modulo"):
+			zero = right == 0
+			divisor = np.where(zero, 1.0, right)
+			# np.remainder follows Python's % (sign of the divisor)
+			result = left / divisor if operation == "divide" else np.remainder(left, divisor)
+			errors[zero] = ZERO_DIVISION
+		elif operation == "power":
+			result = np.power(left, right)
+			finite = np.isfinite(left) & np.isfinite(right)
+			errors[finite & ~np.isfinite(result)] = OVERFLOW
+			# Python makes these complex, and raises if even that is too large
+			fractional = finite & (left < 0) & (np.floor(right) != right)
+			errors[fractional] = COMPLEX_RESULT
+			errors[fractional & ~np.isfinite(np.power(-left, right))] = OVERFLOW
+			errors[(left == 0) & (right < 0) & np.isfinite(right)] = ZERO_DIVISION
+		else:
+			raise ValueError(f"Unknown operation: {operation}")
+	result[errors != OK] = np.nan
+	return result, errors
+
+
+def detect_format(path: str) -> str:
+	lowered = path.lower()
+	if lowered.endswith(".csv") or lowered.endswith(".txt"):
+		return "csv"
+	if lowered.endswith(".npy"):
+		return "npy"
+	return "bin"
+
+
+def read_chunks(path: str, columns: int, file_format: str, chunk_rows: int = CHUNK_ROWS, skip_header: bool = False) -> Iterator[np.ndarray]:
+	# Yields float64 arrays of shape (rows, columns), at most chunk_rows rows each.
+	if file_format == "npy":
+		data = np.load(path, mmap_mode="r")
+		if data.ndim == 1:
+			data = data.reshape(-1, 1)
+		if data.shape[1] < columns:
+			raise ValueError(f"{path} has {data.shape[1]} column(s), {columns} needed")
+		for start in range(0, len(data), chunk_rows):
+			yield np.asarray(data[start:start + chunk_rows, :columns], dtype=np.float64)
+		return
+	if file_format == "bin":
+		with open(path, "rb") as handle:
+			while True:
+				values = np.fromfile(handle, dtype="<f8", count=chunk_rows * columns)
+				if len(values) == 0:
+					return
+				if len(values) % columns:
+					raise ValueError(f"{path} ends in a partial row")
+				yield values.reshape(-1, columns)
+	with open(path, "r", encoding="utf-8") as handle:
+		if skip_header:
+			next(handle, None)
+		while True:
+			lines = list(itertools.islice(handle, chunk_rows))
+			if not lines:
+				return
+			chunk = np.loadtxt(lines, delimiter=",", dtype=np.float64, ndmin=2)
+			if chunk.size == 0:
+				continue
+			if chunk.shape[1] < columns:
+				raise ValueError(f"{path} has {chunk.shape[1]} column(s), {columns} needed")
+			yield chunk[:, :columns]
+
+
+def write_chunk(handle, file_format: str, result: np.ndarray, errors: np.ndarray) -> None:
+	if file_format == "csv":
+		np.savetxt(handle, np.column_stack((result, errors)), fmt=("%.17g", "%d"), delimiter=",")
+		return
+	records = np.empty(len(result), dtype=RESULT_DTYPE)
+	records["result"] = result
+	records["error"] = errors
+	records.tofile(handle)
+
+
+def run_batch(
+	operation: str,
+	input_path: str,
+	output_path: str,
+	input_format: Optional[str] = None,
+	output_format: Optional[str] = None,
+	chunk_rows: int = CHUNK_ROWS,
+	skip_header: bool = False,
+) -> Dict[str, object]:
+	if operation not in OPERATIONS:
+		raise ValueError(f"Unknown operation: {operation}")
+	input_format = input_format or detect_format(input_path)
+	output_format = output_format or ("csv" if detect_format(output_path) == "csv" else "bin")
+	columns = 1 if operation == "square_root" else 2
+	rows = 0
+	error_counts = np.zeros(len(ERROR_NAMES) + 1, dtype=np.int64)
+	start = time.perf_counter()
+	with open(output_path, "w" if output_format == "csv" else "wb") as handle:
+		if output_format == "csv":
+			codes = ", ".join(f"{code} {name}" for code, name in ERROR_NAMES.items())
+			handle.write(f"# result,error (0 ok, {codes})\n")
+		for chunk in read_chunks(input_path, columns, input_format, chunk_rows, skip_header):
+			right = chunk[:, 1] if columns == 2 else None
+			result, errors = apply_operation(operation, chunk[:, 0], right)
+			write_chunk(handle, output_format, result, errors)
+			rows += len(result)
+			error_counts += np.bincount(errors, minlength=len(error_counts))
+	return {
+		"rows": rows,
+		"errors": {ERROR_NAMES[code]: int(error_counts[code]) for code in ERROR_NAMES if error_counts[code]},
+		"seconds": time.perf_counter() - start,
+	}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+	parser = argparse.ArgumentParser(prog="enhanced_calculator.py batch", description="Apply an operation to every row of a file")
+	parser.add_argument("operation", choices=OPERATIONS)
+	parser.add_argument("input")
+	parser.add_argument("output")
+	parser.add_argument("--input-format", choices=("csv", "bin", "npy"), help="default: from the file extension")
+	parser.add_argument("--output-format", choices=("csv", "bin"), help="default: from the file extension")
+	parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+	parser.add_argument("--skip-header", action="store_true", help="ignore the first line of a CSV input")
+	args = parser.parse_args(argv)
+	try:
+		summary = run_batch(
+			args.operation,
+			args.input,
+			args.output,
+			args.input_format,
+			args.output_format,
+			max(1, args.chunk_rows),
+			args.skip_header,
+		)
+	except (OSError, ValueError) as error:
+		parser.exit(1, f"Error: {error}\n")
+	rows, seconds = summary["rows"], summary["seconds"]
+	print(f"{args.operation}: {rows:,} rows in {seconds:.2f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+	for name, count in summary["errors"].items():
+		print(f"  {name}: {count:,} rows")
+
+
+if __name__ == "__main__":
+	main()
@@ -1,5 +1,11 @@
 import math
-from typing import Callable, List, Tuple
+import os
+import re
+import sys
+from functools import lru_cache
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from calculation_history import HISTORY_CAPACITY, OPERATIONS, CalculationHistory
 
 
 NumberPair = Tuple[float, float]
@@ -45,6 +51,199 @@ def square_root(value: float) -> float:
 	return math.sqrt(value)
 
 
+# Expression mode: "2 * (x + 1) ^ 2", "sqrt(divide(a, b))", ...
+# Sources are compiled once into a Python function calling the operations
+# above, and compiled expressions are kept in an LRU cache by source text.
+EXPRESSION_CACHE_SIZE = 256
+
+TOKEN_PATTERN = re.compile(
+	r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(?P<name>[A-Za-z_]\w*)|(?P<op>\*\*|[-+*/%^(),]))"
+)
+
+# name -> (operation, number of arguments)
+EXPRESSION_FUNCTIONS: Dict[str, Tuple[Callable[..., float], int]] = {
+	"add": (add, 2),
+	"subtract": (subtract, 2),
+	"multiply": (multiply, 2),
+	"divide": (divide, 2),
+	"power": (power, 2),
+	"modulo": (modulo, 2),
+	"square_root": (square_root, 1),
+	"sqrt": (square_root, 1),
+}
+BINARY_OPERATORS = {"+": add, "-": subtract, "*": multiply, "/": divide, "%": modulo, "^": power, "**": power}
+EXPRESSION_CONSTANTS = {"pi": math.pi, "e": math.e}
+
+
+def tokenize(source: str) -> List[Tuple[str, str]]:
+	tokens = []
+	position = 0
+	source = source.rstrip()
+	while position < len(source):
+		match = TOKEN_PATTERN.match(source, position)
+		if match is None:
+			rest = source[position:]
+			column = position + len(rest) - len(rest.lstrip()) + 1
+			raise ValueError(f"Unexpected character {rest.lstrip()[:1]!r} at position {column}")
+		tokens.append((match.lastgroup, match.group(match.lastgroup)))
+		position = match.end()
+	return tokens
+
+
+class ExpressionParser:
+	# Recursive descent over the tokens, producing Python source for each
+	# node; nodes whose operands are all constants are folded right away.
+	#
+	#   expression := term (("+" | "-") term)*
+	#   term       := unary (("*" | "/" | "%") unary)*
+	#   unary      := ("-" | "+") unary | power
+	#   power      := atom (("^" | "**") unary)?      (right-associative)
+	#   atom       := number | name | name "(" arguments ")" | "(" expression ")"
+
+	def __init__(self, source: str) -> None:
+		self.source = source
+		self.tokens = tokenize(source)
+		self.index = 0
+		self.variables: List[str] = []
+		self.namespace: Dict[str, object] = {"__builtins__": {}}
+
+	def parse(self) -> Tuple[str, Optional[float]]:
+		if not self.tokens:
+			raise ValueError("Empty expression")
+		node = self.expression()
+		if self.index < len(self.tokens):
+			raise ValueError(f"Unexpected {self.tokens[self.index][1]!r} in {self.source!r}")
+		return node
+
+	def peek(self) -> Optional[str]:
+		if self.index < len(self.tokens):
+			return self.tokens[self.index][1]
+		return None
+
+	def take(self, expected: Optional[str] = None) -> Tuple[str, str]:
+		if self.index >= len(self.tokens):
+			raise ValueError(f"Unexpected end of expression {self.source!r}")
+		token = self.tokens[self.index]
+		if expected is not None and token[1] != expected:
+			raise ValueError(f"Expected {expected!r} but found {token[1]!r}")
+		self.index += 1
+		return token
+
+	def call(self, func: Callable[..., float], arguments: List[Tuple[str, Optional[float]]]) -> Tuple[str, Optional[float]]:
+		if all(value is not None for _, value in arguments):
+			values = [value for _, value in arguments]
+			try:
+				folded = func(values[0]) if len(values) == 1 else func((values[0], values[1]))
+			except (ArithmeticError, ValueError):
+				# leave the error to evaluation time, like the menu would
+				folded = None
+			if isinstance(folded, float) and math.isfinite(folded):
+				return repr(folded), folded
+		self.namespace[func.__name__] = func
+		codes = [code for code, _ in arguments]
+		if len(codes) == 1:
+			return f"{func.__name__}({codes[0]})", None
+		return f"{func.__name__}(({codes[0]}, {codes[1]}))", None
+
+	def expression(self) -> Tuple[str, Optional[float]]:
+		node = self.term()
+		while self.peek() in ("+", "-"):
+			operator = self.take()[1]
+			node = self.call(BINARY_OPERATORS[operator], [node, self.term()])
+		return node
+
+	def term(self) -> Tuple[str, Optional[float]]:
+		node = self.unary()
+		while self.peek() in ("*", "/", "%"):
+			operator = self.take()[1]
+			node = self.call(BINARY_OPERATORS[operator], [node, self.unary()])
+		return node
+
+	def unary(self) -> Tuple[str, Optional[float]]:
+		if self.peek() in ("-", "+"):
+			sign = self.take()[1]
+			code, value = self.unary()
+			if sign == "+":
+				return code, value
+			if value is not None:
+				return repr(-value), -value
+			return f"(-{code})", None
+		return self.power()
+
+	def power(self) -> Tuple[str, Optional[float]]:
+		node = self.atom()
+		if self.peek() in ("^", "**"):
+			self.take()
+			node = self.call(power, [node, self.unary()])
+		return node
+
+	def atom(self) -> Tuple[str, Optional[float]]:
+		kind, text = self.take()
+		if kind == "number":
+			value = float(text)
+			# 1e400 reads as inf, which has no literal to compile to
+			if not math.isfinite(value):
+				raise ValueError(f"Number out of range: {text}")
+			return repr(value), value
+		if kind == "name":
+			if self.peek() == "(":
+				if text not in EXPRESSION_FUNCTIONS:
+					raise ValueError(f"Unknown function: {text}")
+				func, arity = EXPRESSION_FUNCTIONS[text]
+				self.take("(")
+				arguments = [self.expression()]
+				while self.peek() == ",":
+					self.take()
+					arguments.append(self.expression())
+				self.take(")")
+				if len(arguments) != arity:
+					raise ValueError(f"{text}() takes {arity} argument(s), got {len(arguments)}")
+				return self.call(func, arguments)
+			if text in EXPRESSION_CONSTANTS:
+				return repr(EXPRESSION_CONSTANTS[text]), EXPRESSION_CONSTANTS[text]
+			if text not in self.variables:
+				self.variables.append(text)
+			return f"v_{text}", None
+		if text == "(":
+			node = self.expression()
+			self.take(")")
+			return node
+		raise ValueError(f"Unexpected {text!r} in {self.source!r}")
+
+
+class CompiledExpression:
+	__slots__ = ("source", "variables", "function")
+
+	def __init__(self, source: str, variables: Tuple[str, ...], function: Callable[..., float]) -> None:
+		self.source = source
+		# in order of first appearance; positional arguments of evaluate()
+		self.variables = variables
+		self.function = function
+
+	def evaluate(self, *values: float) -> float:
+		return self.function(*values)
+
+	def __call__(self, variables: Mapping[str, float]) -> float:
+		try:
+			values = [variables[name] for name in self.variables]
+		except KeyError as error:
+			raise ValueError(f"Unknown variable: {error.args[0]}") from None
+		return self.function(*values)
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(source: str) -> CompiledExpression:
+	parser = ExpressionParser(source)
+	code, _ = parser.parse()
+	parameters = ", ".join(f"v_{name}" for name in parser.variables)
+	exec(f"def compiled({parameters}):\n\treturn {code}\n", parser.namespace)
+	return CompiledExpression(source, tuple(parser.variables), parser.namespace["compiled"])
+
+
+def evaluate_expression(source: str, variables: Optional[Mapping[str, float]] = None) -> float:
+	return compile_expression(source)(variables or {})
+
+
 def parse_float(prompt_text: str) -> float:
 	while True:
 		text = input(prompt_text)
@@ -57,30 +256,108 @@ def parse_float(prompt_text: str) -> float:
 def compute_binary_operation(
 	name: str,
 	func: Callable[[NumberPair], float],
-	history: List[str],
+	history: CalculationHistory,
 ) -> None:
 	left = parse_float("Enter first number: ")
 	right = parse_float("Enter second number: ")
 	try:
 		result = func((left, right))
-		entry = f"{name}: {left} and {right} = {result}"
-		history.append(entry)
-		print(entry)
+		print(history.add(name, (left, right), result).format())
 	except Exception as error:
 		print(f"Error: {error}")
 
 
-def compute_square_root(history: List[str]) -> None:
+def compute_square_root(history: CalculationHistory) -> None:
 	value = parse_float("Enter number: ")
 	try:
 		result = square_root(value)
-		entry = f"sqrt: √{value} = {result}"
-		history.append(entry)
-		print(entry)
+		print(history.add("sqrt", (value,), result).format())
 	except Exception as error:
 		print(f"Error: {error}")
 
 
+def compute_expression(history: CalculationHistory, variables: Dict[str, float]) -> None:
+	print("Enter an expression such as 2 * (x + 1) ^ 2 or sqrt(divide(a, b)),")
+	print("or name = expression to store a variable. Leave empty to return.")
+	while True:
+		text = input("expr> ").strip()
+		if not text:
+			return
+		target, _, body = text.rpartition("=")
+		target = target.strip()
+		try:
+			if target and not target.isidentifier():
+				raise ValueError(f"Cannot assign to {target!r}")
+			compiled = compile_expression(body.strip())
+			for name in compiled.variables:
+				if name not in variables:
+					variables[name] = parse_float(f"{name} = ")
+			result = compiled(variables)
+		except Exception as error:
+			print(f"Error: {error}")
+			continue
+		if target:
+			variables[target] = result
+		print(history.add("expression", (), result, expression=text).format())
+
+
+def parse_optional_float(prompt_text: str) -> Optional[float]:
+	while True:
+		text = input(prompt_text).strip()
+		if not text:
+			return None
+		try:
+			return float(text)
+		except ValueError:
+			print("Invalid number. Please try again.")
+
+
+HISTORY_PAGE_SIZE = 10  # entries per page of Show History
+
+
+def search_history(history: CalculationHistory) -> Optional[List[int]]:
+	operation = input(f"Operation ({', '.join(OPERATIONS)}; blank for any): ").strip().lower() or None
+	minimum = parse_optional_float("Minimum result (blank for none): ")
+	maximum = parse_optional_float("Maximum result (blank for none): ")
+	try:
+		return history.search(operation, minimum, maximum)
+	except ValueError as error:
+		print(f"Error: {error}")
+		return None
+
+
+def show_history(history: CalculationHistory) -> None:
+	if not len(history):
+		print("History is empty.")
+		return
+	title = "History"
+	positions: Optional[List[int]] = None  # None: the whole history
+	# newest entries first: start on the last page
+	page = pages = history.page_count(HISTORY_PAGE_SIZE)
+	while True:
+		count = len(history) if positions is None else len(positions)
+		print(f"\n{title} (page {page} of {pages}, {count} entries):")
+		if not count:
+			print("No matching entries.")
+		for record in history.page(page, HISTORY_PAGE_SIZE, positions):
+			print(f"{record.number}. {record.format()}")
+		command = input("[n]ext, [p]revious, [f]ind, [a]ll, [q]uit: ").strip().lower()
+		if command == "n" and page < pages:
+			page += 1
+		elif command == "p" and page > 1:
+			page -= 1
+		elif command == "f":
+			found = search_history(history)
+			if found is not None:
+				title, positions = "Search results", found
+				page = pages = history.page_count(HISTORY_PAGE_SIZE, positions)
+		elif command == "a":
+			title, positions = "History", None
+			page = pages = history.page_count(HISTORY_PAGE_SIZE)
+		elif command in ("q", ""):
+			return
+
+
 def print_menu() -> None:
 	print("\nEnhanced Calculator")
 	print("1) Add")
@@ -92,11 +369,19 @@ def print_menu() -> None:
 	print("7) Square Root")
 	print("8) Show History")
 	print("9) Clear History")
+	print("10) Expression Mode")
 	print("0) Exit")
 
 
 def main() -> None:
-	history: List[str] = []
+	# CALCULATOR_HISTORY_LOG keeps the history in an append-only file across runs
+	history = CalculationHistory(
+		capacity=int(os.getenv("CALCULATOR_HISTORY_SIZE", HISTORY_CAPACITY)),
+		log_path=os.getenv("CALCULATOR_HISTORY_LOG") or None,
+	)
+	if len(history):
+		print(f"Loaded {len(history)} calculations from {history.log_path}.")
+	variables: Dict[str, float] = {}
 	operations: dict[str, Tuple[str, Callable[..., None]]] = {
 		"1": ("add", lambda h=history: compute_binary_operation("add", add, h)),
 		"2": ("subtract", lambda h=history: compute_binary_operation("subtract", subtract, h)),
@@ -105,6 +390,7 @@ def main() -> None:
 		"5": ("power", lambda h=history: compute_binary_operation("power", power, h)),
 		"6": ("modulo", lambda h=history: compute_binary_operation("modulo", modulo, h)),
 		"7": ("sqrt", compute_square_root),
+		"10": ("expression", lambda h=history: compute_expression(h, variables)),
 	}
 
 	while True:
@@ -114,12 +400,7 @@ def main() -> None:
 			print("Goodbye!")
 			break
 		elif choice == "8":
-			if not history:
-				print("History is empty.")
-			else:
-				print("\nHistory:")
-				for index, entry in enumerate(history, start=1):
-					print(f"{index}. {entry}")
+			show_history(history)
 		elif choice == "9":
 			history.clear()
 			print("History cleared.")
@@ -128,9 +409,17 @@ def main() -> None:
 			action(history)
 		else:
 			print("Invalid choice. Please try again.")
+	history.close()
 
 
 if __name__ == "__main__":
-	main()
+	if sys.argv[1:2] == ["batch"]:
+		# python enhanced_calculator.py batch <operation> <input> <output>
+		# (NumPy is only needed for batch mode)
+		from calculator_batch import main as batch_main
+
+		batch_main(sys.argv[2:])
+	else:
+		main()
 
 